@@ -0,0 +1,205 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from fundamentos.provedores import (
+    FUSO_B3,
+    GRUPO_MACRO,
+    ProvedorGravacao,
+    caminho_gravacao,
+    salvar_tabela_json,
+)
+
+DIRETORIO_FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# Carteira representativa: empresas completas, empresas com EBIT negativo e
+# muita dívida (OIBR3/OIBR4) e um banco, que não tem várias linhas usadas
+# pelos indicadores (EBIT, capex, estoque, ativo e passivo circulante)
+CARTEIRA_PADRAO = ["PETR4", "VALE3", "OIBR3", "OIBR4", "ITUB4"]
+
+DEMONSTRATIVOS = ("financials", "balance_sheet", "cashflow")
+
+
+def _salvar_json(caminho: Path, conteudo: Any) -> None:
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_text(json.dumps(conteudo, default=str), encoding="utf-8")
+
+
+def gravar_fixtures(
+    tickers: Iterable[str], diretorio: Path = DIRETORIO_FIXTURES
+) -> None:
+    # Grava as respostas reais do Yahoo, do IPEA e do SIDRA (exige rede)
+    provedor = ProvedorGravacao(diretorio)
+    for acao in tickers:
+        ticker = f"{acao}.SA"
+        for nome in DEMONSTRATIVOS:
+            for freq in ("yearly", "quarterly"):
+                provedor.demonstrativo(ticker, nome, freq)
+        provedor.info(ticker)
+        provedor.dividendos(ticker)
+        provedor.historico(ticker)
+    provedor.ibovespa("2004-01-01", datetime.now(FUSO_B3).strftime("%Y-%m-%d"))
+    provedor.swap_di()
+    provedor.ipca()
+
+
+def _demonstrativo(
+    linhas: Dict[str, float], datas: pd.DatetimeIndex, gerador: np.random.Generator
+) -> pd.DataFrame:
+    # Cada linha cresce em média 8% ao ano (da data mais recente para trás
+    # os valores vão diminuindo), com ruído
+    fatores = np.cumprod(np.r_[1.0, gerador.normal(1 / 1.08, 0.05, len(datas) - 1)])
+    return pd.DataFrame(
+        {
+            data: [valor * fator for valor in linhas.values()]
+            for data, fator in zip(datas, fatores)
+        },
+        index=list(linhas),
+    )
+
+
+def _perfil(acao: str) -> str:
+    if acao.startswith("OIBR"):
+        return "endividada"
+    if acao[:4] in ("ITUB", "BBDC", "BBAS", "SANB", "BPAC"):
+        return "banco"
+    return "industrial"
+
+
+def gerar_fixtures_sinteticas(
+    tickers: Iterable[str] = CARTEIRA_PADRAO,
+    diretorio: Path = DIRETORIO_FIXTURES,
+    semente: int = 0,
+    hoje: Optional[datetime] = None,
+) -> List[str]:
+    # Fixtures no formato do ProvedorGravacao, para rodar os benchmarks sem
+    # rede e sem versionar dados do Yahoo
+    gerador = np.random.default_rng(semente)
+    hoje = hoje or datetime.now(FUSO_B3).replace(tzinfo=None)
+    ultimo_ano = hoje.year - 1
+    anuais = pd.DatetimeIndex(
+        [f"{ano}-12-31" for ano in range(ultimo_ano, ultimo_ano - 4, -1)]
+    )
+    trimestrais = pd.date_range(end=hoje, periods=6, freq="QE")[::-1]
+
+    gerados = []
+    for acao in tickers:
+        ticker = f"{acao}.SA"
+        perfil = _perfil(acao)
+        escala = float(gerador.uniform(1e9, 5e11))
+        margem = -0.15 if perfil == "endividada" else float(gerador.uniform(0.1, 0.3))
+
+        resultado = {
+            "TotalRevenue": escala,
+            "EBIT": escala * margem,
+            "PretaxIncome": escala * (margem - 0.03),
+            "TaxProvision": abs(escala * margem) * 0.3,
+            "InterestExpense": escala * 0.04,
+            "ReconciledDepreciation": escala * 0.05,
+        }
+        balanco = {
+            "TotalDebt": escala * (2.5 if perfil == "endividada" else 0.5),
+            "CashCashEquivalentsAndShortTermInvestments": escala * 0.1,
+            "AccountsReceivable": escala * 0.1,
+            "Inventory": escala * 0.05,
+            "OtherCurrentAssets": escala * 0.01,
+            "OtherCurrentLiabilities": escala * 0.02,
+            "AccountsPayable": escala * 0.06,
+            "CurrentAssets": escala * 0.3,
+            "CurrentLiabilities": escala * 0.2,
+            "InvestmentsAndAdvances": escala * 0.01,
+            "OtherNonCurrentAssets": escala * 0.01,
+            "GoodwillAndOtherIntangibleAssets": escala * 0.02,
+            "TotalNonCurrentLiabilitiesNetMinorityInterest": escala * 0.6,
+            "ShareIssued": float(gerador.integers(500_000_000, 10_000_000_000)),
+        }
+        fluxo = {"CapitalExpenditure": -escala * 0.08}
+        if perfil == "banco":
+            for linha in ("EBIT", "ReconciledDepreciation"):
+                resultado.pop(linha)
+            for linha in (
+                "Inventory",
+                "AccountsPayable",
+                "CurrentAssets",
+                "CurrentLiabilities",
+            ):
+                balanco.pop(linha)
+            fluxo = {"NetIncomeFromContinuingOperations": escala * 0.15}
+
+        for nome, linhas in (
+            ("financials", resultado),
+            ("balance_sheet", balanco),
+            ("cashflow", fluxo),
+        ):
+            for freq, datas in (("yearly", anuais), ("quarterly", trimestrais)):
+                fator = 1.0 if freq == "yearly" or nome == "balance_sheet" else 0.25
+                tabela = _demonstrativo(
+                    {linha: valor * fator for linha, valor in linhas.items()},
+                    datas,
+                    gerador,
+                )
+                salvar_tabela_json(
+                    caminho_gravacao(diretorio, ticker, f"{nome}_{freq}"), tabela
+                )
+
+        preco = float(gerador.uniform(1, 100))
+        acoes = balanco["ShareIssued"]
+        info = {
+            "marketCap": preco * acoes,
+            "totalDebt": balanco["TotalDebt"],
+            "beta": float(gerador.uniform(0.6, 1.6)),
+            "returnOnEquity": margem * 0.8,
+            "payoutRatio": float(gerador.uniform(0.2, 0.8)),
+        }
+        if perfil != "banco":
+            info["enterpriseValue"] = info["marketCap"] + balanco["TotalDebt"]
+        _salvar_json(caminho_gravacao(diretorio, ticker, "info"), info)
+
+        datas_dividendos = pd.date_range(
+            end=hoje, periods=40, freq="QS", tz="America/Sao_Paulo"
+        )
+        if perfil == "endividada":
+            datas_dividendos = datas_dividendos[:8]
+        dividendos = pd.DataFrame(
+            {"Dividends": gerador.uniform(0.01, 0.05, len(datas_dividendos)) * preco},
+            index=datas_dividendos,
+        )
+        salvar_tabela_json(caminho_gravacao(diretorio, ticker, "dividends"), dividendos)
+
+        pregoes = pd.bdate_range(end=hoje, periods=2500, tz="America/Sao_Paulo")
+        retornos = gerador.normal(0, 0.02, len(pregoes))
+        historico = pd.DataFrame(
+            {"Close": preco * np.exp(np.cumsum(retornos) - retornos.sum())},
+            index=pregoes,
+        )
+        salvar_tabela_json(caminho_gravacao(diretorio, ticker, "historico"), historico)
+        gerados.append(acao)
+
+    pregoes = pd.bdate_range("2004-01-01", hoje)
+    ibov = pd.DataFrame(
+        {"Close": 20000 * np.exp(np.cumsum(gerador.normal(3e-4, 0.015, len(pregoes))))},
+        index=pregoes,
+    )
+    salvar_tabela_json(caminho_gravacao(diretorio, GRUPO_MACRO, "ibovespa"), ibov)
+
+    dias = pd.bdate_range(end=hoje, periods=250)
+    swap = pd.DataFrame(
+        {"VALUE ((% a.a.))": 10 + np.cumsum(gerador.normal(0, 0.05, len(dias)))},
+        index=dias,
+    )
+    salvar_tabela_json(caminho_gravacao(diretorio, GRUPO_MACRO, "swap_di"), swap)
+
+    meses = pd.period_range(end=pd.Period(hoje, "M") - 1, periods=472, freq="M")
+    ipca = pd.DataFrame(
+        [{"D2C": "Mês (Código)", "V": "Valor"}]
+        + [
+            {"D2C": mes.strftime("%Y%m"), "V": f"{valor:.2f}"}
+            for mes, valor in zip(meses, gerador.uniform(2, 10, len(meses)))
+        ]
+    )
+    salvar_tabela_json(caminho_gravacao(diretorio, GRUPO_MACRO, "ipca"), ipca)
+    return gerados
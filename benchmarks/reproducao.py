@@ -0,0 +1,37 @@
+from pathlib import Path
+from types import TracebackType
+from typing import Optional, Type
+
+from fundamentos.provedores import (
+    ProvedorDados,
+    ProvedorReproducao,
+    configurar_provedor,
+    obter_provedor,
+)
+
+from .fixtures import DIRETORIO_FIXTURES
+
+
+# Troca o provedor de dados de todo o pipeline pelo ProvedorReproducao dentro
+# de um bloco with; as chamadas por endpoint ficam em `chamadas`.
+class Reproducao:
+    def __init__(
+        self, diretorio: Path = DIRETORIO_FIXTURES, latencia: float = 0.0
+    ) -> None:
+        self.provedor = ProvedorReproducao(diretorio, latencia=latencia)
+        self.chamadas = self.provedor.chamadas
+        self._anterior: Optional[ProvedorDados] = None
+
+    def __enter__(self) -> "Reproducao":
+        self._anterior = obter_provedor()
+        configurar_provedor(self.provedor)
+        return self
+
+    def __exit__(
+        self,
+        tipo: Optional[Type[BaseException]],
+        erro: Optional[BaseException],
+        rastro: Optional[TracebackType],
+    ) -> None:
+        if self._anterior is not None:
+            configurar_provedor(self._anterior)
@@ -0,0 +1,217 @@
+import argparse
+import contextlib
+import io
+import json
+import runpy
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+from fundamentos import (
+    IndicadoresFinanceiros,
+    ValuationFluxoCaixaDescontado,
+    ValuationModoloGordon,
+    entradas_fluxo_caixa,
+)
+from fundamentos.dados_macro import dados_macro
+from fundamentos.provedores import configurar_provedor, obter_provedor
+
+from .fixtures import (
+    CARTEIRA_PADRAO,
+    DIRETORIO_FIXTURES,
+    gerar_fixtures_sinteticas,
+    gravar_fixtures,
+)
+from .reproducao import Reproducao
+
+SCRIPT_VALUATIONS = (
+    Path(__file__).resolve().parent.parent / "codigos_rodando" / "rodando_valuations.py"
+)
+
+# Falhas de uma etapa por dados ausentes ou inválidos nas gravações (linha
+# faltando nos demonstrativos, gravação não encontrada, série vazia): viram a
+# coluna erro, sem interromper a medição das demais
+ERROS_DADOS = (KeyError, IndexError, TypeError, ValueError, ZeroDivisionError)
+
+
+def medir(
+    etapa: str,
+    acao: str,
+    funcao: Callable[[], Any],
+    reproducao: Reproducao,
+    repeticoes: int,
+) -> Dict[str, Any]:
+    # Cada repetição começa sem o cache macro, como um processo novo
+    tempos: List[float] = []
+    antes = Counter(reproducao.chamadas)
+    erro = ""
+    for _ in range(repeticoes):
+        dados_macro.limpar()
+        inicio = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                funcao()
+        except ERROS_DADOS as e:
+            erro = f"{type(e).__name__}: {e}"
+        tempos.append(time.perf_counter() - inicio)
+
+    chamadas = reproducao.chamadas - antes
+    return {
+        "etapa": etapa,
+        "acao": acao,
+        "mediana_ms": round(statistics.median(tempos) * 1000, 2),
+        "minimo_ms": round(min(tempos) * 1000, 2),
+        "chamadas": sum(chamadas.values()) / repeticoes,
+        **{endpoint: total / repeticoes for endpoint, total in chamadas.items()},
+        "erro": erro,
+    }
+
+
+def fluxo_completo(gravacoes: Path, workers: int, reproducao: Reproducao) -> None:
+    # Roda o próprio codigos_rodando/rodando_valuations.py com --provedor
+    # reproducao (provedor e dados macro configurados pelo script, cotações
+    # em lote, escritores, checkpoint, projeções e histórico); os resultados
+    # ficam na pasta das gravações
+    argv = sys.argv
+    anterior = obter_provedor()
+    sys.argv = [
+        str(SCRIPT_VALUATIONS),
+        "--provedor",
+        "reproducao",
+        "--gravacoes",
+        str(gravacoes),
+        "--workers",
+        str(workers),
+        "--latencia",
+        str(reproducao.provedor.latencia),
+    ]
+    try:
+        with contextlib.chdir(SCRIPT_VALUATIONS.parent):
+            runpy.run_path(str(SCRIPT_VALUATIONS), run_name="__main__")
+        # O script configura o próprio provedor: as chamadas dele entram na
+        # contagem da reprodução
+        reproducao.chamadas.update(obter_provedor().chamadas)
+    finally:
+        sys.argv = argv
+        configurar_provedor(anterior)
+
+
+def rodar_benchmarks(
+    acoes: List[str], reproducao: Reproducao, repeticoes: int, workers: int
+) -> pd.DataFrame:
+    resultados = []
+    for acao in acoes:
+        ticker = f"{acao}.SA"
+        resultados.append(
+            medir(
+                "todos_indicadores",
+                acao,
+                lambda ticker=ticker: IndicadoresFinanceiros(
+                    ticker=ticker
+                ).todos_indicadores(),
+                reproducao,
+                repeticoes,
+            )
+        )
+        resultados.append(
+            medir(
+                "preco_acao",
+                acao,
+                lambda ticker=ticker: ValuationModoloGordon(ticker).preco_acao(),
+                reproducao,
+                repeticoes,
+            )
+        )
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                entradas = entradas_fluxo_caixa(
+                    IndicadoresFinanceiros(ticker=ticker).todos_indicadores()
+                )
+        except ERROS_DADOS as e:
+            print(f"Sem indicadores para o fluxo de caixa de {acao}: {e}")
+            continue
+        resultados.append(
+            medir(
+                "calcular_valuation",
+                acao,
+                lambda entradas=entradas: ValuationFluxoCaixaDescontado(
+                    **entradas
+                ).calcular_valuation(),
+                reproducao,
+                repeticoes,
+            )
+        )
+
+    # O script grava os resultados junto das gravações: roda sobre uma cópia
+    with tempfile.TemporaryDirectory() as pasta:
+        gravacoes = Path(pasta) / "gravacoes"
+        shutil.copytree(reproducao.provedor.diretorio, gravacoes)
+        resultados.append(
+            medir(
+                "rodando_valuations",
+                f"{len(reproducao.provedor.tickers())} ações",
+                lambda: fluxo_completo(gravacoes, workers, reproducao),
+                reproducao,
+                repeticoes,
+            )
+        )
+    tabela = pd.DataFrame(resultados).fillna({"erro": ""}).fillna(0)
+    fixas = ["etapa", "acao", "mediana_ms", "minimo_ms", "chamadas"]
+    endpoints = sorted(set(tabela.columns) - set(fixas) - {"erro"})
+    return tabela[fixas + endpoints + ["erro"]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks do pipeline de valuation com respostas gravadas"
+    )
+    parser.add_argument("--acoes", nargs="+", default=CARTEIRA_PADRAO)
+    parser.add_argument("--fixtures", type=Path, default=DIRETORIO_FIXTURES)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument(
+        "--latencia",
+        type=float,
+        default=0.0,
+        help="Latência simulada em segundos por chamada externa",
+    )
+    parser.add_argument(
+        "--gravar",
+        action="store_true",
+        help="Grava as respostas reais do Yahoo, IPEA e SIDRA antes de medir (exige rede)",
+    )
+    parser.add_argument(
+        "--sinteticas",
+        action="store_true",
+        help="Gera fixtures sintéticas (o padrão quando a pasta de fixtures não existe)",
+    )
+    parser.add_argument("--saida", type=Path, help="Grava os resultados em JSON")
+    args = parser.parse_args()
+
+    if args.gravar:
+        gravar_fixtures(args.acoes, args.fixtures)
+    elif args.sinteticas or not args.fixtures.exists():
+        gerar_fixtures_sinteticas(args.acoes, args.fixtures)
+
+    with Reproducao(args.fixtures, args.latencia) as reproducao:
+        resultados = rodar_benchmarks(
+            args.acoes, reproducao, args.repeticoes, args.workers
+        )
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(resultados.to_string(index=False))
+    if args.saida is not None:
+        args.saida.write_text(
+            json.dumps(resultados.to_dict("records"), indent=2), encoding="utf-8"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Cada importação é medida em um interpretador novo. Os motores de cálculo não
+# podem carregar os módulos pesados: se carregarem, o benchmark falha.
+IMPORTACOES = {
+    "fundamentos": "import fundamentos",
+    "fluxo_caixa": "from fundamentos import ValuationFluxoCaixaDescontado",
+    "fluxo_caixa_vetorizado": (
+        "from fundamentos import ValuationFluxoCaixaDescontadoVetorizado"
+    ),
+    "gordon_vetorizado": "from fundamentos import ValuationGordonVetorizado",
+    "monte_carlo": "from fundamentos import ValuationMonteCarlo",
+    "multiestagio": "from fundamentos import ValuationFluxoCaixaMultiestagio",
+    "dcf_reverso": "from fundamentos import DCFReverso",
+    "lote": "from fundamentos import ValuationLote",
+}
+
+SO_NUMPY = (
+    "fundamentos",
+    "fluxo_caixa",
+    "fluxo_caixa_vetorizado",
+    "gordon_vetorizado",
+    "monte_carlo",
+    "multiestagio",
+    "dcf_reverso",
+)
+
+MODULOS_PESADOS = ("pandas", "pyarrow", "yfinance", "ipeadatapy", "sidrapy")
+
+_CODIGO = """
+import sys, time
+inicio = time.perf_counter()
+{importacao}
+fim = time.perf_counter()
+import json
+print(json.dumps({{
+    "segundos": fim - inicio,
+    "pesados": [m for m in {pesados!r} if m in sys.modules],
+}}))
+"""
+
+
+def medir_importacao(importacao: str) -> Dict[str, Any]:
+    saida = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _CODIGO.format(importacao=importacao, pesados=MODULOS_PESADOS),
+        ],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    medida: Dict[str, Any] = json.loads(saida.stdout.strip().splitlines()[-1])
+    return medida
+
+
+def rodar(
+    nomes: Sequence[str], repeticoes: int, limite_ms: float
+) -> List[Dict[str, Any]]:
+    resultados = []
+    for nome in nomes:
+        medidas = [medir_importacao(IMPORTACOES[nome]) for _ in range(repeticoes)]
+        mediana_ms = statistics.median(m["segundos"] for m in medidas) * 1000
+        pesados = medidas[-1]["pesados"]
+        erros = []
+        if nome in SO_NUMPY and pesados:
+            erros.append(f"carregou {', '.join(pesados)}")
+        if nome in SO_NUMPY and limite_ms and mediana_ms > limite_ms:
+            erros.append(f"passou do limite de {limite_ms:.0f} ms")
+        resultados.append(
+            {
+                "importacao": nome,
+                "mediana_ms": round(mediana_ms, 1),
+                "minimo_ms": round(min(m["segundos"] for m in medidas) * 1000, 1),
+                "modulos_pesados": ", ".join(pesados),
+                "erro": "; ".join(erros),
+            }
+        )
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Tempo de importação do pacote fundamentos"
+    )
+    parser.add_argument(
+        "--importacoes", nargs="+", choices=list(IMPORTACOES), default=list(IMPORTACOES)
+    )
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument(
+        "--limite-ms",
+        type=float,
+        default=500.0,
+        help="Tempo máximo de importação dos motores de cálculo (0 desliga)",
+    )
+    parser.add_argument("--saida", type=Path, help="Grava os resultados em JSON")
+    args = parser.parse_args()
+
+    resultados = rodar(args.importacoes, args.repeticoes, args.limite_ms)
+    largura = max(len(nome) for nome in args.importacoes)
+    for resultado in resultados:
+        print(
+            f"{resultado['importacao']:<{largura}}  {resultado['mediana_ms']:>8.1f} ms"
+            f"  {resultado['modulos_pesados'] or '-'}"
+            f"  {resultado['erro']}"
+        )
+    if args.saida is not None:
+        args.saida.write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+    if any(resultado["erro"] for resultado in resultados):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
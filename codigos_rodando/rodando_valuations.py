@@ -1,12 +1,13 @@
+import argparse
+import contextlib
+import json
 import pandas as pd
-import yfinance as yf
 import warnings
-import os
+from datetime import timedelta
 from pathlib import Path
 import sys
-import traceback
 sys.path.append('..')
-from fundamentos import ValuationModoloGordon, ValuationFluxoCaixaDescontado, IndicadoresFinanceiros
+from fundamentos import INTERVALOS_DCF_REVERSO, CalculoBeta, CotacoesAtuais, DCFReverso, EscritorCSV, EscritorJSONL, EscritorParquet, HistoricoValuations, ProvedorReproducao, juntar_tabelas, pasta_shard, pastas_shards, selecionar_shard, ValuationLote, configurar_dados_macro, configurar_instrumentacao, configurar_provedor, criar_provedor, salvar_parquet, tabela_projecoes, tabela_resultados
 
 warnings.filterwarnings("ignore")
 
@@ -14,80 +15,180 @@ warnings.filterwarnings("ignore")
 dados_dir = Path('../dados')
 dados_dir.mkdir(exist_ok=True)
 
+# Dados coletados há menos de um dia são lidos do armazenamento local em dados/fundamentos
+MODO_DADOS = 'cache'
+IDADE_MAXIMA_DADOS = timedelta(days=1)
 
-acoes= pd.read_csv("https://raw.githubusercontent.com/Jeferson100/fundamentalist-stock-brazil/main/dados/setor.csv")['tic'].to_list()
-
-data_valuation = {
-    'acao': [],
-    'valor_atual':[],
-    'preco_gordon': [],
-    'preco_fluxo': [],
-    'diferenca_gordon': [],
-    'diferenca_fluxo': [],
-    'margem_ebit': [],
-    'variacao_receita': [],
-    'wacc': [],
-    'quantidade_acoes': [],
-    'divida_total': [],
-    'caixa': [],
-    'outros_ativos': [],
-    'passivos_menos_divida': [],
-    'percentual_imposto': [],
-}
-for acao in acoes:
-    print('-'*10, acao, '-'*10)
-    try:
-        valu = ValuationModoloGordon(f'{acao}.SA')
-        preco_gordon = valu.preco_acao()
-
-        ind = IndicadoresFinanceiros(ticker=f'{acao}.SA')
-        indicadores = ind.todos_indicadores()
-
-        valuation_fluxo = ValuationFluxoCaixaDescontado(
-                    receita_ano=indicadores['ultimareceita'],
-                    porcenta_crescimento_receita=indicadores['variacaoreceita']['median_deflacionada'] if 'median_deflacionada' in indicadores['variacaoreceita'].keys() else indicadores['variacaoreceita']['median_normal'],
-                    margem_ebit=indicadores['margemebit'],
-                    imposto_porcentagem=indicadores['percentualimposto'],
-                    depreciacao_capex=indicadores['depreciacaocapex'],
-                    capex_da_receita=indicadores['capexreceita'],
-                    wacc=indicadores['wacc'],
-                    numero_de_acoes=indicadores['quantidadeacoes'],
-                    divida=indicadores['dividatotal'],
-                    disponivel=indicadores['caixa'],
-                    ativos_nao_operacionais=indicadores['outrosativos'],
-                    passivos_circulantes=indicadores['passivosmenosdivida'],
-                    necessidade_capital_de_giro=indicadores['necessidadecapitalgiro'],
-                    anos_projecao=5, 
-                    taxa_crecimento_perpetuidade=0.014,
-                    calculo_necessidade_capital_de_giro=False)
-
-        _ , valor_fluxo = valuation_fluxo.calcular_valuation()
-
-        yaho = yf.Ticker(f'{acao}.SA')
-        valor_acao_atual = round(yaho.history(period="10Y", interval="1d")['Close'][-1],2)
-        
-        data_valuation['acao'].append(acao)
-        data_valuation['valor_atual'].append(valor_acao_atual)
-        data_valuation['preco_gordon'].append(preco_gordon['valuation_acao'])
-        data_valuation['preco_fluxo'].append(valor_fluxo['valor_por_acao'])
-        data_valuation['diferenca_gordon'].append(round((preco_gordon['valuation_acao'] - valor_acao_atual)/valor_acao_atual,2))
-        data_valuation['diferenca_fluxo'].append(round((valor_fluxo['valor_por_acao'] - valor_acao_atual)/valor_acao_atual,2))
-        data_valuation['margem_ebit'].append(indicadores['margemebit'])
-        data_valuation['variacao_receita'].append(indicadores['variacaoreceita'])
-        data_valuation['wacc'].append(indicadores['wacc'])
-        data_valuation['quantidade_acoes'].append(indicadores['quantidadeacoes'])
-        data_valuation['divida_total'].append(indicadores['dividatotal'])
-        data_valuation['caixa'].append(indicadores['caixa'])
-        data_valuation['outros_ativos'].append(indicadores['outrosativos'])
-        data_valuation['passivos_menos_divida'].append(indicadores['passivosmenosdivida'])
-        data_valuation['percentual_imposto'].append(indicadores['percentualimposto'])
-    except Exception as e:
-        print(f'Erro ao obter dados da acao {acao}: {e}')
-        traceback.print_exc()  # Mostra o erro detalhado
-        
-data_valores = pd.DataFrame(data_valuation)
-
-# Salvar arquivo
-arquivo_saida = dados_dir / 'valores_valuations_acoes.csv'
-
-data_valores.sort_values(by=['diferenca_gordon', 'diferenca_fluxo'], ascending=False).to_csv(arquivo_saida, index=False)
\ No newline at end of file
+
+parser = argparse.ArgumentParser(description='Valuation das ações listadas em setor.csv')
+parser.add_argument('--workers', type=int, default=8, help='Quantidade de ações processadas em paralelo')
+parser.add_argument('--timeout', type=float, default=300, help='Tempo limite em segundos para cada ação')
+parser.add_argument('--incremental', action='store_true', help='Recalcula só as ações com demonstrativos novos; as demais só atualizam a cotação')
+parser.add_argument('--resume', action='store_true', help='Retoma a rodada interrompida: pula as ações já gravadas no checkpoint e tenta de novo as que falharam')
+parser.add_argument('--provedor', choices=['yahoo', 'gravacao', 'reproducao'], default='yahoo', help='Origem dos dados: Yahoo ao vivo, Yahoo gravando as respostas ou reprodução das respostas gravadas')
+parser.add_argument('--gravacoes', type=Path, default=Path('../dados/gravacoes'), help='Pasta das respostas gravadas')
+parser.add_argument('--latencia', type=float, default=0.0, help='Latência simulada em segundos por chamada na reprodução')
+parser.add_argument('--instrumentar', action='store_true', help='Mede o tempo de cada etapa e chamada externa e o pico de memória por ação')
+parser.add_argument('--shard', type=int, default=0, help='Shard rodado por este processo (0 a --total-shards - 1)')
+parser.add_argument('--total-shards', type=int, default=1, help='Quantidade de shards em que as ações são divididas')
+parser.add_argument('--particionar', choices=['setor', 'segmento', 'hash'], default='setor', help='Divide os shards por setor, por segmento ou por hash do ticker')
+parser.add_argument('--ttm', action='store_true', help='Usa a soma dos últimos quatro trimestres (TTM) de receita, EBIT, imposto, D&A e capex no lugar do último ano fiscal')
+parser.add_argument('--dcf-reverso', action='store_true', help='Grava o crescimento da receita, o wacc e a margem EBIT implícitos no preço atual de cada ação')
+parser.add_argument('--beta-local', action='store_true', help='Calcula o beta de todas as ações contra o IBOVESPA a partir de um único download dos fechamentos, no lugar do beta do Yahoo')
+parser.add_argument('--beta-anos', type=float, default=2, help='Anos de fechamentos usados no --beta-local')
+parser.add_argument('--beta-frequencia', choices=['diaria', 'semanal', 'mensal'], default='semanal', help='Frequência dos retornos do --beta-local')
+parser.add_argument('--sem-ajuste-blume', action='store_true', help='Usa o beta medido no --beta-local, sem o ajuste de Blume (2/3 do beta + 1/3)')
+parser.add_argument('--jsonl', action='store_true', help='Escreve cada resultado como uma linha JSON na saída padrão assim que a ação termina (os logs vão para a saída de erro)')
+parser.add_argument('--merge', action='store_true', help='Junta os resultados dos shards no resultado final, sem rodar valuations')
+args = parser.parse_args()
+
+# Com --jsonl a saída padrão fica só com os resultados, para encadear com outros programas, e os logs vão para a saída de erro
+saida_logs = sys.stderr if args.jsonl else sys.stdout
+
+provedor = configurar_provedor(criar_provedor(args.provedor, args.gravacoes, args.latencia, timeout_acao=args.timeout))
+# Gravando ou reproduzindo, os dados vêm sempre do provedor e não do armazenamento local
+modo_dados = MODO_DADOS if args.provedor == 'yahoo' else 'online'
+configurar_dados_macro(modo=modo_dados, idade_maxima=IDADE_MAXIMA_DADOS)
+
+# Uma rodada reproduzida não sobrescreve os resultados reais: grava junto das gravações
+pasta_final = args.gravacoes if args.provedor == 'reproducao' else dados_dir
+# Com vários shards cada processo grava só as suas ações em shards/<shard>-de-<total>; o --merge junta tudo em pasta_final
+em_shards = args.total_shards > 1 and not args.merge
+pasta_saida = pasta_shard(pasta_final, args.shard, args.total_shards) if em_shards else pasta_final
+pasta_saida.mkdir(parents=True, exist_ok=True)
+arquivo_saida = pasta_final / 'valores_valuations_acoes.csv'
+# Mesmo resultado com tipos fixos e variacao_receita em quatro colunas, e as projeções ano a ano
+arquivo_projecoes = pasta_final / 'projecoes_valuations.parquet'
+arquivo_impressoes = pasta_final / 'impressoes_digitais.json'
+arquivo_checkpoint = pasta_saida / 'checkpoint_valuations.jsonl'
+# Resultados gravados à medida que cada ação termina; viram os arquivos finais no fim da rodada
+arquivo_parcial = pasta_saida / 'valores_valuations_acoes.parcial.csv'
+arquivo_parcial_parquet = pasta_saida / 'valores_valuations_acoes.parcial.parquet'
+arquivo_parcial_projecoes = pasta_saida / 'projecoes_valuations.parcial.parquet'
+
+
+def salvar_dcf_reverso(pasta, data_valores):
+    # Parâmetros que fazem o fluxo de caixa descontado chegar ao preço atual, com o status da busca de cada ação
+    reverso = DCFReverso.de_resultados(data_valores)
+    tabela = data_valores[['acao', 'valor_atual']].copy()
+    for parametro in INTERVALOS_DCF_REVERSO:
+        solucao = reverso.resolver(parametro)
+        tabela[f'{parametro}_implicito'] = solucao['valor']
+        tabela[f'status_{parametro}'] = solucao['status']
+    tabela.to_csv(pasta / 'dcf_reverso_acoes.csv', index=False)
+
+
+def salvar_resultados(pasta, data_valores, projecoes, impressoes, historico):
+    (pasta / 'impressoes_digitais.json').write_text(json.dumps(impressoes, indent=2), encoding='utf-8')
+    data_valores = data_valores.sort_values(by=['diferenca_gordon', 'diferenca_fluxo'], ascending=False)
+    data_valores.to_csv(pasta / 'valores_valuations_acoes.csv', index=False)
+    resultados = tabela_resultados(data_valores)
+    salvar_parquet(resultados, pasta / 'valores_valuations_acoes.parquet')
+    salvar_parquet(projecoes, pasta / 'projecoes_valuations.parquet')
+    if args.dcf_reverso:
+        salvar_dcf_reverso(pasta, data_valores)
+    # Cada rodada completa também entra no histórico particionado por mês
+    if historico:
+        HistoricoValuations(pasta / 'historico_valuations').acrescentar(resultados)
+
+
+if args.merge:
+    impressoes = json.loads(arquivo_impressoes.read_text(encoding='utf-8')) if arquivo_impressoes.exists() else {}
+    valores, projecoes = [], []
+    for pasta in pastas_shards(pasta_final, args.total_shards):
+        valores.append(pd.read_csv(pasta / 'valores_valuations_acoes.csv', float_precision='round_trip'))
+        projecoes.append(pd.read_parquet(pasta / 'projecoes_valuations.parquet'))
+        impressoes.update(json.loads((pasta / 'impressoes_digitais.json').read_text(encoding='utf-8')))
+    data_valores = juntar_tabelas(valores)
+    salvar_resultados(pasta_final, data_valores, juntar_tabelas(projecoes, tabela_projecoes({}).columns), impressoes, historico=True)
+    print(f"{len(data_valores)} ações de {args.total_shards} shards juntadas em {arquivo_saida}", file=saida_logs)
+    sys.exit(0)
+
+if args.instrumentar:
+    instrumentacao = configurar_instrumentacao()
+
+anteriores = None
+impressoes_anteriores = {}
+if args.incremental and arquivo_saida.exists() and arquivo_impressoes.exists():
+    anteriores = pd.read_csv(arquivo_saida)
+    impressoes_anteriores = json.loads(arquivo_impressoes.read_text(encoding='utf-8'))
+
+if isinstance(provedor, ProvedorReproducao):
+    # As ações gravadas usam o setor de dados/setor.csv quando ele existe
+    setores = pd.DataFrame({'tic': [ticker.removesuffix('.SA') for ticker in provedor.tickers()]})
+    if (dados_dir / 'setor.csv').exists():
+        setores = setores.merge(pd.read_csv(dados_dir / 'setor.csv'), on='tic', how='left')
+else:
+    setores = pd.read_csv("https://raw.githubusercontent.com/Jeferson100/fundamentalist-stock-brazil/main/dados/setor.csv")
+acoes = selecionar_shard(setores, args.shard, args.total_shards, args.particionar) if args.total_shards > 1 else setores['tic'].to_list()
+
+betas = {}
+if args.beta_local:
+    calculo_beta = CalculoBeta([f"{acao}.SA" for acao in acoes], anos=args.beta_anos, frequencia=args.beta_frequencia, ajuste_blume=not args.sem_ajuste_blume)
+    betas = {ticker.removesuffix('.SA'): beta for ticker, beta in calculo_beta.betas().items()}
+    print(f"Betas calculados localmente: {len(betas)} de {len(acoes)}", file=saida_logs)
+
+# Cotação atual de todas as ações em uma única requisição, em vez do histórico de 10 anos de cada uma
+cotacoes = {ticker.removesuffix('.SA'): preco for ticker, preco in CotacoesAtuais([f"{acao}.SA" for acao in acoes]).cotacoes().items()}
+print(f"Cotações obtidas em lote: {len(cotacoes)} de {len(acoes)}", file=saida_logs)
+
+escritores = [EscritorCSV(arquivo_parcial), EscritorParquet(arquivo_parcial_parquet, arquivo_parcial_projecoes)]
+if args.jsonl:
+    escritores.append(EscritorJSONL(sys.stdout))
+# O lote não guarda as linhas nem as projeções: tudo vai para os escritores e a memória não cresce com a quantidade de ações
+lote = ValuationLote(
+    acoes,
+    max_workers=args.workers,
+    timeout_acao=args.timeout,
+    modo=modo_dados,
+    idade_maxima=IDADE_MAXIMA_DADOS,
+    anteriores=anteriores,
+    impressoes_anteriores=impressoes_anteriores,
+    checkpoint=arquivo_checkpoint,
+    retomar=args.resume,
+    escritores=escritores,
+    manter_resultados=False,
+    ttm=args.ttm,
+    betas=betas,
+    cotacoes=cotacoes,
+)
+try:
+    # As mensagens impressas pelas ações durante a rodada também seguem os logs
+    with contextlib.redirect_stdout(saida_logs):
+        lote.rodar()
+finally:
+    for escritor in escritores:
+        escritor.fechar()
+data_valores = pd.read_csv(arquivo_parcial, float_precision='round_trip')
+print(f"Ações retomadas do checkpoint: {len(lote.retomadas)}", file=saida_logs)
+print(f"Chamadas ao provedor de dados: {dict(provedor.chamadas)}", file=saida_logs)
+print(f"Ações reaproveitadas sem recálculo: {len(lote.reaproveitadas)} de {len(acoes)}", file=saida_logs)
+
+if args.instrumentar:
+    instrumentacao.exportar_jsonl(pasta_saida / 'instrumentacao.jsonl')
+    instrumentacao.exportar_chrome_trace(pasta_saida / 'instrumentacao_trace.json')
+    with pd.option_context('display.width', 200, 'display.max_rows', None, 'display.float_format', '{:.2f}'.format):
+        print("Tempo por etapa e por chamada externa:", file=saida_logs)
+        print(instrumentacao.resumo().to_string(index=False), file=saida_logs)
+        print("Ações mais lentas:", file=saida_logs)
+        print(instrumentacao.resumo_acoes().head(20).to_string(index=False), file=saida_logs)
+
+# Ações reaproveitadas no modo incremental mantêm as projeções da rodada anterior
+projecoes = pd.read_parquet(arquivo_parcial_projecoes) if arquivo_parcial_projecoes.exists() else lote.tabela_projecoes()
+if lote.reaproveitadas and arquivo_projecoes.exists():
+    projecoes_anteriores = pd.read_parquet(arquivo_projecoes, filters=[('acao', 'in', lote.reaproveitadas)])
+    projecoes = pd.concat([projecoes, projecoes_anteriores], ignore_index=True).astype(projecoes.dtypes)
+
+# Salvar arquivos (um shard grava só as impressões das suas ações; o --merge junta com as anteriores)
+impressoes = lote.impressoes if em_shards else {**impressoes_anteriores, **lote.impressoes}
+salvar_resultados(pasta_saida, data_valores, projecoes, impressoes, historico=not em_shards)
+for arquivo in (arquivo_parcial, arquivo_parcial_parquet, arquivo_parcial_projecoes):
+    arquivo.unlink(missing_ok=True)
+
+# O checkpoint só é mantido quando alguma ação falhou, para o --resume tentar de novo só essas
+if lote.erros:
+    print(f"Ações com erro ({len(lote.erros)}): {', '.join(lote.erros)}. Rode de novo com --resume para tentar só essas.", file=saida_logs)
+    if lote.presas:
+        print(f"Aguardando as requisições das ações expiradas ainda em andamento: {', '.join(lote.presas)}", file=saida_logs)
+else:
+    arquivo_checkpoint.unlink(missing_ok=True)
\ No newline at end of file
@@ -1,19 +1,176 @@
-from .calculo_wacc import CalculoWACC
-from .indicadores_financeiros import IndicadoresFinanceiros
-from .necessidade_capital_giro import NecessidadeCapitalGiro
-from .outros_ativos_nao_operecionais import OutrosAtivosNaoOperacionais
-from .passivos_menos_divida import PassivoTotalMenosDivida
-from .variacao_receita import VariacaoReceita
-from .valuation_fluxo_caixa_descontado import ValuationFluxoCaixaDescontado
-from .valuation_metodo_gordon import ValuationModoloGordon
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .armazenamento_fundamentos import ArmazenamentoFundamentos
+    from .dados_empresa import DadosEmpresa
+    from .instrumentacao import Instrumentacao, configurar_instrumentacao
+    from .provedores import (
+        ProvedorDados,
+        ProvedorGravacao,
+        ProvedorReproducao,
+        ProvedorYahoo,
+        configurar_provedor,
+        criar_provedor,
+    )
+    from .dados_macro import DadosMacro, configurar_dados_macro
+    from .calculo_wacc import CalculoWACC
+    from .calculo_beta import FREQUENCIAS_BETA, CalculoBeta
+    from .cotacoes import CotacoesAtuais
+    from .indicadores_financeiros import IndicadoresFinanceiros
+    from .necessidade_capital_giro import NecessidadeCapitalGiro
+    from .outros_ativos_nao_operecionais import OutrosAtivosNaoOperacionais
+    from .passivos_menos_divida import PassivoTotalMenosDivida
+    from .variacao_receita import VariacaoReceita, VariacaoReceitaLote
+    from .valuation_fluxo_caixa_descontado import ValuationFluxoCaixaDescontado
+    from .valuation_fluxo_caixa_vetorizado import (
+        ValuationFluxoCaixaDescontadoVetorizado,
+    )
+    from .valuation_monte_carlo import (
+        Distribuicao,
+        ValuationMonteCarlo,
+        simular_acoes,
+    )
+    from .valuation_multiestagio import (
+        ValuationFluxoCaixaMultiestagio,
+        trajetoria_estagios,
+    )
+    from .valuation_gordon_vetorizado import ValuationGordonVetorizado
+    from .valuation_metodo_gordon import ValuationModoloGordon
+    from .valuation_lote import ValuationLote, entradas_fluxo_caixa
+    from .saida_valuations import salvar_parquet, tabela_projecoes, tabela_resultados
+    from .historico_valuations import HistoricoValuations
+    from .dcf_reverso import INTERVALOS_DCF_REVERSO, STATUS_DCF_REVERSO, DCFReverso
+    from .escritores import (
+        EscritorCSV,
+        EscritorJSONL,
+        EscritorParquet,
+        EscritorResultados,
+    )
+    from .particionamento import (
+        dividir_acoes,
+        juntar_tabelas,
+        pasta_shard,
+        pastas_shards,
+        selecionar_shard,
+    )
+
+# Importação preguiçosa (PEP 562): `import fundamentos` não carrega pandas,
+# yfinance, ipeadatapy nem sidrapy. Cada classe é importada do seu módulo no
+# primeiro acesso, então usar só os motores de cálculo (ex.:
+# ValuationFluxoCaixaDescontadoVetorizado) carrega apenas o NumPy.
+_MODULOS = {
+    "ArmazenamentoFundamentos": ".armazenamento_fundamentos",
+    "DadosEmpresa": ".dados_empresa",
+    "Instrumentacao": ".instrumentacao",
+    "configurar_instrumentacao": ".instrumentacao",
+    "ProvedorDados": ".provedores",
+    "ProvedorGravacao": ".provedores",
+    "ProvedorReproducao": ".provedores",
+    "ProvedorYahoo": ".provedores",
+    "configurar_provedor": ".provedores",
+    "criar_provedor": ".provedores",
+    "DadosMacro": ".dados_macro",
+    "configurar_dados_macro": ".dados_macro",
+    "CalculoWACC": ".calculo_wacc",
+    "CalculoBeta": ".calculo_beta",
+    "FREQUENCIAS_BETA": ".calculo_beta",
+    "CotacoesAtuais": ".cotacoes",
+    "IndicadoresFinanceiros": ".indicadores_financeiros",
+    "NecessidadeCapitalGiro": ".necessidade_capital_giro",
+    "OutrosAtivosNaoOperacionais": ".outros_ativos_nao_operecionais",
+    "PassivoTotalMenosDivida": ".passivos_menos_divida",
+    "VariacaoReceita": ".variacao_receita",
+    "VariacaoReceitaLote": ".variacao_receita",
+    "ValuationFluxoCaixaDescontado": ".valuation_fluxo_caixa_descontado",
+    "ValuationFluxoCaixaDescontadoVetorizado": ".valuation_fluxo_caixa_vetorizado",
+    "Distribuicao": ".valuation_monte_carlo",
+    "ValuationMonteCarlo": ".valuation_monte_carlo",
+    "simular_acoes": ".valuation_monte_carlo",
+    "ValuationFluxoCaixaMultiestagio": ".valuation_multiestagio",
+    "trajetoria_estagios": ".valuation_multiestagio",
+    "ValuationGordonVetorizado": ".valuation_gordon_vetorizado",
+    "ValuationModoloGordon": ".valuation_metodo_gordon",
+    "ValuationLote": ".valuation_lote",
+    "entradas_fluxo_caixa": ".valuation_lote",
+    "salvar_parquet": ".saida_valuations",
+    "tabela_projecoes": ".saida_valuations",
+    "tabela_resultados": ".saida_valuations",
+    "HistoricoValuations": ".historico_valuations",
+    "DCFReverso": ".dcf_reverso",
+    "INTERVALOS_DCF_REVERSO": ".dcf_reverso",
+    "STATUS_DCF_REVERSO": ".dcf_reverso",
+    "EscritorResultados": ".escritores",
+    "EscritorCSV": ".escritores",
+    "EscritorJSONL": ".escritores",
+    "EscritorParquet": ".escritores",
+    "dividir_acoes": ".particionamento",
+    "juntar_tabelas": ".particionamento",
+    "pasta_shard": ".particionamento",
+    "pastas_shards": ".particionamento",
+    "selecionar_shard": ".particionamento",
+}
 
 __all__ = [
+    "ArmazenamentoFundamentos",
+    "DadosEmpresa",
+    "Instrumentacao",
+    "configurar_instrumentacao",
+    "ProvedorDados",
+    "ProvedorYahoo",
+    "ProvedorGravacao",
+    "ProvedorReproducao",
+    "configurar_provedor",
+    "criar_provedor",
+    "DadosMacro",
+    "configurar_dados_macro",
     "IndicadoresFinanceiros",
     "CalculoWACC",
+    "CalculoBeta",
+    "FREQUENCIAS_BETA",
+    "CotacoesAtuais",
     "VariacaoReceita",
+    "VariacaoReceitaLote",
     "OutrosAtivosNaoOperacionais",
     "PassivoTotalMenosDivida",
     "NecessidadeCapitalGiro",
     "ValuationFluxoCaixaDescontado",
+    "ValuationFluxoCaixaDescontadoVetorizado",
+    "Distribuicao",
+    "ValuationMonteCarlo",
+    "simular_acoes",
+    "ValuationFluxoCaixaMultiestagio",
+    "trajetoria_estagios",
     "ValuationModoloGordon",
+    "ValuationGordonVetorizado",
+    "ValuationLote",
+    "entradas_fluxo_caixa",
+    "tabela_resultados",
+    "tabela_projecoes",
+    "salvar_parquet",
+    "HistoricoValuations",
+    "DCFReverso",
+    "INTERVALOS_DCF_REVERSO",
+    "STATUS_DCF_REVERSO",
+    "EscritorResultados",
+    "EscritorCSV",
+    "EscritorJSONL",
+    "EscritorParquet",
+    "dividir_acoes",
+    "selecionar_shard",
+    "pasta_shard",
+    "pastas_shards",
+    "juntar_tabelas",
 ]
+
+
+def __getattr__(nome: str) -> Any:
+    if nome not in _MODULOS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(_MODULOS[nome], __name__), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,173 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+DIRETORIO_PADRAO = Path(__file__).resolve().parent.parent / "dados" / "fundamentos"
+
+MODOS_DADOS = ("online", "cache", "offline")
+
+# Uma trava por diretório, compartilhada por todas as instâncias que apontam
+# para ele: várias threads gravam o mesmo metadados.json
+_TRAVAS_DIRETORIOS: Dict[Path, threading.Lock] = {}
+_TRAVA_DIRETORIOS = threading.Lock()
+
+
+def _trava_diretorio(diretorio: Path) -> threading.Lock:
+    with _TRAVA_DIRETORIOS:
+        return _TRAVAS_DIRETORIOS.setdefault(diretorio.resolve(), threading.Lock())
+
+
+def _temporario(caminho: Path) -> Path:
+    # Nome único na mesma pasta (os.replace exige o mesmo sistema de arquivos)
+    with tempfile.NamedTemporaryFile(
+        dir=caminho.parent, prefix=f"{caminho.name}.", suffix=".tmp", delete=False
+    ) as arquivo:
+        return Path(arquivo.name)
+
+
+def validar_modo(modo: str) -> str:
+    if modo not in MODOS_DADOS:
+        raise ValueError(
+            f"Erro: Modo '{modo}' inválido, use um de {', '.join(MODOS_DADOS)}."
+        )
+    return modo
+
+
+# Armazenamento local em Parquet dos dados baixados do Yahoo, IPEA e SIDRA.
+# Cada ticker tem sua pasta com um arquivo por demonstrativo, o info em JSON e
+# um metadados.json com a data de coleta de cada item.
+class ArmazenamentoFundamentos:
+    def __init__(self, diretorio: str | Path = DIRETORIO_PADRAO) -> None:
+        self.diretorio = Path(diretorio)
+        self._trava = _trava_diretorio(self.diretorio)
+
+    def pasta(self, grupo: str) -> Path:
+        return self.diretorio / grupo
+
+    def _escrever(self, caminho: Path, conteudo: str) -> None:
+        # Escrita atômica para não deixar arquivos pela metade
+        temporario = _temporario(caminho)
+        temporario.write_text(conteudo, encoding="utf-8")
+        os.replace(temporario, caminho)
+
+    def _metadados(self, grupo: str) -> Dict[str, str]:
+        caminho = self.pasta(grupo) / "metadados.json"
+        if not caminho.exists():
+            return {}
+        metadados: Dict[str, str] = json.loads(caminho.read_text(encoding="utf-8"))
+        return metadados
+
+    def _registrar_coleta(self, grupo: str, chave: str) -> None:
+        with self._trava:
+            metadados = self._metadados(grupo)
+            metadados[chave] = datetime.now().isoformat(timespec="seconds")
+            self._escrever(
+                self.pasta(grupo) / "metadados.json", json.dumps(metadados, indent=2)
+            )
+
+    def data_coleta(self, grupo: str, chave: str) -> Optional[datetime]:
+        data = self._metadados(grupo).get(chave)
+        if data is None:
+            return None
+        return datetime.fromisoformat(data)
+
+    def atualizado(
+        self, grupo: str, chave: str, idade_maxima: Optional[timedelta] = None
+    ) -> bool:
+        data = self.data_coleta(grupo, chave)
+        if data is None:
+            return False
+        if idade_maxima is None:
+            return True
+        return datetime.now() - data <= idade_maxima
+
+    def salvar_tabela(self, grupo: str, chave: str, tabela: pd.DataFrame) -> None:
+        pasta = self.pasta(grupo)
+        pasta.mkdir(parents=True, exist_ok=True)
+        caminho = pasta / f"{chave}.parquet"
+        temporario = _temporario(caminho)
+        tabela.to_parquet(temporario)
+        os.replace(temporario, caminho)
+        self._registrar_coleta(grupo, chave)
+
+    def ler_tabela(self, grupo: str, chave: str) -> Optional[pd.DataFrame]:
+        caminho = self.pasta(grupo) / f"{chave}.parquet"
+        if not caminho.exists():
+            return None
+        return pd.read_parquet(caminho)
+
+    def salvar_demonstrativo(
+        self, ticker: str, chave: str, demonstrativo: pd.DataFrame
+    ) -> None:
+        # O Parquet exige nomes de coluna em texto: as datas viram linhas
+        tabela = demonstrativo.T.astype(float)
+        tabela.index.name = "data"
+        self.salvar_tabela(ticker, chave, tabela)
+
+    def ler_demonstrativo(self, ticker: str, chave: str) -> Optional[pd.DataFrame]:
+        tabela = self.ler_tabela(ticker, chave)
+        if tabela is None:
+            return None
+        demonstrativo = tabela.T
+        demonstrativo.columns.name = None
+        return demonstrativo
+
+    def salvar_serie(self, grupo: str, chave: str, serie: pd.Series) -> None:
+        self.salvar_tabela(grupo, chave, serie.to_frame(name=serie.name or chave))
+
+    def ler_serie(self, grupo: str, chave: str) -> Optional[pd.Series]:
+        tabela = self.ler_tabela(grupo, chave)
+        if tabela is None:
+            return None
+        return tabela.iloc[:, 0]
+
+    def salvar_json(self, grupo: str, chave: str, conteudo: Any) -> None:
+        pasta = self.pasta(grupo)
+        pasta.mkdir(parents=True, exist_ok=True)
+        self._escrever(pasta / f"{chave}.json", json.dumps(conteudo, default=str))
+        self._registrar_coleta(grupo, chave)
+
+    def ler_json(self, grupo: str, chave: str) -> Optional[Any]:
+        caminho = self.pasta(grupo) / f"{chave}.json"
+        if not caminho.exists():
+            return None
+        return json.loads(caminho.read_text(encoding="utf-8"))
+
+    def obter(
+        self,
+        grupo: str,
+        chave: str,
+        tipo: str,
+        baixar: Callable[[], Any],
+        modo: str = "cache",
+        idade_maxima: Optional[timedelta] = None,
+    ) -> Any:
+        # tipo indica o formato gravado: "demonstrativo", "serie", "tabela" ou "json"
+        if modo != "online":
+            limite = idade_maxima if modo == "cache" else None
+            if self.atualizado(grupo, chave, limite):
+                valor = getattr(self, f"ler_{tipo}")(grupo, chave)
+                if valor is not None:
+                    return valor
+        if modo == "offline":
+            raise ValueError(
+                f"Erro: '{chave}' de {grupo} não está no armazenamento local."
+            )
+        valor = baixar()
+        getattr(self, f"salvar_{tipo}")(grupo, chave, valor)
+        return valor
+
+    def tickers(self) -> list[str]:
+        if not self.diretorio.exists():
+            return []
+        return sorted(
+            pasta.name
+            for pasta in self.diretorio.iterdir()
+            if pasta.is_dir() and not pasta.name.startswith("_")
+        )
@@ -0,0 +1,113 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .memorizacao import memorizar
+from .provedores import FUSO_B3, INDICE_MERCADO, ProvedorDados, obter_provedor
+
+# Regra de reamostragem de cada frequência (None: retornos diários)
+FREQUENCIAS_BETA: Dict[str, Optional[str]] = {
+    "diaria": None,
+    "semanal": "W-FRI",
+    "mensal": "ME",
+}
+
+# Ajuste de Blume: aproxima o beta medido de 1, para onde os betas tendem a
+# voltar com o tempo
+PESO_BLUME = 2 / 3
+
+
+# Betas de todas as ações contra o IBOVESPA a partir de um único download dos
+# fechamentos diários (ações e ^BVSP juntos). Os retornos de todas as ações
+# formam uma matriz (períodos x ações) e covariâncias e variâncias saem de uma
+# vez, período a período só onde a ação e o índice têm cotação. Ações com
+# menos de minimo_observacoes retornos ficam sem beta (NaN).
+class CalculoBeta:
+    def __init__(
+        self,
+        tickers: Sequence[str],
+        anos: float = 2,
+        frequencia: str = "semanal",
+        ajuste_blume: bool = True,
+        data_final: Optional[date] = None,
+        minimo_observacoes: int = 52,
+        indice: str = INDICE_MERCADO,
+        provedor: Optional[ProvedorDados] = None,
+    ):
+        if frequencia not in FREQUENCIAS_BETA:
+            raise ValueError(
+                f"Erro: Frequência '{frequencia}' inválida, use uma de "
+                f"{', '.join(FREQUENCIAS_BETA)}."
+            )
+        self.tickers: List[str] = list(dict.fromkeys(tickers))
+        self.anos = anos
+        self.frequencia = frequencia
+        self.ajuste_blume = ajuste_blume
+        self.data_final = data_final or datetime.now(FUSO_B3).date()
+        self.minimo_observacoes = minimo_observacoes
+        self.indice = indice
+        self.provedor = provedor if provedor is not None else obter_provedor()
+
+    @property
+    def data_inicial(self) -> date:
+        return (
+            pd.Timestamp(self.data_final)
+            - pd.DateOffset(days=round(self.anos * 365.25))
+        ).date()
+
+    @memorizar
+    def fechamentos(self) -> pd.DataFrame:
+        return self.provedor.fechamentos(
+            [*self.tickers, self.indice],
+            self.data_inicial.isoformat(),
+            self.data_final.isoformat(),
+        )
+
+    @memorizar
+    def retornos(self) -> pd.DataFrame:
+        fechamentos = self.fechamentos()
+        regra = FREQUENCIAS_BETA[self.frequencia]
+        if regra is not None:
+            fechamentos = fechamentos.resample(regra).last()
+        return fechamentos.pct_change(fill_method=None).iloc[1:]
+
+    @memorizar
+    def tabela(self) -> pd.DataFrame:
+        retornos = self.retornos()
+        acoes = retornos.reindex(columns=self.tickers).to_numpy(dtype=float)
+        mercado = retornos[self.indice].to_numpy(dtype=float)[:, np.newaxis]
+
+        validos = np.isfinite(acoes) & np.isfinite(mercado)
+        observacoes = validos.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            acoes = np.where(validos, acoes, 0.0)
+            mercado = np.where(validos, mercado, 0.0)
+            media_acoes = acoes.sum(axis=0) / observacoes
+            media_mercado = mercado.sum(axis=0) / observacoes
+            desvio_acoes = np.where(validos, acoes - media_acoes, 0.0)
+            desvio_mercado = np.where(validos, mercado - media_mercado, 0.0)
+            covariancia = (desvio_acoes * desvio_mercado).sum(axis=0)
+            variancia = (desvio_mercado**2).sum(axis=0)
+            beta_bruto = covariancia / variancia
+
+        beta_bruto = np.where(
+            (observacoes >= self.minimo_observacoes) & (variancia > 0),
+            beta_bruto,
+            np.nan,
+        )
+        beta = (
+            PESO_BLUME * beta_bruto + (1 - PESO_BLUME)
+            if self.ajuste_blume
+            else beta_bruto
+        )
+        return pd.DataFrame(
+            {"beta": beta, "beta_bruto": beta_bruto, "observacoes": observacoes},
+            index=pd.Index(self.tickers, name="ticker"),
+        )
+
+    def betas(self) -> Dict[str, float]:
+        # Só as ações com beta calculado
+        beta = self.tabela()["beta"].dropna()
+        return {str(ticker): float(valor) for ticker, valor in beta.items()}
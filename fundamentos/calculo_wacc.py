@@ -1,57 +1,42 @@
-import yfinance as yf
+import math
 import pandas as pd
-import ipeadatapy as ip
 from datetime import datetime
+from typing import Optional
+from .dados_empresa import DadosEmpresa
+from .dados_macro import dados_macro
+from .memorizacao import memorizar
 
 
+# Cada etapa é memorizada por instância: wacc() chama valor_mercado(),
+# calculo_divida() e as demais várias vezes, mas cada uma é calculada uma vez.
 class CalculoWACC:
     def __init__(
         self,
         ticker: str,
         start_date_retorno: str = "2004-01-01",
         end_date_retorno: str = datetime.today().strftime("%Y-%m-%d"),
+        dados: Optional[DadosEmpresa] = None,
+        beta: Optional[float] = None,
     ):
         self.ticker = ticker
-        self.empresa = yf.Ticker(ticker)
+        self.empresa = dados if dados is not None else DadosEmpresa(ticker)
+        # Beta calculado fora (ex.: CalculoBeta contra o IBOVESPA); sem ele,
+        # usa o beta do info do Yahoo
+        self.beta = beta
         self.start_date_retorno = start_date_retorno
         self.end_date_retorno = end_date_retorno
 
+    @memorizar
     def juros_livre(self) -> float:
-        juros = (
-            ip.timeseries("BMF12_SWAPDI36012")
-            .rename(columns={"VALUE ((% a.a.))": "swaps"})[["swaps"]]
-            .div(100)
-            .iloc[-1]
-            .swaps
-        )
-        if juros is None:
-            raise ValueError("Erro: Não foi possível obter os juros livres.")
-        return float(juros)
+        return dados_macro.juros_livre()
 
+    @memorizar
     def retorno_mercado(self) -> float:
-        ibov = yf.download(
-            "^BVSP", start=self.start_date_retorno, end=self.end_date_retorno
+        return dados_macro.retorno_mercado(
+            self.start_date_retorno, self.end_date_retorno
         )
 
-        if ibov is None or ibov.empty:
-            raise ValueError("Erro: Nenhum dado foi baixado para o IBOVESPA.")
-
-        # Garantir que a coluna 'Close' existe
-        if "Close" not in ibov.columns:
-            raise ValueError("Erro: A coluna 'Close' não está presente nos dados.")
-
-        porcentagem = ibov.pct_change()["Close"]
-
-        porcentagem.dropna(axis=0, inplace=True)
-
-        compounded_growth = (1 + porcentagem).prod()
-
-        n_periods = porcentagem.shape[0]
-
-        retorno_medio = compounded_growth ** (252 / n_periods) - 1
-
-        return float(retorno_medio["^BVSP"])
-
+    @memorizar
     def valor_mercado(self) -> float:
         market_cap = self.empresa.info.get("marketCap", 0)
         if market_cap is None:
@@ -60,12 +45,14 @@ class CalculoWACC:
         # Certifique-se de que juros é um float
         return float(market_cap)
 
+    @memorizar
     def valor_total_empresa(self) -> float:
         enterprise_value = self.empresa.info.get("enterpriseValue", 0)
         if enterprise_value is None:
             raise ValueError("Erro: Não foi possível obter o valor total da empresa.")
         return float(enterprise_value)
 
+    @memorizar
     def calculo_divida(self) -> float:
         debt = (
             self.valor_total_empresa() - self.valor_mercado()
@@ -76,12 +63,16 @@ class CalculoWACC:
             raise ValueError("Erro: Não foi possível obter o valor total da empresa.")
         return float(debt)
 
+    @memorizar
     def beta_empresa(self) -> float:
+        if self.beta is not None and not math.isnan(self.beta):
+            return float(self.beta)
         beta = self.empresa.info.get("beta", 1)
         if beta is None:
             raise ValueError("Erro: Não foi possível obter o beta da empresa.")
         return float(beta)
 
+    @memorizar
     def custo_patrimonio(self) -> float:
         cost_of_equity = (
             self.juros_livre() + self.beta_empresa() * self.retorno_mercado()
@@ -90,6 +81,7 @@ class CalculoWACC:
             raise ValueError("Erro: Não foi possível obter o custo do patrimônio.")
         return float(cost_of_equity)
 
+    @memorizar
     def despesas_juros(self) -> float:
         financials = self.empresa.get_financials()
 
@@ -110,12 +102,14 @@ class CalculoWACC:
 
         return float(df_financials.loc["InterestExpense"].values[0])
 
+    @memorizar
     def total_divida(self) -> float:
         total_debt = self.empresa.info.get("totalDebt", 0)
         if total_debt is None:
             raise ValueError("Erro: Não foi possível obter o total da divida.")
         return float(total_debt)
 
+    @memorizar
     def custo_divida(self) -> float:
         cost_of_debt = (
             (self.despesas_juros() / self.total_divida())
@@ -124,12 +118,14 @@ class CalculoWACC:
         )
         return cost_of_debt
 
+    @memorizar
     def custo_imposto(self) -> float:
         tax_provision = self.empresa.financials.loc["Tax Provision"].values[0]
         pretax_income = self.empresa.financials.loc["Pretax Income"].values[0]
         tax_rate = tax_provision / pretax_income if pretax_income else 0.30
         return tax_rate
 
+    @memorizar
     def wacc(self) -> float:
         V = (
             self.valor_mercado() + self.calculo_divida()
@@ -0,0 +1,36 @@
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from .memorizacao import memorizar
+from .provedores import ProvedorDados, obter_provedor
+
+
+# Cotação atual de todas as ações em uma única requisição ao provedor (o
+# último fechamento dos últimos pregões), em vez de baixar dez anos de
+# histórico de cada ação só para usar o último valor. Ações sem cotação ficam
+# de fora de cotacoes() e quem consome (ValuationModoloGordon, ValuationLote)
+# volta para o histórico.
+class CotacoesAtuais:
+    def __init__(
+        self,
+        tickers: Sequence[str],
+        provedor: Optional[ProvedorDados] = None,
+    ):
+        self.tickers: List[str] = list(dict.fromkeys(tickers))
+        self.provedor = provedor if provedor is not None else obter_provedor()
+
+    @memorizar
+    def precos(self) -> pd.Series:
+        return self.provedor.cotacoes(self.tickers)
+
+    def preco(self, ticker: str) -> Optional[float]:
+        preco = self.precos().get(ticker)
+        if preco is None or pd.isna(preco):
+            return None
+        return float(preco)
+
+    def cotacoes(self) -> Dict[str, float]:
+        # Só as ações com cotação
+        precos = self.precos().dropna()
+        return {str(ticker): float(valor) for ticker, valor in precos.items()}
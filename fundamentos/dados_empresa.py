@@ -0,0 +1,244 @@
+import hashlib
+from datetime import timedelta
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .armazenamento_fundamentos import ArmazenamentoFundamentos, validar_modo
+from .provedores import ProvedorDados, obter_provedor
+
+# Linhas somadas nos últimos doze meses (TTM): só fluxos do período, que podem
+# ser somados trimestre a trimestre (ao contrário de ações médias, LPA etc.)
+LINHAS_TTM: Dict[str, Tuple[str, ...]] = {
+    "financials": (
+        "Total Revenue",
+        "EBIT",
+        "Pretax Income",
+        "Tax Provision",
+        "Depreciation And Amortization",
+        "Reconciled Depreciation",
+    ),
+    "cashflow": ("Capital Expenditure",),
+}
+
+
+def somar_ttm(tabela: pd.DataFrame, linhas: Sequence[str]) -> pd.DataFrame:
+    # Soma móvel de quatro trimestres de todas as linhas de uma vez. Os
+    # trimestres são reindexados em sequência: um trimestre faltando vira NaN e
+    # invalida as janelas que passam por ele. As colunas ficam da mais recente
+    # para a mais antiga, como nos demonstrativos anuais.
+    linhas = [linha for linha in linhas if linha in tabela.index]
+    if not linhas or tabela.columns.empty:
+        return pd.DataFrame(index=linhas, dtype=float)
+    trimestres = tabela.loc[linhas].astype(float).T
+    trimestres.index = pd.to_datetime(trimestres.index).to_period("Q")
+    trimestres = trimestres[~trimestres.index.duplicated()].sort_index()
+    sequencia = pd.period_range(trimestres.index[0], trimestres.index[-1], freq="Q")
+    somas = (
+        trimestres.reindex(sequencia).rolling(4, min_periods=4).sum().dropna(how="all")
+    )
+    somas.index = pd.PeriodIndex(somas.index).to_timestamp(how="end").normalize()
+    return somas.iloc[::-1].T
+
+
+def valor_recente(tabela: pd.DataFrame, linha: str) -> float:
+    # Valor da coluna mais recente (a primeira) de uma linha do demonstrativo
+    return float(tabela.loc[linha].to_numpy(dtype=float).ravel()[0])
+
+
+# Snapshot dos dados de uma empresa no Yahoo Finance: cada demonstrativo, o info,
+# os dividendos e as cotações são baixados uma única vez (pelo provedor de dados)
+# e compartilhados entre as classes. A interface imita a do yf.Ticker para ser
+# usada no lugar dele.
+#
+# Modos de coleta:
+#   - "online": sempre baixa do Yahoo (e grava no armazenamento, se informado);
+#   - "cache": lê do armazenamento local e só baixa o que faltar ou estiver
+#     mais velho que idade_maxima;
+#   - "offline": lê apenas do armazenamento local, sem acessar a rede.
+class DadosEmpresa:
+    ACRONIMOS: ClassVar[Dict[str, List[str]]] = {
+        "financials": ["EBIT", "EBITDA", "EPS", "NI"],
+        "balance_sheet": ["PPE"],
+        "cashflow": ["PPE"],
+    }
+
+    # Demonstrativos que definem a impressão digital da empresa
+    DEMONSTRATIVOS_IMPRESSAO = (
+        ("financials", "yearly"),
+        ("balance_sheet", "yearly"),
+        ("balance_sheet", "quarterly"),
+        ("cashflow", "yearly"),
+    )
+    # No modo TTM os valuations também dependem dos trimestres de resultado e
+    # de fluxo de caixa
+    DEMONSTRATIVOS_IMPRESSAO_TTM = DEMONSTRATIVOS_IMPRESSAO + (
+        ("financials", "quarterly"),
+        ("cashflow", "quarterly"),
+    )
+
+    def __init__(
+        self,
+        ticker: str,
+        modo: str = "online",
+        armazenamento: Optional[ArmazenamentoFundamentos] = None,
+        idade_maxima: Optional[timedelta] = None,
+        provedor: Optional[ProvedorDados] = None,
+    ) -> None:
+        self.ticker = ticker
+        self.modo = validar_modo(modo)
+        if armazenamento is None and self.modo != "online":
+            armazenamento = ArmazenamentoFundamentos()
+        self.armazenamento = armazenamento
+        self.idade_maxima = idade_maxima
+        self.provedor = provedor if provedor is not None else obter_provedor()
+        self._demonstrativos: Dict[str, pd.DataFrame] = {}
+        self._formatados: Dict[str, pd.DataFrame] = {}
+        self._info: Optional[Dict[str, Any]] = None
+        self._dividendos: Optional[pd.Series] = None
+        self._historico: Optional[pd.DataFrame] = None
+
+    def _obter(self, chave: str, tipo: str, baixar: Callable[[], Any]) -> Any:
+        if self.armazenamento is None:
+            return baixar()
+        return self.armazenamento.obter(
+            self.ticker, chave, tipo, baixar, self.modo, self.idade_maxima
+        )
+
+    def _baixar_demonstrativo(self, nome: str, freq: str) -> pd.DataFrame:
+        if nome not in self.ACRONIMOS:
+            raise ValueError(f"Erro: Demonstrativo desconhecido '{nome}'.")
+        return self.provedor.demonstrativo(self.ticker, nome, freq)
+
+    def demonstrativo(self, nome: str, freq: str = "yearly") -> pd.DataFrame:
+        # Nomes de linha crus do Yahoo (ex.: "TotalDebt")
+        chave = f"{nome}_{freq}"
+        if chave not in self._demonstrativos:
+            self._demonstrativos[chave] = self._obter(
+                chave, "demonstrativo", lambda: self._baixar_demonstrativo(nome, freq)
+            )
+        return self._demonstrativos[chave]
+
+    def demonstrativo_formatado(self, nome: str, freq: str = "yearly") -> pd.DataFrame:
+        # Nomes de linha formatados como no yf.Ticker (ex.: "Total Debt")
+        chave = f"{nome}_{freq}"
+        if chave not in self._formatados:
+            import yfinance as yf
+
+            formatado = self.demonstrativo(nome, freq).copy()
+            if not formatado.empty:
+                formatado.index = yf.utils.camel2title(
+                    formatado.index, sep=" ", acronyms=self.ACRONIMOS[nome]
+                )
+            self._formatados[chave] = formatado
+        return self._formatados[chave]
+
+    def get_financials(self, freq: str = "yearly") -> pd.DataFrame:
+        return self.demonstrativo("financials", freq)
+
+    def get_balancesheet(self, freq: str = "yearly") -> pd.DataFrame:
+        return self.demonstrativo("balance_sheet", freq)
+
+    def get_cashflow(self, freq: str = "yearly") -> pd.DataFrame:
+        return self.demonstrativo("cashflow", freq)
+
+    @property
+    def financials(self) -> pd.DataFrame:
+        return self.demonstrativo_formatado("financials")
+
+    @property
+    def balance_sheet(self) -> pd.DataFrame:
+        return self.demonstrativo_formatado("balance_sheet")
+
+    @property
+    def quarterly_balance_sheet(self) -> pd.DataFrame:
+        return self.demonstrativo_formatado("balance_sheet", freq="quarterly")
+
+    @property
+    def cashflow(self) -> pd.DataFrame:
+        return self.demonstrativo_formatado("cashflow")
+
+    @property
+    def quarterly_financials(self) -> pd.DataFrame:
+        return self.demonstrativo_formatado("financials", freq="quarterly")
+
+    @property
+    def quarterly_cashflow(self) -> pd.DataFrame:
+        return self.demonstrativo_formatado("cashflow", freq="quarterly")
+
+    def demonstrativo_ttm(self, nome: str) -> pd.DataFrame:
+        # Últimos doze meses de cada trimestre publicado, a partir de um único
+        # download do demonstrativo trimestral (linhas de LINHAS_TTM)
+        if nome not in LINHAS_TTM:
+            raise ValueError(f"Erro: Demonstrativo '{nome}' não tem versão TTM.")
+        chave = f"{nome}_ttm"
+        if chave not in self._formatados:
+            self._formatados[chave] = somar_ttm(
+                self.demonstrativo_formatado(nome, freq="quarterly"), LINHAS_TTM[nome]
+            )
+        return self._formatados[chave]
+
+    def _baixar_info(self) -> Dict[str, Any]:
+        return self.provedor.info(self.ticker)
+
+    def _baixar_dividendos(self) -> pd.Series:
+        return self.provedor.dividendos(self.ticker)
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        if self._info is None:
+            self._info = self._obter("info", "json", self._baixar_info)
+        return self._info
+
+    def get_info(self) -> Dict[str, Any]:
+        return self.info
+
+    @property
+    def dividends(self) -> pd.Series:
+        if self._dividendos is None:
+            self._dividendos = self._obter(
+                "dividends", "serie", self._baixar_dividendos
+            )
+        return self._dividendos
+
+    def historico(self) -> pd.DataFrame:
+        # Cotações diárias dos últimos 10 anos
+        if self._historico is None:
+            self._historico = self._obter(
+                "historico", "tabela", lambda: self.provedor.historico(self.ticker)
+            )
+        return self._historico
+
+    def carregar(self, ttm: bool = False) -> "DadosEmpresa":
+        # Baixa de uma vez tudo o que as classes de fundamentos utilizam
+        self.demonstrativo("financials")
+        self.demonstrativo("balance_sheet")
+        self.demonstrativo("balance_sheet", freq="quarterly")
+        self.demonstrativo("cashflow")
+        if ttm:
+            self.demonstrativo("financials", freq="quarterly")
+            self.demonstrativo("cashflow", freq="quarterly")
+        _ = self.info
+        _ = self.dividends
+        self.historico()
+        return self
+
+    def impressao_digital(self, ttm: bool = False) -> Dict[str, str]:
+        # Identifica o conteúdo dos demonstrativos: só muda quando a empresa
+        # publica um período novo ou o Yahoo revisa algum valor. Os valores
+        # são normalizados para float e as datas para texto, para que dados
+        # baixados e lidos do armazenamento gerem a mesma impressão.
+        conteudo = hashlib.sha256()
+        ultimo_periodo = ""
+        demonstrativos = (
+            self.DEMONSTRATIVOS_IMPRESSAO_TTM if ttm else self.DEMONSTRATIVOS_IMPRESSAO
+        )
+        periodo = ("financials", "quarterly" if ttm else "yearly")
+        for nome, freq in demonstrativos:
+            tabela = self.demonstrativo(nome, freq).astype(float).sort_index()
+            tabela.columns = [str(coluna)[:10] for coluna in tabela.columns]
+            conteudo.update(f"{nome}_{freq}".encode())
+            conteudo.update(tabela.to_csv().encode())
+            if (nome, freq) == periodo and len(tabela.columns):
+                ultimo_periodo = max(tabela.columns)
+        return {"ultimo_periodo": ultimo_periodo, "hash": conteudo.hexdigest()}
@@ -0,0 +1,198 @@
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .armazenamento_fundamentos import ArmazenamentoFundamentos, validar_modo
+from .provedores import obter_provedor, recortar_periodo
+
+
+def baixar_swap_di() -> pd.DataFrame:
+    swaps = (
+        obter_provedor()
+        .swap_di()
+        .rename(columns={"VALUE ((% a.a.))": "swaps"})[["swaps"]]
+        .div(100)
+    )
+    return swaps
+
+
+def calcular_juros_livre(swaps: pd.DataFrame) -> float:
+    juros = swaps.iloc[-1].swaps
+    if juros is None:
+        raise ValueError("Erro: Não foi possível obter os juros livres.")
+    return float(juros)
+
+
+def baixar_ibovespa(start_date: str, end_date: str) -> pd.Series:
+    return obter_provedor().ibovespa(start_date, end_date)
+
+
+def calcular_retorno_mercado(fechamento: pd.Series) -> float:
+    porcentagem = fechamento.pct_change()
+
+    porcentagem.dropna(axis=0, inplace=True)
+
+    compounded_growth = float(np.prod(1 + porcentagem.to_numpy(dtype=float)))
+
+    n_periods = porcentagem.shape[0]
+
+    retorno_medio = compounded_growth ** (252 / n_periods) - 1
+
+    return float(retorno_medio)
+
+
+def baixar_ipca() -> pd.DataFrame | None:
+    return obter_provedor().ipca()
+
+
+def processar_ipca_dezembro(ipca_raw: pd.DataFrame | None) -> pd.DataFrame | None:
+    if ipca_raw is None:
+        return None
+    # A primeira linha do SIDRA é o cabeçalho descritivo
+    ipca = ipca_raw.iloc[1:].copy()
+    ipca.loc[:, "data"] = pd.to_datetime(ipca["D2C"].astype(str), format="%Y%m")
+    ipca_mes_doze = ipca[ipca["data"].dt.month == 12].copy()
+    ipca_mes_doze.loc[:, "data_mes_ano"] = pd.to_datetime(
+        ipca_mes_doze["data"]
+    ).dt.strftime("%Y-%m")
+    ipca_dezembro: pd.DataFrame = ipca_mes_doze
+    return ipca_dezembro
+
+
+def calcular_indice_ipca(ipca_dezembro: pd.DataFrame | None) -> pd.Series:
+    # Índice acumulado do IPCA anual (valor de dezembro) indexado por "AAAA-MM":
+    # o IPCA acumulado entre dois fechamentos de ano é a razão entre os índices
+    if ipca_dezembro is None or ipca_dezembro.empty:
+        return pd.Series(dtype=float, name="indice_ipca")
+    variacao = ipca_dezembro.set_index("data_mes_ano")["V"].astype(float).sort_index()
+    return (1 + variacao / 100).cumprod().rename("indice_ipca")
+
+
+# Cache de processo para as séries macroeconômicas, que são as mesmas para
+# todas as empresas: cada valor é calculado uma vez e reaproveitado até o TTL
+# expirar. As travas por chave garantem um único download mesmo com threads.
+# Com modo "cache" ou "offline" as séries brutas também ficam no armazenamento
+# local (grupo "_macro"), do mesmo jeito que os dados de DadosEmpresa.
+class DadosMacro:
+    GRUPO = "_macro"
+
+    def __init__(
+        self,
+        ttl_segundos: float = 24 * 60 * 60,
+        modo: str = "online",
+        armazenamento: Optional[ArmazenamentoFundamentos] = None,
+        idade_maxima: Optional[timedelta] = None,
+    ) -> None:
+        self.ttl_segundos = ttl_segundos
+        self.modo = validar_modo(modo)
+        self.armazenamento = armazenamento
+        # Armazenamento usado nos modos cache/offline quando nenhum foi
+        # configurado, criado uma única vez para todas as séries
+        self._armazenamento_padrao: Optional[ArmazenamentoFundamentos] = None
+        self.idade_maxima = idade_maxima
+        self._valores: Dict[Hashable, Tuple[float, Any]] = {}
+        self._travas: Dict[Hashable, threading.Lock] = {}
+        self._trava = threading.Lock()
+
+    def _obter(self, chave: Hashable, calcular: Callable[[], Any]) -> Any:
+        with self._trava:
+            trava = self._travas.setdefault(chave, threading.Lock())
+        with trava:
+            registro = self._valores.get(chave)
+            if registro is not None:
+                momento, valor = registro
+                if time.monotonic() - momento < self.ttl_segundos:
+                    return valor
+            valor = calcular()
+            self._valores[chave] = (time.monotonic(), valor)
+            return valor
+
+    def _serie_bruta(self, chave: str, tipo: str, baixar: Callable[[], Any]) -> Any:
+        if self.modo == "online" and self.armazenamento is None:
+            return baixar()
+        armazenamento = self.armazenamento
+        if armazenamento is None:
+            with self._trava:
+                if self._armazenamento_padrao is None:
+                    self._armazenamento_padrao = ArmazenamentoFundamentos()
+                armazenamento = self._armazenamento_padrao
+        return armazenamento.obter(
+            self.GRUPO, chave, tipo, baixar, self.modo, self.idade_maxima
+        )
+
+    def juros_livre(self) -> float:
+        return float(
+            self._obter(
+                "juros_livre",
+                lambda: calcular_juros_livre(
+                    self._serie_bruta("swap_di", "tabela", baixar_swap_di)
+                ),
+            )
+        )
+
+    def ibovespa(self, start_date: str, end_date: str) -> pd.Series:
+        fechamento: pd.Series = self._obter(
+            ("ibovespa", start_date, end_date),
+            lambda: self._serie_bruta(
+                f"ibovespa_{start_date}_{end_date}",
+                "serie",
+                lambda: baixar_ibovespa(start_date, end_date),
+            ),
+        )
+        # Mesmo período semiaberto de todos os provedores
+        return recortar_periodo(fechamento, start_date, end_date)
+
+    def retorno_mercado(self, start_date: str, end_date: str) -> float:
+        return float(
+            self._obter(
+                ("retorno_mercado", start_date, end_date),
+                lambda: calcular_retorno_mercado(self.ibovespa(start_date, end_date)),
+            )
+        )
+
+    def ipca(self) -> pd.DataFrame | None:
+        ipca: pd.DataFrame | None = self._obter(
+            "ipca", lambda: self._serie_bruta("ipca", "tabela", baixar_ipca)
+        )
+        return ipca
+
+    def ipca_dezembro(self) -> pd.DataFrame | None:
+        ipca_dezembro: pd.DataFrame | None = self._obter(
+            "ipca_dezembro", lambda: processar_ipca_dezembro(self.ipca())
+        )
+        return ipca_dezembro
+
+    def indice_ipca(self) -> pd.Series:
+        indice: pd.Series = self._obter(
+            "indice_ipca", lambda: calcular_indice_ipca(self.ipca_dezembro())
+        )
+        return indice
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._valores.clear()
+
+
+dados_macro = DadosMacro()
+
+
+def configurar_dados_macro(
+    ttl_segundos: Optional[float] = None,
+    modo: Optional[str] = None,
+    armazenamento: Optional[ArmazenamentoFundamentos] = None,
+    idade_maxima: Optional[timedelta] = None,
+) -> DadosMacro:
+    if ttl_segundos is not None:
+        dados_macro.ttl_segundos = ttl_segundos
+    if modo is not None:
+        dados_macro.modo = validar_modo(modo)
+    if armazenamento is not None:
+        dados_macro.armazenamento = armazenamento
+    if idade_maxima is not None:
+        dados_macro.idade_maxima = idade_maxima
+    dados_macro.limpar()
+    return dados_macro
@@ -0,0 +1,255 @@
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .valuation_fluxo_caixa_vetorizado import (
+    ValuationFluxoCaixaDescontadoVetorizado,
+    Vetor,
+)
+
+# Intervalo padrão de busca de cada parâmetro. O wacc começa logo acima do
+# crescimento na perpetuidade de cada ação, onde a perpetuidade explode.
+INTERVALOS_DCF_REVERSO: Dict[str, Tuple[float, float]] = {
+    "porcenta_crescimento_receita": (-0.5, 1.0),
+    "wacc": (0.0, 1.0),
+    "margem_ebit": (-1.0, 1.0),
+}
+
+CONVERGIU = 0
+SEM_SOLUCAO = 1
+NAO_CONVERGIU = 2
+ENTRADA_INVALIDA = 3
+STATUS_DCF_REVERSO = ("convergiu", "sem_solucao", "nao_convergiu", "entrada_invalida")
+
+# Colunas de valores_valuations_acoes.csv usadas por DCFReverso.de_resultados
+COLUNAS_DCF_REVERSO = {
+    "receita_ano": "receita_ano",
+    "porcenta_crescimento_receita": "crescimento_receita",
+    "margem_ebit": "margem_ebit",
+    "imposto_porcentagem": "percentual_imposto",
+    "depreciacao_capex": "depreciacao_capex",
+    "capex_da_receita": "capex_receita",
+    "wacc": "wacc",
+    "numero_de_acoes": "quantidade_acoes",
+    "divida": "divida_total",
+    "disponivel": "caixa",
+    "ativos_nao_operacionais": "outros_ativos",
+    "passivos_circulantes": "passivos_menos_divida",
+    "preco_atual": "valor_atual",
+}
+
+
+# DCF reverso: qual crescimento da receita, wacc ou margem EBIT faz o fluxo de
+# caixa descontado chegar ao preço atual de cada ação. Todas as ações são
+# resolvidas juntas pelo método de Illinois (regula falsi com a ponta que não
+# se move pela metade), avaliando a cada iteração só as ações que ainda não
+# convergiram no motor vetorizado, sem arredondamentos. Cada ação termina com
+# um status: convergiu, sem_solucao (o preço não fica entre os valores das
+# pontas do intervalo), nao_convergiu (passou de max_iteracoes) ou
+# entrada_invalida (preço ou entradas faltando).
+class DCFReverso:
+    def __init__(
+        self,
+        receita_ano: ArrayLike,
+        porcenta_crescimento_receita: ArrayLike,
+        margem_ebit: ArrayLike,
+        imposto_porcentagem: ArrayLike,
+        depreciacao_capex: ArrayLike,
+        capex_da_receita: ArrayLike,
+        wacc: ArrayLike,
+        numero_de_acoes: ArrayLike,
+        divida: ArrayLike,
+        disponivel: ArrayLike,
+        ativos_nao_operacionais: ArrayLike,
+        passivos_circulantes: ArrayLike,
+        preco_atual: ArrayLike,
+        necessidade_capital_de_giro: ArrayLike = 0.0,
+        anos_projecao: int = 5,
+        taxa_crecimento_perpetuidade: ArrayLike = 0.014,
+        calculo_necessidade_capital_de_giro: bool = False,
+    ):
+        nomes = (
+            "receita_ano",
+            "porcenta_crescimento_receita",
+            "margem_ebit",
+            "imposto_porcentagem",
+            "depreciacao_capex",
+            "capex_da_receita",
+            "wacc",
+            "numero_de_acoes",
+            "divida",
+            "disponivel",
+            "ativos_nao_operacionais",
+            "passivos_circulantes",
+            "necessidade_capital_de_giro",
+            "taxa_crecimento_perpetuidade",
+            "preco_atual",
+        )
+        valores = np.broadcast_arrays(
+            *(
+                np.atleast_1d(np.asarray(valor, dtype=float))
+                for valor in (
+                    receita_ano,
+                    porcenta_crescimento_receita,
+                    margem_ebit,
+                    imposto_porcentagem,
+                    depreciacao_capex,
+                    capex_da_receita,
+                    wacc,
+                    numero_de_acoes,
+                    divida,
+                    disponivel,
+                    ativos_nao_operacionais,
+                    passivos_circulantes,
+                    necessidade_capital_de_giro,
+                    taxa_crecimento_perpetuidade,
+                    preco_atual,
+                )
+            )
+        )
+        self.entradas: Dict[str, Vetor] = {
+            nome: valor.reshape(-1) for nome, valor in zip(nomes, valores)
+        }
+        self.preco_atual = self.entradas.pop("preco_atual")
+        self.anos_projecao = anos_projecao
+        self.calculo_necessidade_capital_de_giro = calculo_necessidade_capital_de_giro
+
+    @classmethod
+    def de_resultados(cls, resultados: Any, **parametros: Any) -> "DCFReverso":
+        # resultados: DataFrame com as colunas de valores_valuations_acoes.csv
+        faltando = [
+            coluna
+            for coluna in COLUNAS_DCF_REVERSO.values()
+            if coluna not in resultados.columns
+        ]
+        if faltando:
+            raise ValueError(
+                f"Erro: Colunas ausentes nos resultados: {', '.join(faltando)}."
+            )
+        return cls(
+            **{
+                nome: resultados[coluna].to_numpy(dtype=float)
+                for nome, coluna in COLUNAS_DCF_REVERSO.items()
+            },
+            **parametros,
+        )
+
+    def valor_por_acao(
+        self,
+        parametro: Optional[str] = None,
+        valores: Optional[ArrayLike] = None,
+        indices: Optional[NDArray[np.intp]] = None,
+    ) -> Vetor:
+        # Valor por ação com `parametro` trocado por `valores`, só nas ações de
+        # `indices` (todas por padrão). wacc <= crescimento na perpetuidade dá NaN.
+        selecao = slice(None) if indices is None else indices
+        entradas = {nome: valor[selecao] for nome, valor in self.entradas.items()}
+        if parametro is not None:
+            entradas[parametro] = np.broadcast_to(
+                np.asarray(valores, dtype=float), entradas[parametro].shape
+            )
+        valuation = ValuationFluxoCaixaDescontadoVetorizado(
+            **entradas,
+            anos_projecao=self.anos_projecao,
+            calculo_necessidade_capital_de_giro=self.calculo_necessidade_capital_de_giro,
+            arredondar=False,
+        )
+        _, _, valor_por_acao = valuation.calculo_perpetudidade(
+            valuation.calcular_periodos()
+        )
+        return np.where(
+            entradas["wacc"] > entradas["taxa_crecimento_perpetuidade"],
+            valor_por_acao,
+            np.nan,
+        )
+
+    def resolver(
+        self,
+        parametro: str,
+        minimo: Optional[ArrayLike] = None,
+        maximo: Optional[ArrayLike] = None,
+        tolerancia: float = 1e-8,
+        tolerancia_preco: float = 1e-4,
+        max_iteracoes: int = 100,
+    ) -> Dict[str, NDArray[Any]]:
+        if parametro not in INTERVALOS_DCF_REVERSO:
+            raise ValueError(
+                f"Erro: Parâmetro '{parametro}' não suportado, use um de "
+                f"{', '.join(INTERVALOS_DCF_REVERSO)}."
+            )
+        padrao_minimo, padrao_maximo = INTERVALOS_DCF_REVERSO[parametro]
+        formato = self.preco_atual.shape
+        a = np.broadcast_to(
+            np.asarray(padrao_minimo if minimo is None else minimo, dtype=float),
+            formato,
+        ).copy()
+        b = np.broadcast_to(
+            np.asarray(padrao_maximo if maximo is None else maximo, dtype=float),
+            formato,
+        ).copy()
+        if parametro == "wacc":
+            perpetuidade = self.entradas["taxa_crecimento_perpetuidade"]
+            a = np.maximum(a, perpetuidade + 1e-6)
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            fa = self.valor_por_acao(parametro, a) - self.preco_atual
+            fb = self.valor_por_acao(parametro, b) - self.preco_atual
+
+            resultado = np.full(formato, np.nan)
+            iteracoes = np.zeros(formato, dtype=int)
+            status = np.full(formato, NAO_CONVERGIU)
+            invalidas = (
+                ~np.isfinite(self.preco_atual)
+                | (self.preco_atual <= 0)
+                | ~np.isfinite(fa)
+                | ~np.isfinite(fb)
+                | (a >= b)
+            )
+            status[invalidas] = ENTRADA_INVALIDA
+            status[~invalidas & (np.sign(fa) * np.sign(fb) > 0)] = SEM_SOLUCAO
+            for ponta, f_ponta in ((a, fa), (b, fb)):
+                exatas = (status == NAO_CONVERGIU) & (
+                    np.abs(f_ponta) <= tolerancia_preco
+                )
+                resultado[exatas] = ponta[exatas]
+                status[exatas] = CONVERGIU
+
+            ativas = np.flatnonzero(status == NAO_CONVERGIU)
+            for _ in range(max_iteracoes):
+                if ativas.size == 0:
+                    break
+                c = b[ativas] - fb[ativas] * (b[ativas] - a[ativas]) / (
+                    fb[ativas] - fa[ativas]
+                )
+                # Secante degenerada: usa o ponto médio (bisseção)
+                dentro = (c - a[ativas]) * (c - b[ativas]) <= 0
+                c = np.where(np.isfinite(c) & dentro, c, (a[ativas] + b[ativas]) / 2)
+                fc = (
+                    self.valor_por_acao(parametro, c, ativas) - self.preco_atual[ativas]
+                )
+                iteracoes[ativas] += 1
+
+                # A raiz fica entre b e c: b vira a ponta a. Senão a ponta a não
+                # se moveu de novo e seu valor cai pela metade (Illinois).
+                trocou = np.sign(fc) * np.sign(fb[ativas]) < 0
+                a[ativas] = np.where(trocou, b[ativas], a[ativas])
+                fa[ativas] = np.where(trocou, fb[ativas], fa[ativas] / 2)
+                b[ativas] = c
+                fb[ativas] = fc
+
+                convergiram = (np.abs(fc) <= tolerancia_preco) | (
+                    np.abs(b[ativas] - a[ativas]) <= tolerancia
+                )
+                # Valor fora do domínio no meio do intervalo (ex.: NaN)
+                perdidas = ~np.isfinite(fc)
+                status[ativas[convergiram & ~perdidas]] = CONVERGIU
+                resultado[ativas[convergiram & ~perdidas]] = c[convergiram & ~perdidas]
+                status[ativas[perdidas]] = ENTRADA_INVALIDA
+                ativas = ativas[~convergiram & ~perdidas]
+
+        return {
+            "valor": resultado,
+            "status": np.asarray(STATUS_DCF_REVERSO)[status],
+            "iteracoes": iteracoes,
+        }
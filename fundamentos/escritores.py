@@ -0,0 +1,165 @@
+import csv
+import json
+import math
+import sys
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Type
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .saida_valuations import COLUNAS_VALUATION, tabela_projecoes, tabela_resultados
+
+
+# Recebem cada resultado do ValuationLote assim que a ação termina, em vez de
+# esperar o fim da rodada. As escritas são protegidas por trava e cada linha
+# (ou lote pequeno de linhas, no Parquet) vai para o disco na hora, então a
+# memória não cresce com a quantidade de ações.
+class EscritorResultados(ABC):
+    def __init__(self) -> None:
+        self._trava = threading.Lock()
+        self.escritas = 0
+
+    def escrever(
+        self, linha: Dict[str, Any], projecao: Optional[pd.DataFrame] = None
+    ) -> None:
+        with self._trava:
+            self._escrever(linha, projecao)
+            self.escritas += 1
+
+    @abstractmethod
+    def _escrever(
+        self, linha: Dict[str, Any], projecao: Optional[pd.DataFrame]
+    ) -> None: ...
+
+    def fechar(self) -> None:
+        pass
+
+    def __enter__(self) -> "EscritorResultados":
+        return self
+
+    def __exit__(
+        self,
+        tipo: Optional[Type[BaseException]],
+        erro: Optional[BaseException],
+        rastro: Optional[TracebackType],
+    ) -> None:
+        self.fechar()
+
+
+class EscritorCSV(EscritorResultados):
+    # Mesmas colunas do CSV final, na ordem em que as ações terminam
+    def __init__(
+        self, caminho: str | Path, colunas: Sequence[str] = COLUNAS_VALUATION
+    ) -> None:
+        super().__init__()
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._arquivo = self.caminho.open("w", encoding="utf-8", newline="")
+        self._csv = csv.DictWriter(self._arquivo, fieldnames=list(colunas))
+        self._csv.writeheader()
+        self._arquivo.flush()
+
+    def _escrever(
+        self, linha: Dict[str, Any], projecao: Optional[pd.DataFrame]
+    ) -> None:
+        self._csv.writerow(
+            {coluna: linha.get(coluna) for coluna in self._csv.fieldnames}
+        )
+        self._arquivo.flush()
+
+    def fechar(self) -> None:
+        self._arquivo.close()
+
+
+def _valor_json(valor: Any) -> Any:
+    # NaN e infinito não existem em JSON: viram null
+    if isinstance(valor, dict):
+        return {str(chave): _valor_json(item) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_valor_json(item) for item in valor]
+    if isinstance(valor, np.integer):
+        return int(valor)
+    if isinstance(valor, (float, np.floating)):
+        return float(valor) if math.isfinite(valor) else None
+    return valor
+
+
+class EscritorJSONL(EscritorResultados):
+    # Uma linha JSON por ação, por padrão na saída padrão (para encadear com
+    # outros programas)
+    def __init__(self, saida: Optional[TextIO] = None) -> None:
+        super().__init__()
+        self.saida = saida if saida is not None else sys.stdout
+
+    def _escrever(
+        self, linha: Dict[str, Any], projecao: Optional[pd.DataFrame]
+    ) -> None:
+        self.saida.write(
+            json.dumps(_valor_json(linha), default=str, allow_nan=False) + "\n"
+        )
+        self.saida.flush()
+
+
+class EscritorParquet(EscritorResultados):
+    # Acumula até tamanho_lote linhas e grava cada lote como um row group do
+    # mesmo arquivo; as projeções, se pedidas, vão para um segundo arquivo
+    def __init__(
+        self,
+        caminho: str | Path,
+        caminho_projecoes: Optional[str | Path] = None,
+        tamanho_lote: int = 50,
+    ) -> None:
+        super().__init__()
+        self.caminho = Path(caminho)
+        self.caminho_projecoes = (
+            Path(caminho_projecoes) if caminho_projecoes is not None else None
+        )
+        self.tamanho_lote = tamanho_lote
+        self._linhas: List[Dict[str, Any]] = []
+        self._projecoes: Dict[str, pd.DataFrame] = {}
+        self._escritores: Dict[Path, pq.ParquetWriter] = {}
+
+    def _gravar(self, caminho: Path, tabela: pd.DataFrame) -> None:
+        if caminho not in self._escritores:
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            esquema = pa.Schema.from_pandas(tabela, preserve_index=False)
+            self._escritores[caminho] = pq.ParquetWriter(caminho, esquema)
+        escritor = self._escritores[caminho]
+        escritor.write_table(
+            pa.Table.from_pandas(tabela, schema=escritor.schema, preserve_index=False)
+        )
+
+    def _descarregar(self) -> None:
+        if self._linhas:
+            self._gravar(
+                self.caminho,
+                tabela_resultados(
+                    pd.DataFrame(self._linhas, columns=COLUNAS_VALUATION)
+                ),
+            )
+            self._linhas = []
+        if self._projecoes and self.caminho_projecoes is not None:
+            self._gravar(self.caminho_projecoes, tabela_projecoes(self._projecoes))
+        self._projecoes = {}
+
+    def _escrever(
+        self, linha: Dict[str, Any], projecao: Optional[pd.DataFrame]
+    ) -> None:
+        self._linhas.append(linha)
+        if projecao is not None:
+            self._projecoes[str(linha["acao"])] = projecao
+        if len(self._linhas) >= self.tamanho_lote:
+            self._descarregar()
+
+    def fechar(self) -> None:
+        with self._trava:
+            self._descarregar()
+            for escritor in self._escritores.values():
+                escritor.close()
+            self._escritores = {}
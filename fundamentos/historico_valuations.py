@@ -0,0 +1,136 @@
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .provedores import FUSO_B3
+
+DIRETORIO_PADRAO = (
+    Path(__file__).resolve().parent.parent / "dados" / "historico_valuations"
+)
+
+ESQUEMA_PARTICAO = pa.schema([("ano_mes", pa.string())])
+
+PARTICIONAMENTO = ds.partitioning(ESQUEMA_PARTICAO, flavor="hive")
+
+
+# Histórico dos resultados de todas as rodadas em um dataset Parquet
+# particionado por mês (dados/historico_valuations/ano_mes=2025-03/...). As
+# consultas usam os filtros do pyarrow.dataset: o filtro por ano_mes descarta
+# as pastas dos outros meses sem abri-las e o filtro por ação é aplicado na
+# leitura de cada arquivo, sem carregar o histórico inteiro em memória.
+class HistoricoValuations:
+    def __init__(self, diretorio: str | Path = DIRETORIO_PADRAO) -> None:
+        self.diretorio = Path(diretorio)
+        # União dos esquemas de todos os meses, refeita só quando algum
+        # arquivo do histórico muda
+        self._esquema: Optional[pa.Schema] = None
+        self._versao_esquema: Tuple[Tuple[str, int], ...] = ()
+
+    def acrescentar(
+        self, resultados: pd.DataFrame, data_execucao: Optional[date] = None
+    ) -> str:
+        # Uma rodada repetida no mesmo mês substitui a partição daquele mês
+        data_execucao = data_execucao or datetime.now(FUSO_B3).date()
+        ano_mes = f"{data_execucao:%Y-%m}"
+        tabela = resultados.assign(data_execucao=pd.Timestamp(data_execucao))
+        # Um arquivo por partição, escrito direto (sem ds.write_dataset, cujo
+        # pool de threads do Arrow pode abortar o processo na saída) e trocado
+        # de forma atômica
+        pasta = self.diretorio / f"ano_mes={ano_mes}"
+        pasta.mkdir(parents=True, exist_ok=True)
+        arquivo = pasta / "valuations-0.parquet"
+        temporario = pasta / ".valuations-0.parquet.tmp"
+        pq.write_table(pa.Table.from_pandas(tabela, preserve_index=False), temporario)
+        os.replace(temporario, arquivo)
+        return ano_mes
+
+    def particoes(self) -> List[str]:
+        if not self.diretorio.exists():
+            return []
+        return sorted(
+            pasta.name.removeprefix("ano_mes=")
+            for pasta in self.diretorio.iterdir()
+            if pasta.is_dir() and pasta.name.startswith("ano_mes=")
+        )
+
+    def arquivos(self, ano_mes: Optional[str] = None) -> List[Path]:
+        particoes = self.particoes() if ano_mes is None else [ano_mes]
+        return sorted(
+            arquivo
+            for particao in particoes
+            for arquivo in (self.diretorio / f"ano_mes={particao}").glob("*.parquet")
+        )
+
+    def esquema(self) -> pa.Schema:
+        # Meses gravados antes de uma coluna nova não a têm: o esquema é a união
+        # dos esquemas de todos os meses, e as colunas ausentes vêm como nulas
+        arquivos = self.arquivos()
+        versao = tuple(
+            (str(arquivo), arquivo.stat().st_mtime_ns) for arquivo in arquivos
+        )
+        if self._esquema is None or versao != self._versao_esquema:
+            self._esquema = pa.unify_schemas(
+                [pq.read_schema(arquivo) for arquivo in arquivos] + [ESQUEMA_PARTICAO]
+            )
+            self._versao_esquema = versao
+        return self._esquema
+
+    def dataset(self, ano_mes: Optional[str] = None) -> ds.Dataset:
+        # Com ano_mes só os arquivos daquele mês entram no dataset
+        arquivos = self.arquivos(ano_mes)
+        if not arquivos:
+            raise ValueError(
+                f"Erro: Nenhuma rodada gravada no histórico em {self.diretorio}."
+            )
+        return ds.dataset(
+            [str(arquivo) for arquivo in arquivos],
+            schema=self.esquema(),
+            format="parquet",
+            partitioning=PARTICIONAMENTO,
+            partition_base_dir=str(self.diretorio),
+        )
+
+    def historico(
+        self, acao: str, colunas: Sequence[str] = ("preco_fluxo",)
+    ) -> pd.DataFrame:
+        # Evolução das colunas pedidas de uma ação, uma linha por rodada
+        tabela = self.dataset().to_table(
+            columns=["ano_mes", "data_execucao", *colunas],
+            filter=ds.field("acao") == acao,
+        )
+        evolucao: pd.DataFrame = tabela.to_pandas().sort_values(
+            "ano_mes", ignore_index=True
+        )
+        return evolucao
+
+    def ranking(
+        self,
+        ano_mes: Optional[str] = None,
+        coluna: str = "diferenca_fluxo",
+        n: int = 20,
+        ascendente: bool = False,
+        colunas: Sequence[str] = ("valor_atual", "preco_gordon", "preco_fluxo"),
+    ) -> pd.DataFrame:
+        # As n primeiras ações por `coluna` na última rodada até ano_mes (a
+        # mais recente de todas quando ano_mes não é informado)
+        particoes = [
+            particao
+            for particao in self.particoes()
+            if ano_mes is None or particao <= ano_mes
+        ]
+        if not particoes:
+            raise ValueError(f"Erro: Nenhuma rodada no histórico até {ano_mes}.")
+        selecionadas = list(dict.fromkeys(["acao", coluna, *colunas]))
+        tabela = self.dataset(particoes[-1]).to_table(
+            columns=selecionadas, filter=ds.field(coluna).is_valid()
+        )
+        ordenada: pd.DataFrame = tabela.to_pandas().sort_values(
+            coluna, ascending=ascendente
+        )
+        return ordenada.head(n).reset_index(drop=True).assign(ano_mes=particoes[-1])
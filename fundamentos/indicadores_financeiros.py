@@ -1,8 +1,9 @@
 import numpy as np
-from typing import Dict
-import yfinance as yf
+from typing import Dict, Iterable, Optional
 import pandas as pd
+from .dados_empresa import DadosEmpresa, valor_recente
 from .calculo_wacc import CalculoWACC
+from .memorizacao import memorizar
 from .variacao_receita import VariacaoReceita
 from .outros_ativos_nao_operecionais import (
     OutrosAtivosNaoOperacionais,
@@ -13,6 +14,23 @@ from typing import Union, Any
 
 
 class IndicadoresFinanceiros:
+    # Nome de cada indicador em todos_indicadores() e o método que o calcula
+    INDICADORES: Dict[str, str] = {
+        "margemebit": "margem_ebit",
+        "ultimareceita": "ultima_receita",
+        "variacaoreceita": "variacao_receita_ultimos_anos",
+        "depreciacaocapex": "depreciacao_capex",
+        "capexreceita": "capex_receita",
+        "wacc": "wacc",
+        "quantidadeacoes": "quantidade_acoes",
+        "dividatotal": "divida_total",
+        "caixa": "caixa_equivalentes_caixa",
+        "outrosativos": "outros_ativos_nao_operacionais",
+        "passivosmenosdivida": "passivos_totais_divida",
+        "necessidadecapitalgiro": "necessidade_capital_giro",
+        "percentualimposto": "percentual_imposto",
+    }
+
     def __init__(
         self,
         ticker: str,
@@ -21,38 +39,54 @@ class IndicadoresFinanceiros:
         percentual_imposto_mediana: bool = True,
         depreciacao_capex_mediana: bool = True,
         capex_receita_mediana: bool = True,
+        dados: Optional[DadosEmpresa] = None,
+        ttm: bool = False,
+        beta: Optional[float] = None,
     ):
         self.ticker = ticker
-        self.stock = yf.Ticker(ticker=self.ticker)
+        self.beta = beta
+        self.stock = dados if dados is not None else DadosEmpresa(ticker=self.ticker)
+        self.ttm = ttm
         self.financials = self.stock.financials
         self.balance_sheet = self.stock.balance_sheet
         self.cashflow = self.stock.cashflow
+        # Modo TTM: receita, EBIT, imposto, D&A e capex passam a ser somas dos
+        # últimos quatro trimestres (uma coluna por trimestre publicado), e
+        # margem_ebit, percentual_imposto, depreciacao_capex, capex_receita e
+        # ultima_receita usam essas somas no lugar dos anos fiscais. Sem
+        # quatro trimestres seguidos, fica o demonstrativo anual.
+        if ttm:
+            financials_ttm = self.stock.demonstrativo_ttm("financials")
+            if len(financials_ttm.columns):
+                self.financials = financials_ttm
+            cashflow_ttm = self.stock.demonstrativo_ttm("cashflow")
+            if len(cashflow_ttm.columns):
+                self.cashflow = cashflow_ttm
         self.margem_ebit_mediana = margem_ebit_mediana
         self.deflacionar_receita = deflacionar_receita
         self.percentual_imposto_mediana = percentual_imposto_mediana
         self.depreciacao_capex_mediana = depreciacao_capex_mediana
         self.capex_receita_mediana = capex_receita_mediana
 
+    @memorizar
     def ultima_receita(self) -> float:
         receita_ano = self.financials
-        if isinstance(receita_ano, pd.DataFrame):
-            if "Total Revenue" in receita_ano.index:
-                receita_ano = receita_ano.loc["Total Revenue"].iloc[0]
-            else:
-                receita_ano = 0
-            if isinstance(receita_ano, pd.Series):
-                return float(receita_ano.iloc[0])
-            return float(receita_ano)
+        if "Total Revenue" in receita_ano.index:
+            return valor_recente(receita_ano, "Total Revenue")
         return 0.0
 
+    @memorizar
     def variacao_receita_ultimos_anos(self) -> Dict[str, float]:
         variacao_receita = VariacaoReceita(
-            ticker=self.ticker, deflacionar_receita=self.deflacionar_receita
+            ticker=self.ticker,
+            deflacionar_receita=self.deflacionar_receita,
+            dados=self.stock,
         )
         porcentagem_receita = variacao_receita.receita_crescimento_metricas()
         return porcentagem_receita
 
-    def ebit(self) -> Union[pd.Series, pd.DataFrame]:  # type: ignore[type-arg]
+    @memorizar
+    def ebit(self) -> Union[pd.Series, pd.DataFrame]:
         ebit_ultimos_anos = self.financials
 
         if isinstance(ebit_ultimos_anos, pd.DataFrame):
@@ -70,7 +104,8 @@ class IndicadoresFinanceiros:
         # Se self.financials não for DataFrame nem Series, retorne uma Series vazia
         return pd.Series(dtype=float)
 
-    def receita(self) -> Union[pd.Series, pd.DataFrame]:  # type: ignore[type-arg]
+    @memorizar
+    def receita(self) -> Union[pd.Series, pd.DataFrame]:
         receita_ultimos_anos = self.financials
 
         if isinstance(receita_ultimos_anos, pd.DataFrame):
@@ -86,6 +121,7 @@ class IndicadoresFinanceiros:
         # Se self.financials não for DataFrame nem Series, retorne uma Series vazia
         return pd.Series(dtype=float)
 
+    @memorizar
     def margem_ebit(self) -> float:
         ebit_ultimos_anos = self.ebit()
         receita_ultimos_anos = self.receita()
@@ -105,7 +141,8 @@ class IndicadoresFinanceiros:
         except ZeroDivisionError:
             return 0.05
 
-    def imposto(self) -> Union[pd.Series, pd.DataFrame]:  # type: ignore[type-arg]
+    @memorizar
+    def imposto(self) -> Union[pd.Series, pd.DataFrame]:
         imposto_ultimos_anos = self.financials
         if isinstance(imposto_ultimos_anos, pd.DataFrame):
             if "Tax Provision" in imposto_ultimos_anos.index:
@@ -116,6 +153,7 @@ class IndicadoresFinanceiros:
             return imposto_ultimos_anos
         return pd.Series(dtype=float)
 
+    @memorizar
     def percentual_imposto(self) -> float:
         ebit_ultimos_anos = self.ebit()
         imposto_ultimos_anos = self.imposto()
@@ -139,7 +177,8 @@ class IndicadoresFinanceiros:
             return round(float(resultado), 4)
         return 0.30
 
-    def depreciacao_amortizacao(self) -> Union[pd.Series, pd.DataFrame]:  # type: ignore[type-arg]
+    @memorizar
+    def depreciacao_amortizacao(self) -> Union[pd.Series, pd.DataFrame]:
         depreciacao_amortizacao = self.financials
         if isinstance(depreciacao_amortizacao, pd.DataFrame):
             if "Depreciation And Amortization" in depreciacao_amortizacao.index:
@@ -152,7 +191,8 @@ class IndicadoresFinanceiros:
             return depreciacao_amortizacao
         return pd.Series(dtype=float)
 
-    def capex(self) -> Union[pd.Series, pd.DataFrame]:  # type: ignore[type-arg]
+    @memorizar
+    def capex(self) -> Union[pd.Series, pd.DataFrame]:
         capex = self.cashflow
         if isinstance(capex, pd.DataFrame):
             if "Capital Expenditure" in capex.index:
@@ -163,6 +203,7 @@ class IndicadoresFinanceiros:
             return capex
         return pd.Series(dtype=float)
 
+    @memorizar
     def depreciacao_capex(self) -> float:
         depreciacao_amortizacao = self.depreciacao_amortizacao()
         capex = self.capex()
@@ -192,6 +233,7 @@ class IndicadoresFinanceiros:
         else:
             return 0.1
 
+    @memorizar
     def capex_receita(self) -> float:
         capex = self.capex()
         receita = self.receita()
@@ -216,75 +258,63 @@ class IndicadoresFinanceiros:
         else:
             return 0.1
 
+    @memorizar
     def wacc(self) -> float:
-        wac = CalculoWACC(ticker=self.ticker)
+        wac = CalculoWACC(ticker=self.ticker, dados=self.stock, beta=self.beta)
         valor_wacc = wac.wacc()
         return valor_wacc
 
+    @memorizar
     def quantidade_acoes(self) -> float:
         quantida_acoe = self.stock.quarterly_balance_sheet
-        if isinstance(quantida_acoe, pd.DataFrame):
-            quantida_acoe = quantida_acoe.squeeze()
         if "Share Issued" in quantida_acoe.index:
-            quantida_acoe = quantida_acoe.loc["Share Issued"][0]
-        else:
-            quantida_acoe = 0.0
-        return float(quantida_acoe)
+            return valor_recente(quantida_acoe, "Share Issued")
+        return 0.0
 
+    @memorizar
     def divida_total(self) -> float:
         divida_total = self.stock.get_balancesheet(freq="yearly")
-        if isinstance(divida_total, pd.DataFrame):
-            if "TotalDebt" in divida_total.index:
-                divida_total = divida_total.loc["TotalDebt"][0]
-            else:
-                divida_total = 0.0
-            if isinstance(divida_total, pd.Series):
-                return float(divida_total.iloc[0])
-            return float(divida_total)
+        if "TotalDebt" in divida_total.index:
+            return valor_recente(divida_total, "TotalDebt")
         return 0.0
 
+    @memorizar
     def caixa_equivalentes_caixa(self) -> float:
         caixa = self.stock.get_balancesheet(freq="yearly")
-        if isinstance(caixa, pd.DataFrame):
-            if "CashCashEquivalentsAndShortTermInvestments" in caixa.index:
-                caixa = caixa.loc["CashCashEquivalentsAndShortTermInvestments"][0]
-            else:
-                caixa = 0.0
-            if isinstance(caixa, pd.Series):
-                return float(caixa.iloc[0])
-            return float(caixa)
+        if "CashCashEquivalentsAndShortTermInvestments" in caixa.index:
+            return valor_recente(caixa, "CashCashEquivalentsAndShortTermInvestments")
         return 0.0
 
+    @memorizar
     def outros_ativos_nao_operacionais(self) -> float:
-        outros_nao_ope = OutrosAtivosNaoOperacionais(self.ticker)
+        outros_nao_ope = OutrosAtivosNaoOperacionais(self.ticker, dados=self.stock)
         valor_outros = outros_nao_ope.valor_outros_ativos_nao_operacionais()
         return valor_outros
 
+    @memorizar
     def passivos_totais_divida(self) -> float:
-        passivo_nao_circulante = PassivoTotalMenosDivida(self.ticker)
+        passivo_nao_circulante = PassivoTotalMenosDivida(self.ticker, dados=self.stock)
         valor_passivo_nao_circulante = (
             passivo_nao_circulante.valor_total_passivo_menos_divida()
         )
         return valor_passivo_nao_circulante
 
+    @memorizar
     def necessidade_capital_giro(self) -> float:
-        necessidade_capital = NecessidadeCapitalGiro(self.ticker)
+        necessidade_capital = NecessidadeCapitalGiro(self.ticker, dados=self.stock)
         valor_necesseidade_capital = necessidade_capital.necessidade_capital_giro_ativo_circulante_menos_passivo_circulante()
         return valor_necesseidade_capital
 
+    def indicadores(self, nomes: Iterable[str]) -> Dict[str, Any]:
+        # Cada indicador é calculado sob demanda e chama as entradas de que
+        # precisa (ebit, receita, capex, ...); como todos os métodos são
+        # memorizados por instância, uma entrada comum a vários indicadores é
+        # calculada uma vez só, em qualquer ordem
+        nomes = list(nomes)
+        for nome in nomes:
+            if nome not in self.INDICADORES:
+                raise ValueError(f"Erro: Indicador '{nome}' desconhecido.")
+        return {nome: getattr(self, self.INDICADORES[nome])() for nome in nomes}
+
     def todos_indicadores(self) -> Dict[str, Any]:
-        return {
-            "margemebit": self.margem_ebit(),
-            "ultimareceita": self.ultima_receita(),
-            "variacaoreceita": self.variacao_receita_ultimos_anos(),
-            "depreciacaocapex": self.depreciacao_capex(),
-            "capexreceita": self.capex_receita(),
-            "wacc": self.wacc(),
-            "quantidadeacoes": self.quantidade_acoes(),
-            "dividatotal": self.divida_total(),
-            "caixa": self.caixa_equivalentes_caixa(),
-            "outrosativos": self.outros_ativos_nao_operacionais(),
-            "passivosmenosdivida": self.passivos_totais_divida(),
-            "necessidadecapitalgiro": self.necessidade_capital_giro(),
-            "percentualimposto": self.percentual_imposto(),
-        }
+        return self.indicadores(self.INDICADORES)
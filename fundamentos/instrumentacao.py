@@ -0,0 +1,209 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# Contexto reaproveitado por todas as medições quando a instrumentação está
+# desligada: nenhuma alocação nem leitura de relógio
+_DESLIGADA: ContextManager[None] = contextlib.nullcontext()
+
+
+# Tempo de parede de cada ação, de cada etapa do valuation e de cada chamada
+# externa (endpoint do provedor de dados), com a ação e a thread em que
+# ocorreu, e pico de memória alocada (tracemalloc) por ação. Desligada por
+# padrão; ligada, os eventos podem ser exportados em JSON lines ou no formato
+# de trace do Chrome (chrome://tracing ou https://ui.perfetto.dev).
+class Instrumentacao:
+    def __init__(self, ativa: bool = False, memoria: bool = True):
+        self.ativa = ativa
+        self.memoria = memoria
+        self.eventos: List[Dict[str, Any]] = []
+        self._trava = threading.Lock()
+        self._local = threading.local()
+        self._origem = time.perf_counter()
+        self._acoes_ativas = 0
+        self._memoria_inicial: Dict[str, int] = {}
+        if ativa:
+            self.ativar(memoria)
+
+    def ativar(self, memoria: bool = True) -> None:
+        self.ativa = True
+        self.memoria = memoria
+        self.limpar()
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def desativar(self) -> None:
+        self.ativa = False
+        if self.memoria and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def limpar(self) -> None:
+        with self._trava:
+            self.eventos = []
+            self._origem = time.perf_counter()
+
+    def acao_atual(self) -> Optional[str]:
+        acao: Optional[str] = getattr(self._local, "acao", None)
+        return acao
+
+    def _registrar(self, evento: Dict[str, Any]) -> None:
+        with self._trava:
+            self.eventos.append(evento)
+
+    @contextlib.contextmanager
+    def _medir(self, nome: str, categoria: str) -> Iterator[None]:
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._registrar(
+                {
+                    "nome": nome,
+                    "categoria": categoria,
+                    "acao": self.acao_atual(),
+                    "thread": threading.get_ident(),
+                    "inicio": inicio - self._origem,
+                    "duracao": time.perf_counter() - inicio,
+                }
+            )
+
+    def medir(self, nome: str, categoria: str = "etapa") -> ContextManager[None]:
+        if not self.ativa:
+            return _DESLIGADA
+        return self._medir(nome, categoria)
+
+    def _iniciar_memoria(self, acao: str) -> None:
+        # O pico do tracemalloc é global: só é zerado quando nenhuma outra
+        # ação está rodando. Com várias threads o pico de uma ação inclui o
+        # que as concorrentes alocaram no mesmo intervalo (limite superior).
+        with self._trava:
+            if self._acoes_ativas == 0:
+                tracemalloc.reset_peak()
+            self._acoes_ativas += 1
+            self._memoria_inicial[acao] = tracemalloc.get_traced_memory()[0]
+
+    def _finalizar_memoria(self, acao: str) -> int:
+        with self._trava:
+            self._acoes_ativas -= 1
+            inicial = self._memoria_inicial.pop(acao, 0)
+            return max(tracemalloc.get_traced_memory()[1] - inicial, 0)
+
+    @contextlib.contextmanager
+    def _medir_acao(self, acao: str) -> Iterator[None]:
+        self._local.acao = acao
+        memoria = self.memoria and tracemalloc.is_tracing()
+        if memoria:
+            self._iniciar_memoria(acao)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            evento = {
+                "nome": acao,
+                "categoria": "acao",
+                "acao": acao,
+                "thread": threading.get_ident(),
+                "inicio": inicio - self._origem,
+                "duracao": time.perf_counter() - inicio,
+            }
+            if memoria:
+                evento["memoria_pico"] = self._finalizar_memoria(acao)
+            self._local.acao = None
+            self._registrar(evento)
+
+    def acao(self, acao: str) -> ContextManager[None]:
+        # Tudo que for medido dentro do bloco, na mesma thread, é atribuído à ação
+        if not self.ativa:
+            return _DESLIGADA
+        return self._medir_acao(acao)
+
+    def exportar_jsonl(self, caminho: str | Path) -> None:
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        with caminho.open("w", encoding="utf-8") as arquivo:
+            for evento in self.eventos:
+                arquivo.write(json.dumps(evento) + "\n")
+
+    def exportar_chrome_trace(self, caminho: str | Path) -> None:
+        # Eventos completos ("ph": "X") com tempos em microssegundos
+        processo = os.getpid()
+        eventos = [
+            {
+                "name": evento["nome"],
+                "cat": evento["categoria"],
+                "ph": "X",
+                "ts": round(evento["inicio"] * 1e6, 3),
+                "dur": round(evento["duracao"] * 1e6, 3),
+                "pid": processo,
+                "tid": evento["thread"],
+                "args": {
+                    chave: evento[chave]
+                    for chave in ("acao", "memoria_pico")
+                    if evento.get(chave) is not None
+                },
+            }
+            for evento in self.eventos
+        ]
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_text(
+            json.dumps({"traceEvents": eventos, "displayTimeUnit": "ms"}),
+            encoding="utf-8",
+        )
+
+    def resumo(self) -> pd.DataFrame:
+        # Uma linha por etapa e por endpoint: quantidade, tempo total, médio e máximo
+        eventos = pd.DataFrame(
+            [evento for evento in self.eventos if evento["categoria"] != "acao"],
+            columns=["nome", "categoria", "duracao"],
+        )
+        resumo = (
+            eventos.groupby(["categoria", "nome"])["duracao"]
+            .agg(quantidade="count", total_s="sum", media_ms="mean", maximo_ms="max")
+            .reset_index()
+        )
+        resumo[["media_ms", "maximo_ms"]] *= 1000
+        return resumo.sort_values(["categoria", "total_s"], ascending=[False, False])
+
+    def resumo_acoes(self) -> pd.DataFrame:
+        # Uma linha por ação: tempo total, chamadas externas e pico de memória
+        acoes = [evento for evento in self.eventos if evento["categoria"] == "acao"]
+        chamadas = pd.Series(
+            [
+                evento["acao"]
+                for evento in self.eventos
+                if evento["categoria"] == "chamada" and evento["acao"] is not None
+            ],
+            dtype=object,
+        ).value_counts()
+        resumo = pd.DataFrame(
+            {
+                "acao": [evento["acao"] for evento in acoes],
+                "duracao_s": [evento["duracao"] for evento in acoes],
+                "chamadas": [int(chamadas.get(evento["acao"], 0)) for evento in acoes],
+                "memoria_pico_mb": [
+                    evento.get("memoria_pico", float("nan")) / 2**20 for evento in acoes
+                ],
+            }
+        )
+        return resumo.sort_values("duracao_s", ascending=False)
+
+
+instrumentacao = Instrumentacao()
+
+
+def configurar_instrumentacao(
+    ativa: bool = True, memoria: bool = True
+) -> Instrumentacao:
+    if ativa:
+        instrumentacao.ativar(memoria)
+    else:
+        instrumentacao.desativar()
+    return instrumentacao
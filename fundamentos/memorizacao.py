@@ -0,0 +1,22 @@
+import functools
+from typing import Any, Callable, Dict, TypeVar
+
+Retorno = TypeVar("Retorno")
+
+
+# Guarda o resultado de um método sem argumentos na própria instância: cada
+# indicador é calculado no máximo uma vez, por mais que outros métodos o
+# chamem. Os dados de uma instância não mudam depois de baixados, então o
+# valor guardado nunca fica desatualizado.
+def memorizar(metodo: Callable[[Any], Retorno]) -> Callable[[Any], Retorno]:
+    nome = metodo.__name__
+
+    @functools.wraps(metodo)
+    def memorizado(self: Any) -> Retorno:
+        memoria: Dict[str, Any] = self.__dict__.setdefault("_memoria", {})
+        if nome not in memoria:
+            memoria[nome] = metodo(self)
+        valor: Retorno = memoria[nome]
+        return valor
+
+    return memorizado
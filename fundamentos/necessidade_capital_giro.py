@@ -1,79 +1,46 @@
 import pandas as pd
-import yfinance as yf
 import math
+from typing import Optional
+from .dados_empresa import DadosEmpresa, valor_recente
 
 
 class NecessidadeCapitalGiro:
-    def __init__(self, ticker: str) -> None:
+    def __init__(self, ticker: str, dados: Optional[DadosEmpresa] = None) -> None:
         self.ticker = ticker
-        self.stock = yf.Ticker(ticker=self.ticker)
+        self.stock = dados if dados is not None else DadosEmpresa(ticker=self.ticker)
 
     def contas_receber(self) -> float:
         contas_receber = self.stock.get_balancesheet(freq="yearly")
-        if isinstance(contas_receber, pd.DataFrame):
-            if "AccountsReceivable" in contas_receber.index:
-                contas_receber = contas_receber.loc["AccountsReceivable"][0]
-            else:
-                contas_receber = 0
-            if isinstance(contas_receber, pd.Series):
-                return float(contas_receber.iloc[0])
-            return float(contas_receber)
+        if "AccountsReceivable" in contas_receber.index:
+            return valor_recente(contas_receber, "AccountsReceivable")
         return 0.0
 
     def estoque(self) -> float:
         estoque = self.stock.get_balancesheet(freq="yearly")
-        if isinstance(estoque, pd.DataFrame):
-            if "Inventory" in estoque.index:
-                estoque = estoque.loc["Inventory"][0]
-            else:
-                estoque = 0
-            if isinstance(estoque, pd.Series):
-                return float(estoque.iloc[0])
-            return float(estoque)
+        if "Inventory" in estoque.index:
+            return valor_recente(estoque, "Inventory")
         return 0.0
 
     def outros_ativos_circulantes_operacionais(self) -> float:
-        outros_ativos_circulantes_operacionais = self.stock.get_balancesheet(
-            freq="yearly"
-        )
-        if isinstance(outros_ativos_circulantes_operacionais, pd.DataFrame):
-            if "OtherCurrentAssets" in outros_ativos_circulantes_operacionais.index:
-                outros_ativos_circulantes_operacionais = (
-                    outros_ativos_circulantes_operacionais.loc["OtherCurrentAssets"][0]
-                )
-            else:
-                outros_ativos_circulantes_operacionais = 0
-            if isinstance(outros_ativos_circulantes_operacionais, pd.Series):
-                return float(outros_ativos_circulantes_operacionais.iloc[0])
-            return float(outros_ativos_circulantes_operacionais)
+        balanco = self.stock.get_balancesheet(freq="yearly")
+        if "OtherCurrentAssets" in balanco.index:
+            return valor_recente(balanco, "OtherCurrentAssets")
         return 0.0
 
     def outros_passivos_circulantes_operacionais(self) -> float:
         outros_passivo = self.stock.get_balancesheet(freq="yearly")
-        if isinstance(outros_passivo, pd.DataFrame):
-            if "OtherCurrentLiabilities" in outros_passivo.index:
-                outros_passivo = outros_passivo.loc["OtherCurrentLiabilities"][0]
-            else:
-                outros_passivo = 0
-            if isinstance(outros_passivo, pd.Series):
-                return float(outros_passivo.iloc[0])
-            return float(outros_passivo)
+        if "OtherCurrentLiabilities" in outros_passivo.index:
+            return valor_recente(outros_passivo, "OtherCurrentLiabilities")
         return 0.0
 
     def contas_pagar_despesas_acumuladas(self) -> float:
         contas_pagar = self.stock.get_balancesheet(freq="yearly")
-        if isinstance(contas_pagar, pd.DataFrame):
-            if "PayablesAndAccruedExpenses" in contas_pagar.index:
-                contas_pagar = contas_pagar.loc["PayablesAndAccruedExpenses"][0]
-            elif "AccountsPayable" in contas_pagar.index:
-                contas_pagar = contas_pagar.loc["AccountsPayable"][0]
-            elif "Payables" in contas_pagar.index:
-                contas_pagar = contas_pagar.loc["Payables"][0]
-            else:
-                contas_pagar = 0
-            if isinstance(contas_pagar, pd.Series):
-                return float(contas_pagar.iloc[0])
-            return float(contas_pagar)
+        if "PayablesAndAccruedExpenses" in contas_pagar.index:
+            return valor_recente(contas_pagar, "PayablesAndAccruedExpenses")
+        elif "AccountsPayable" in contas_pagar.index:
+            return valor_recente(contas_pagar, "AccountsPayable")
+        elif "Payables" in contas_pagar.index:
+            return valor_recente(contas_pagar, "Payables")
         return 0.0
 
     def ativos_circulantes_operacionais(self) -> float:
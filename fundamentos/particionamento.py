@@ -0,0 +1,109 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import pandas as pd
+
+from .saida_valuations import COLUNAS_VALUATION
+
+PARTICIONAMENTOS = ("setor", "segmento", "hash")
+
+SEM_SETOR = "Sem setor"
+
+# Arquivos que cada shard precisa ter gravado para entrar no --merge
+ARQUIVOS_SHARD = (
+    "valores_valuations_acoes.csv",
+    "projecoes_valuations.parquet",
+    "impressoes_digitais.json",
+)
+
+
+def shard_hash(acao: str, total_shards: int) -> int:
+    # hash() do Python muda a cada processo; o md5 dá o mesmo shard em
+    # qualquer máquina
+    resumo = hashlib.md5(acao.encode("utf-8")).hexdigest()
+    return int(resumo, 16) % total_shards
+
+
+def dividir_por_grupo(
+    grupos: Dict[str, List[str]], total_shards: int
+) -> List[List[str]]:
+    # Maior grupo primeiro, sempre no shard com menos ações (LPT): nenhum
+    # grupo é quebrado e os shards ficam com quantidades parecidas
+    shards: List[List[str]] = [[] for _ in range(total_shards)]
+    for _, acoes in sorted(grupos.items(), key=lambda item: (-len(item[1]), item[0])):
+        menor = min(range(total_shards), key=lambda indice: len(shards[indice]))
+        shards[menor].extend(acoes)
+    return shards
+
+
+def dividir_acoes(
+    setores: pd.DataFrame, total_shards: int, particionar: str = "setor"
+) -> List[List[str]]:
+    # setores: uma linha por ação, com as colunas tic, Setor e Segmento de setor.csv
+    if particionar not in PARTICIONAMENTOS:
+        raise ValueError(
+            f"Erro: Particionamento '{particionar}' inválido, use um de "
+            f"{', '.join(PARTICIONAMENTOS)}."
+        )
+    if total_shards < 1:
+        raise ValueError("Erro: O total de shards precisa ser pelo menos 1.")
+    acoes = [str(acao) for acao in setores["tic"]]
+    if particionar == "hash":
+        shards: List[List[str]] = [[] for _ in range(total_shards)]
+        for acao in acoes:
+            shards[shard_hash(acao, total_shards)].append(acao)
+        return shards
+
+    coluna = "Setor" if particionar == "setor" else "Segmento"
+    rotulos = (
+        [str(rotulo) for rotulo in setores[coluna].fillna(SEM_SETOR)]
+        if coluna in setores.columns
+        else [SEM_SETOR] * len(acoes)
+    )
+    grupos: Dict[str, List[str]] = {}
+    for acao, rotulo in zip(acoes, rotulos):
+        grupos.setdefault(rotulo, []).append(acao)
+    return dividir_por_grupo(grupos, total_shards)
+
+
+def selecionar_shard(
+    setores: pd.DataFrame, shard: int, total_shards: int, particionar: str = "setor"
+) -> List[str]:
+    if not 0 <= shard < total_shards:
+        raise ValueError(
+            f"Erro: Shard {shard} fora do intervalo 0 a {total_shards - 1}."
+        )
+    return dividir_acoes(setores, total_shards, particionar)[shard]
+
+
+def pasta_shard(pasta: str | Path, shard: int, total_shards: int) -> Path:
+    return Path(pasta) / "shards" / f"{shard}-de-{total_shards}"
+
+
+def pastas_shards(pasta: str | Path, total_shards: int) -> List[Path]:
+    # Todas as pastas dos shards de uma rodada; um shard sem algum dos
+    # resultados (não rodou ou parou no meio) é erro
+    pastas = [pasta_shard(pasta, shard, total_shards) for shard in range(total_shards)]
+    faltando = [
+        str(pasta / arquivo)
+        for pasta in pastas
+        for arquivo in ARQUIVOS_SHARD
+        if not (pasta / arquivo).exists()
+    ]
+    if faltando:
+        raise ValueError(
+            f"Erro: Resultados de shards não encontrados: {', '.join(faltando)}."
+        )
+    return pastas
+
+
+def juntar_tabelas(
+    tabelas: Sequence[pd.DataFrame], colunas: Sequence[str] = COLUNAS_VALUATION
+) -> pd.DataFrame:
+    # Sem nenhuma linha nos shards volta uma tabela vazia com as colunas
+    # esperadas, para a ordenação e as tabelas derivadas continuarem funcionando
+    tabelas = [tabela for tabela in tabelas if not tabela.empty]
+    if not tabelas:
+        return pd.DataFrame(columns=list(colunas))
+    return pd.concat(tabelas, ignore_index=True)
@@ -0,0 +1,525 @@
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from pathlib import Path
+from typing import Any, ContextManager, Dict, List, Optional, Sequence, TypeVar
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from .instrumentacao import instrumentacao
+
+GRUPO_MACRO = "_macro"
+
+INDICE_MERCADO = "^BVSP"
+
+# Fuso da B3: o "hoje" dos pregões
+FUSO_B3 = ZoneInfo("America/Sao_Paulo")
+
+PROVEDORES = ("yahoo", "gravacao", "reproducao")
+
+# Tempo limite padrão, em segundos, de cada download do yfinance
+TIMEOUT_REQUISICAO = 10.0
+
+Serie = TypeVar("Serie", pd.Series, pd.DataFrame)
+
+
+def recortar_periodo(dados: Serie, start_date: str, end_date: str) -> Serie:
+    # Período semiaberto [start_date, end_date), como o `end` do yfinance:
+    # todos os provedores devolvem o mesmo recorte para as mesmas datas
+    fuso = getattr(dados.index, "tz", None)
+    inicio = pd.Timestamp(start_date, tz=fuso)
+    fim = pd.Timestamp(end_date, tz=fuso)
+    return dados[(dados.index >= inicio) & (dados.index < fim)]
+
+
+# Origem de todos os dados externos: demonstrativos, info, dividendos e
+# cotações do Yahoo, IBOVESPA, swap DI (juros livres) do IPEA e IPCA do SIDRA.
+# As classes de fundamentos só acessam a rede por aqui, então trocar o
+# provedor troca a origem dos dados do pipeline inteiro. Cada provedor conta
+# as chamadas por endpoint em `chamadas`.
+class ProvedorDados(ABC):
+    def __init__(self) -> None:
+        self.chamadas: Counter[str] = Counter()
+        self._trava_chamadas = threading.Lock()
+
+    def _contar(self, endpoint: str) -> None:
+        with self._trava_chamadas:
+            self.chamadas[endpoint] += 1
+
+    def _chamada(self, endpoint: str) -> ContextManager[None]:
+        # Conta a chamada e mede o tempo dela quando a instrumentação está ligada
+        self._contar(endpoint)
+        return instrumentacao.medir(endpoint, "chamada")
+
+    @abstractmethod
+    def demonstrativo(self, ticker: str, nome: str, freq: str) -> pd.DataFrame: ...
+
+    @abstractmethod
+    def info(self, ticker: str) -> Dict[str, Any]: ...
+
+    @abstractmethod
+    def dividendos(self, ticker: str) -> pd.Series: ...
+
+    @abstractmethod
+    def historico(self, ticker: str) -> pd.DataFrame: ...
+
+    @abstractmethod
+    def ibovespa(self, start_date: str, end_date: str) -> pd.Series: ...
+
+    @abstractmethod
+    def swap_di(self) -> pd.DataFrame: ...
+
+    @abstractmethod
+    def ipca(self) -> pd.DataFrame | None: ...
+
+    def fechamentos(
+        self, tickers: Sequence[str], start_date: str, end_date: str
+    ) -> pd.DataFrame:
+        # Fechamentos diários de vários tickers (e do IBOVESPA, como ^BVSP),
+        # uma coluna por ticker. Sem um endpoint em lote, junta o histórico de
+        # cada ticker; como no download em lote, ticker sem dados vira coluna
+        # vazia.
+        colunas = {}
+        for ticker in tickers:
+            try:
+                if ticker == INDICE_MERCADO:
+                    fechamento = self.ibovespa(start_date, end_date)
+                else:
+                    fechamento = self.historico(ticker)["Close"]
+            except (KeyError, ValueError):
+                continue
+            datas = fechamento.index
+            if isinstance(datas, pd.DatetimeIndex):
+                if datas.tz is not None:
+                    datas = datas.tz_localize(None)
+                fechamento = fechamento.set_axis(datas.normalize())
+            colunas[ticker] = fechamento
+        tabela = pd.DataFrame(colunas, columns=list(tickers)).sort_index()
+        return recortar_periodo(tabela, start_date, end_date)
+
+    def cotacoes(self, tickers: Sequence[str]) -> pd.Series:
+        # Último fechamento de cada ticker (NaN sem cotação). Sem um endpoint
+        # em lote, usa o fim do histórico de cada ticker.
+        precos = {}
+        for ticker in tickers:
+            try:
+                fechamento = self.historico(ticker)["Close"].dropna()
+            except (KeyError, ValueError):
+                continue
+            if not fechamento.empty:
+                precos[ticker] = float(fechamento.iloc[-1])
+        return pd.Series(precos, index=list(tickers), dtype=float, name="Close")
+
+
+class ProvedorYahoo(ProvedorDados):
+    # Dados ao vivo: yfinance, ipeadatapy e sidrapy, importados só na primeira
+    # chamada para não pesar no `import fundamentos`. O timeout vale para o
+    # histórico e os downloads; info e demonstrativos não aceitam timeout no
+    # yfinance e usam o tempo limite interno dele.
+    def __init__(self, timeout: float = TIMEOUT_REQUISICAO):
+        super().__init__()
+        self.timeout = timeout
+
+    def demonstrativo(self, ticker: str, nome: str, freq: str) -> pd.DataFrame:
+        import yfinance as yf
+
+        with self._chamada(f"{nome}_{freq}"):
+            empresa = yf.Ticker(ticker=ticker)
+            if nome == "financials":
+                dados = empresa.get_income_stmt(freq=freq)
+            elif nome == "balance_sheet":
+                dados = empresa.get_balance_sheet(freq=freq)
+            elif nome == "cashflow":
+                dados = empresa.get_cash_flow(freq=freq)
+            else:
+                raise ValueError(f"Erro: Demonstrativo desconhecido '{nome}'.")
+
+        if isinstance(dados, pd.DataFrame):
+            return dados
+        if isinstance(dados, dict):
+            return pd.DataFrame.from_dict(dados)
+        return pd.DataFrame()
+
+    def info(self, ticker: str) -> Dict[str, Any]:
+        import yfinance as yf
+
+        with self._chamada("info"):
+            info = yf.Ticker(ticker=ticker).info
+        return info if isinstance(info, dict) else {}
+
+    def dividendos(self, ticker: str) -> pd.Series:
+        import yfinance as yf
+
+        with self._chamada("dividends"):
+            dividendos = yf.Ticker(ticker=ticker).dividends
+        if not isinstance(dividendos, pd.Series):
+            dividendos = pd.Series(dtype=float, name="Dividends")
+        return dividendos
+
+    def historico(self, ticker: str) -> pd.DataFrame:
+        import yfinance as yf
+
+        with self._chamada("historico"):
+            historico = yf.Ticker(ticker=ticker).history(
+                period="10Y", interval="1d", timeout=self.timeout
+            )
+        return historico if isinstance(historico, pd.DataFrame) else pd.DataFrame()
+
+    def ibovespa(self, start_date: str, end_date: str) -> pd.Series:
+        import yfinance as yf
+
+        with self._chamada("ibovespa"):
+            ibov = yf.download(
+                "^BVSP", start=start_date, end=end_date, timeout=self.timeout
+            )
+
+        if ibov is None or ibov.empty:
+            raise ValueError("Erro: Nenhum dado foi baixado para o IBOVESPA.")
+
+        # Garantir que a coluna 'Close' existe
+        if "Close" not in ibov.columns:
+            raise ValueError("Erro: A coluna 'Close' não está presente nos dados.")
+
+        fechamento = ibov["Close"]
+        if isinstance(fechamento, pd.DataFrame):
+            fechamento = fechamento["^BVSP"]
+        ibovespa: pd.Series = fechamento.rename("Close").astype(float)
+        return ibovespa
+
+    def fechamentos(
+        self, tickers: Sequence[str], start_date: str, end_date: str
+    ) -> pd.DataFrame:
+        import yfinance as yf
+
+        # Uma única requisição para todos os tickers
+        with self._chamada("fechamentos"):
+            cotacoes = yf.download(
+                list(tickers),
+                start=start_date,
+                end=end_date,
+                interval="1d",
+                auto_adjust=True,
+                progress=False,
+                timeout=self.timeout,
+            )
+        if cotacoes is None or cotacoes.empty:
+            return pd.DataFrame(columns=list(tickers), dtype=float)
+        fechamento = cotacoes["Close"]
+        if isinstance(fechamento, pd.Series):
+            fechamento = fechamento.to_frame(name=tickers[0])
+        if fechamento.index.tz is not None:
+            fechamento = fechamento.tz_localize(None)
+        fechamentos: pd.DataFrame = fechamento.reindex(columns=list(tickers))
+        return fechamentos.astype(float)
+
+    def cotacoes(self, tickers: Sequence[str]) -> pd.Series:
+        import yfinance as yf
+
+        # Uma única requisição com os últimos pregões de todos os tickers, no
+        # lugar de dez anos de histórico por ticker
+        with self._chamada("cotacoes"):
+            ultimos = yf.download(
+                list(tickers),
+                period="5d",
+                interval="1d",
+                auto_adjust=True,
+                progress=False,
+                timeout=self.timeout,
+            )
+        if ultimos is None or ultimos.empty:
+            return pd.Series(index=list(tickers), dtype=float, name="Close")
+        fechamento = ultimos["Close"]
+        if isinstance(fechamento, pd.Series):
+            fechamento = fechamento.to_frame(name=tickers[0])
+        precos = fechamento.reindex(columns=list(tickers)).astype(float).ffill()
+        ultimos_precos: pd.Series = precos.iloc[-1].rename("Close")
+        return ultimos_precos
+
+    def swap_di(self) -> pd.DataFrame:
+        import ipeadatapy as ip
+
+        with self._chamada("swap_di"):
+            swaps: pd.DataFrame = ip.timeseries("BMF12_SWAPDI36012")
+        return swaps
+
+    def ipca(self) -> pd.DataFrame | None:
+        import sidrapy
+
+        with self._chamada("ipca"):
+            ipca_raw = sidrapy.get_table(
+                table_code="1737",
+                territorial_level="1",
+                ibge_territorial_code="all",
+                variable="69",
+                period="last%20472",
+            )
+
+        if ipca_raw is None:
+            return None
+
+        if isinstance(ipca_raw, dict):
+            return pd.DataFrame.from_dict(ipca_raw)
+
+        if isinstance(ipca_raw, pd.DataFrame):
+            return ipca_raw
+
+        raise TypeError("Erro: Tipo de retorno inesperado.")
+
+
+def _rotulos_para_json(indice: pd.Index) -> Dict[str, Any]:
+    if isinstance(indice, pd.DatetimeIndex):
+        fuso = str(indice.tz) if indice.tz is not None else None
+        datas = indice.tz_convert("UTC") if fuso is not None else indice
+        return {
+            "tipo": "datas",
+            "fuso": fuso,
+            "valores": [data.isoformat() for data in datas],
+        }
+    return {"tipo": "valores", "valores": indice.tolist()}
+
+
+def _rotulos_de_json(rotulos: Dict[str, Any]) -> pd.Index:
+    if rotulos["tipo"] == "datas":
+        if rotulos["fuso"] is None:
+            return pd.DatetimeIndex(pd.to_datetime(rotulos["valores"]))
+        datas = pd.to_datetime(rotulos["valores"], utc=True)
+        return pd.DatetimeIndex(datas).tz_convert(rotulos["fuso"])
+    indice: pd.Index = pd.Index(rotulos["valores"])
+    return indice
+
+
+def salvar_tabela_json(caminho: Path, tabela: pd.DataFrame) -> None:
+    # JSON em texto (e não Parquet) para as gravações poderem ser revisadas
+    valores = tabela.astype(object).where(pd.notna(tabela), None)
+    conteudo = {
+        "indice": _rotulos_para_json(tabela.index),
+        "colunas": _rotulos_para_json(tabela.columns),
+        "dados": valores.values.tolist(),
+    }
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_text(json.dumps(conteudo, default=float), encoding="utf-8")
+
+
+def ler_tabela_json(caminho: Path) -> pd.DataFrame:
+    conteudo = json.loads(caminho.read_text(encoding="utf-8"))
+    tabela = pd.DataFrame(
+        conteudo["dados"],
+        index=_rotulos_de_json(conteudo["indice"]),
+        columns=_rotulos_de_json(conteudo["colunas"]),
+    )
+    return tabela.infer_objects()
+
+
+def caminho_gravacao(diretorio: Path, grupo: str, endpoint: str) -> Path:
+    return diretorio / grupo / f"{endpoint}.json"
+
+
+# Repassa as chamadas para outro provedor (normalmente o ProvedorYahoo) e grava
+# cada resposta em disco, no formato lido pelo ProvedorReproducao: uma pasta
+# por ticker (e _macro para as séries macroeconômicas) com um JSON por endpoint.
+class ProvedorGravacao(ProvedorDados):
+    def __init__(self, diretorio: str | Path, provedor: Optional[ProvedorDados] = None):
+        super().__init__()
+        self.diretorio = Path(diretorio)
+        self.provedor = provedor if provedor is not None else ProvedorYahoo()
+        self._trava = threading.Lock()
+
+    def _gravar_tabela(self, grupo: str, endpoint: str, tabela: pd.DataFrame) -> None:
+        self._contar(endpoint)
+        salvar_tabela_json(caminho_gravacao(self.diretorio, grupo, endpoint), tabela)
+
+    def demonstrativo(self, ticker: str, nome: str, freq: str) -> pd.DataFrame:
+        tabela = self.provedor.demonstrativo(ticker, nome, freq)
+        self._gravar_tabela(ticker, f"{nome}_{freq}", tabela)
+        return tabela
+
+    def info(self, ticker: str) -> Dict[str, Any]:
+        info = self.provedor.info(ticker)
+        self._contar("info")
+        caminho = caminho_gravacao(self.diretorio, ticker, "info")
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_text(json.dumps(info, default=str), encoding="utf-8")
+        return info
+
+    def dividendos(self, ticker: str) -> pd.Series:
+        dividendos = self.provedor.dividendos(ticker)
+        self._gravar_tabela(ticker, "dividends", dividendos.to_frame(name="Dividends"))
+        return dividendos
+
+    def historico(self, ticker: str) -> pd.DataFrame:
+        historico = self.provedor.historico(ticker)
+        self._gravar_tabela(ticker, "historico", historico)
+        return historico
+
+    def ibovespa(self, start_date: str, end_date: str) -> pd.Series:
+        fechamento = self.provedor.ibovespa(start_date, end_date)
+        # Chamadas com períodos diferentes se somam na gravação, em vez de a
+        # última apagar as anteriores; a reprodução recorta o período pedido
+        caminho = caminho_gravacao(self.diretorio, GRUPO_MACRO, "ibovespa")
+        with self._trava:
+            tabela = fechamento.to_frame(name="Close")
+            if caminho.exists():
+                tabela = tabela.combine_first(ler_tabela_json(caminho))
+            self._gravar_tabela(GRUPO_MACRO, "ibovespa", tabela)
+        return fechamento
+
+    def fechamentos(
+        self, tickers: Sequence[str], start_date: str, end_date: str
+    ) -> pd.DataFrame:
+        fechamentos = self.provedor.fechamentos(tickers, start_date, end_date)
+        self._gravar_tabela(GRUPO_MACRO, "fechamentos", fechamentos)
+        return fechamentos
+
+    def cotacoes(self, tickers: Sequence[str]) -> pd.Series:
+        precos = self.provedor.cotacoes(tickers)
+        self._gravar_tabela(GRUPO_MACRO, "cotacoes", precos.to_frame(name="Close"))
+        return precos
+
+    def swap_di(self) -> pd.DataFrame:
+        swaps = self.provedor.swap_di()
+        self._gravar_tabela(GRUPO_MACRO, "swap_di", swaps)
+        return swaps
+
+    def ipca(self) -> pd.DataFrame | None:
+        ipca = self.provedor.ipca()
+        if ipca is not None:
+            self._gravar_tabela(GRUPO_MACRO, "ipca", ipca)
+        return ipca
+
+
+# Serve as respostas gravadas pelo ProvedorGravacao, sem acessar a rede. A
+# latência opcional (em segundos, mais uma variação aleatória) simula o tempo
+# de resposta do Yahoo para testar carga e concorrência localmente.
+class ProvedorReproducao(ProvedorDados):
+    def __init__(
+        self,
+        diretorio: str | Path,
+        latencia: float = 0.0,
+        variacao_latencia: float = 0.0,
+    ):
+        super().__init__()
+        self.diretorio = Path(diretorio)
+        self.latencia = latencia
+        self.variacao_latencia = variacao_latencia
+        self._lidos: Dict[Path, Any] = {}
+        self._trava = threading.Lock()
+
+    def _ler(self, grupo: str, endpoint: str, tabela: bool = True) -> Any:
+        with self._chamada(endpoint):
+            return self._ler_gravacao(grupo, endpoint, tabela)
+
+    def _ler_gravacao(self, grupo: str, endpoint: str, tabela: bool) -> Any:
+        if self.latencia or self.variacao_latencia:
+            time.sleep(self.latencia + random.uniform(0, self.variacao_latencia))
+        # As gravações ficam em memória depois da primeira leitura; cada
+        # chamada recebe uma cópia
+        caminho = caminho_gravacao(self.diretorio, grupo, endpoint)
+        with self._trava:
+            if caminho not in self._lidos:
+                if not caminho.exists():
+                    raise ValueError(
+                        f"Erro: Gravação de {grupo}/{endpoint} não encontrada."
+                    )
+                self._lidos[caminho] = (
+                    ler_tabela_json(caminho)
+                    if tabela
+                    else json.loads(caminho.read_text(encoding="utf-8"))
+                )
+            valor = self._lidos[caminho]
+        return valor.copy()
+
+    def demonstrativo(self, ticker: str, nome: str, freq: str) -> pd.DataFrame:
+        tabela: pd.DataFrame = self._ler(ticker, f"{nome}_{freq}")
+        return tabela
+
+    def info(self, ticker: str) -> Dict[str, Any]:
+        info: Dict[str, Any] = self._ler(ticker, "info", tabela=False)
+        return info
+
+    def dividendos(self, ticker: str) -> pd.Series:
+        dividendos: pd.Series = self._ler(ticker, "dividends")["Dividends"]
+        return dividendos
+
+    def historico(self, ticker: str) -> pd.DataFrame:
+        historico: pd.DataFrame = self._ler(ticker, "historico")
+        return historico
+
+    def ibovespa(self, start_date: str, end_date: str) -> pd.Series:
+        fechamento: pd.Series = self._ler(GRUPO_MACRO, "ibovespa")["Close"]
+        return recortar_periodo(fechamento, start_date, end_date)
+
+    def fechamentos(
+        self, tickers: Sequence[str], start_date: str, end_date: str
+    ) -> pd.DataFrame:
+        # Gravações sem o download em lote montam os fechamentos a partir do
+        # histórico de cada ticker
+        if not caminho_gravacao(self.diretorio, GRUPO_MACRO, "fechamentos").exists():
+            return super().fechamentos(tickers, start_date, end_date)
+        fechamentos: pd.DataFrame = self._ler(GRUPO_MACRO, "fechamentos")
+        fechamentos = fechamentos.reindex(columns=list(tickers))
+        return recortar_periodo(fechamentos, start_date, end_date)
+
+    def cotacoes(self, tickers: Sequence[str]) -> pd.Series:
+        if not caminho_gravacao(self.diretorio, GRUPO_MACRO, "cotacoes").exists():
+            return super().cotacoes(tickers)
+        precos: pd.Series = self._ler(GRUPO_MACRO, "cotacoes")["Close"]
+        return precos.reindex(list(tickers)).astype(float)
+
+    def swap_di(self) -> pd.DataFrame:
+        swaps: pd.DataFrame = self._ler(GRUPO_MACRO, "swap_di")
+        return swaps
+
+    def ipca(self) -> pd.DataFrame | None:
+        ipca: pd.DataFrame = self._ler(GRUPO_MACRO, "ipca")
+        return ipca
+
+    def tickers(self) -> List[str]:
+        if not self.diretorio.exists():
+            return []
+        return sorted(
+            pasta.name
+            for pasta in self.diretorio.iterdir()
+            # Só pastas com gravações: a reprodução grava resultados na mesma pasta
+            if pasta.name != GRUPO_MACRO and (pasta / "info.json").exists()
+        )
+
+
+provedor_padrao: ProvedorDados = ProvedorYahoo()
+
+
+def obter_provedor() -> ProvedorDados:
+    return provedor_padrao
+
+
+def configurar_provedor(provedor: ProvedorDados) -> ProvedorDados:
+    global provedor_padrao
+    provedor_padrao = provedor
+    return provedor
+
+
+def criar_provedor(
+    tipo: str,
+    diretorio: Optional[str | Path] = None,
+    latencia: float = 0.0,
+    variacao_latencia: float = 0.0,
+    timeout_acao: Optional[float] = None,
+) -> ProvedorDados:
+    if tipo not in PROVEDORES:
+        raise ValueError(
+            f"Erro: Provedor '{tipo}' inválido, use um de {', '.join(PROVEDORES)}."
+        )
+    # Nenhuma requisição espera mais que o tempo limite de uma ação inteira
+    timeout = TIMEOUT_REQUISICAO
+    if timeout_acao is not None:
+        timeout = min(timeout, timeout_acao)
+    if tipo == "yahoo":
+        return ProvedorYahoo(timeout)
+    if diretorio is None:
+        raise ValueError(f"Erro: O provedor '{tipo}' precisa de um diretório.")
+    if tipo == "gravacao":
+        return ProvedorGravacao(diretorio, ProvedorYahoo(timeout))
+    return ProvedorReproducao(diretorio, latencia, variacao_latencia)
@@ -0,0 +1,124 @@
+import ast
+import os
+from pathlib import Path
+from typing import Any, Dict, Mapping
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_VALUATION = [
+    "acao",
+    "valor_atual",
+    "preco_gordon",
+    "preco_fluxo",
+    "diferenca_gordon",
+    "diferenca_fluxo",
+    "margem_ebit",
+    "variacao_receita",
+    "wacc",
+    "quantidade_acoes",
+    "divida_total",
+    "caixa",
+    "outros_ativos",
+    "passivos_menos_divida",
+    "percentual_imposto",
+    "receita_ano",
+    "crescimento_receita",
+    "depreciacao_capex",
+    "capex_receita",
+]
+
+METRICAS_VARIACAO_RECEITA = (
+    "mean_deflacionada",
+    "median_deflacionada",
+    "mean_normal",
+    "median_normal",
+)
+
+# Colunas de ValuationFluxoCaixaDescontado.calcular_valuation(), com "data"
+# (ano da projeção) renomeada para "ano"
+COLUNAS_PROJECAO = (
+    "ano",
+    "receita_ano",
+    "ebit_ano",
+    "imposto_ano",
+    "capex_ano",
+    "depreciacao_ano",
+    "ebit_ajustado",
+    "fluxo_caixa",
+    "valor_presente_fluxo",
+)
+
+
+def _metricas_variacao_receita(variacao: Any) -> Dict[str, float]:
+    # Linhas vindas do CSV (modo incremental) trazem o dicionário como texto
+    if isinstance(variacao, str):
+        variacao = ast.literal_eval(variacao.replace("nan", "None"))
+    if not isinstance(variacao, dict):
+        variacao = {}
+    return {
+        f"variacao_receita_{metrica}": (
+            np.nan if variacao.get(metrica) is None else float(variacao[metrica])
+        )
+        for metrica in METRICAS_VARIACAO_RECEITA
+    }
+
+
+# Resultado do lote com tipos fixos para Parquet/Arrow: `variacao_receita`
+# vira quatro colunas float (uma por métrica) e as demais colunas numéricas
+# são sempre float64, mesmo quando alguma ação não tem o valor.
+def tabela_resultados(valores: pd.DataFrame) -> pd.DataFrame:
+    metricas = pd.DataFrame(
+        [
+            _metricas_variacao_receita(variacao)
+            for variacao in valores["variacao_receita"]
+        ],
+        index=valores.index,
+        columns=[
+            f"variacao_receita_{metrica}" for metrica in METRICAS_VARIACAO_RECEITA
+        ],
+    )
+    posicao = list(valores.columns).index("variacao_receita")
+    tabela = pd.concat(
+        [
+            valores.iloc[:, :posicao],
+            metricas,
+            valores.iloc[:, posicao + 1 :],
+        ],
+        axis=1,
+    )
+    numericas = tabela.columns.drop("acao")
+    tabela[numericas] = tabela[numericas].apply(pd.to_numeric, errors="coerce")
+    tipada: pd.DataFrame = tabela.astype(
+        {"acao": "string", **{coluna: "float64" for coluna in numericas}}
+    )
+    return tipada
+
+
+# Projeções ano a ano do fluxo de caixa descontado de cada ação em formato
+# longo: uma linha por (acao, ano) com as colunas de calcular_valuation().
+def tabela_projecoes(projecoes: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+    tabelas = [
+        projecao.rename(columns={"data": "ano"}).assign(acao=acao)
+        for acao, projecao in projecoes.items()
+    ]
+    tabela = pd.concat(
+        [pd.DataFrame(columns=["acao", *COLUNAS_PROJECAO])] + tabelas,
+        ignore_index=True,
+    )
+    return tabela[["acao", *COLUNAS_PROJECAO]].astype(
+        {
+            "acao": "string",
+            "ano": "int32",
+            **{coluna: "float64" for coluna in COLUNAS_PROJECAO[1:]},
+        }
+    )
+
+
+def salvar_parquet(tabela: pd.DataFrame, caminho: str | Path) -> None:
+    # Escrita atômica, como no armazenamento dos fundamentos
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_suffix(caminho.suffix + ".tmp")
+    tabela.to_parquet(temporario, index=False)
+    os.replace(temporario, caminho)
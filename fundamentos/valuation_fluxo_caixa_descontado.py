@@ -1,7 +1,21 @@
-import pandas as pd
-from typing import Dict, List, Any, Tuple
+from typing import TYPE_CHECKING, Dict, List, Any, Mapping, Optional, Tuple
 from datetime import datetime
-from .indicadores_financeiros import IndicadoresFinanceiros
+from numpy.typing import ArrayLike
+from .valuation_fluxo_caixa_vetorizado import (
+    ValuationFluxoCaixaDescontadoVetorizado,
+    Vetor,
+)
+from .valuation_multiestagio import ValuationFluxoCaixaMultiestagio
+from .valuation_monte_carlo import (
+    ENTRADAS_FLUXO_CAIXA,
+    Distribuicao,
+    ValuationMonteCarlo,
+)
+
+# O cálculo só precisa do NumPy; o pandas é importado apenas para montar a
+# tabela de projeções em calcular_valuation
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class ValuationFluxoCaixaDescontado:
@@ -24,21 +38,23 @@ class ValuationFluxoCaixaDescontado:
         taxa_crecimento_perpetuidade: float = 0.014,
         calculo_necessidade_capital_de_giro: bool = True,
     ):
-        self.receita_ano = receita_ano
+        # float() garante o round() do Python mesmo quando os indicadores
+        # chegam como np.float64, cujo round() arredonda de outra forma
+        self.receita_ano = float(receita_ano)
         self.anos_projecao = anos_projecao
-        self.porcenta_crescimento_receita = porcenta_crescimento_receita
-        self.margem_ebit = margem_ebit
-        self.imposto_porcentagem = imposto_porcentagem
-        self.depreciacao_capex = depreciacao_capex
-        self.capex_da_receita = capex_da_receita
-        self.wacc = wacc
-        self.numero_de_acoes = numero_de_acoes
-        self.divida = divida
-        self.disponivel = disponivel
-        self.ativos_nao_operacionais = ativos_nao_operacionais
-        self.passivos_circulantes = passivos_circulantes
-        self.taxa_crecimento_perpetuidade = taxa_crecimento_perpetuidade
-        self.necessidade_capital_de_giro = necessidade_capital_de_giro
+        self.porcenta_crescimento_receita = float(porcenta_crescimento_receita)
+        self.margem_ebit = float(margem_ebit)
+        self.imposto_porcentagem = float(imposto_porcentagem)
+        self.depreciacao_capex = float(depreciacao_capex)
+        self.capex_da_receita = float(capex_da_receita)
+        self.wacc = float(wacc)
+        self.numero_de_acoes = float(numero_de_acoes)
+        self.divida = float(divida)
+        self.disponivel = float(disponivel)
+        self.ativos_nao_operacionais = float(ativos_nao_operacionais)
+        self.passivos_circulantes = float(passivos_circulantes)
+        self.taxa_crecimento_perpetuidade = float(taxa_crecimento_perpetuidade)
+        self.necessidade_capital_de_giro = float(necessidade_capital_de_giro)
         self.calculo_necessidade_capital_de_giro = calculo_necessidade_capital_de_giro
 
     def calcular_periodos(
@@ -100,7 +116,9 @@ class ValuationFluxoCaixaDescontado:
 
         return fluxo_caixa_fluxo_livre, fluxo_caixa_ajustado, valor_por_acao
 
-    def calcular_valuation(self) -> tuple[pd.DataFrame, Dict[str, float]]:
+    def calcular_valuation(self) -> tuple["pd.DataFrame", Dict[str, float]]:
+        import pandas as pd
+
         dict_valuation: Dict[str, List[Any]] = {
             "data": [],
             "receita_ano": [],
@@ -151,8 +169,96 @@ class ValuationFluxoCaixaDescontado:
 
         return pd.DataFrame(dict_valuation), dict_perpetuidade
 
+    def vetorizado(self) -> ValuationFluxoCaixaDescontadoVetorizado:
+        return ValuationFluxoCaixaDescontadoVetorizado(
+            receita_ano=self.receita_ano,
+            porcenta_crescimento_receita=self.porcenta_crescimento_receita,
+            margem_ebit=self.margem_ebit,
+            imposto_porcentagem=self.imposto_porcentagem,
+            depreciacao_capex=self.depreciacao_capex,
+            capex_da_receita=self.capex_da_receita,
+            wacc=self.wacc,
+            numero_de_acoes=self.numero_de_acoes,
+            divida=self.divida,
+            disponivel=self.disponivel,
+            ativos_nao_operacionais=self.ativos_nao_operacionais,
+            passivos_circulantes=self.passivos_circulantes,
+            necessidade_capital_de_giro=self.necessidade_capital_de_giro,
+            anos_projecao=self.anos_projecao,
+            taxa_crecimento_perpetuidade=self.taxa_crecimento_perpetuidade,
+            calculo_necessidade_capital_de_giro=self.calculo_necessidade_capital_de_giro,
+        )
+
+    def multiestagio(
+        self,
+        anos_projecao: int = 20,
+        anos_crescimento: int = 5,
+        anos_transicao: int = 10,
+        crescimento_inicial: Optional[float] = None,
+        margem_ebit: Optional[ArrayLike] = None,
+        capex_da_receita: Optional[ArrayLike] = None,
+    ) -> ValuationFluxoCaixaMultiestagio:
+        # Por padrão o estágio de crescimento alto usa o crescimento da receita
+        # desta instância; margem_ebit e capex_da_receita podem ser vetores com
+        # um valor por ano (ex.: trajetoria_estagios(0.10, 0.15, 5, 10, 20))
+        return ValuationFluxoCaixaMultiestagio(
+            receita_ano=self.receita_ano,
+            crescimento_inicial=(
+                self.porcenta_crescimento_receita
+                if crescimento_inicial is None
+                else crescimento_inicial
+            ),
+            margem_ebit=self.margem_ebit if margem_ebit is None else margem_ebit,
+            imposto_porcentagem=self.imposto_porcentagem,
+            depreciacao_capex=self.depreciacao_capex,
+            capex_da_receita=(
+                self.capex_da_receita if capex_da_receita is None else capex_da_receita
+            ),
+            wacc=self.wacc,
+            numero_de_acoes=self.numero_de_acoes,
+            divida=self.divida,
+            disponivel=self.disponivel,
+            ativos_nao_operacionais=self.ativos_nao_operacionais,
+            passivos_circulantes=self.passivos_circulantes,
+            necessidade_capital_de_giro=self.necessidade_capital_de_giro,
+            anos_projecao=anos_projecao,
+            anos_crescimento=anos_crescimento,
+            anos_transicao=anos_transicao,
+            taxa_crecimento_perpetuidade=self.taxa_crecimento_perpetuidade,
+            calculo_necessidade_capital_de_giro=self.calculo_necessidade_capital_de_giro,
+        )
+
+    def sensibilidade_wacc_perpetuidade(
+        self, eixo_wacc: ArrayLike, eixo_perpetuidade: ArrayLike
+    ) -> Vetor:
+        # Matriz de valor_por_acao: linhas = eixo_wacc, colunas = eixo_perpetuidade
+        superficie = self.vetorizado().sensibilidade_wacc_perpetuidade(
+            eixo_wacc, eixo_perpetuidade
+        )
+        matriz: Vetor = superficie[0]
+        return matriz
+
+    def monte_carlo(
+        self,
+        distribuicoes: Mapping[str, Distribuicao],
+        semente: Optional[int] = None,
+        tamanho_lote: int = 20_000,
+    ) -> ValuationMonteCarlo:
+        # As entradas sem distribuição ficam fixas nos valores desta instância
+        return ValuationMonteCarlo(
+            {nome: getattr(self, nome) for nome in ENTRADAS_FLUXO_CAIXA},
+            distribuicoes,
+            anos_projecao=self.anos_projecao,
+            calculo_necessidade_capital_de_giro=self.calculo_necessidade_capital_de_giro,
+            semente=semente,
+            tamanho_lote=tamanho_lote,
+        )
+
 
 if __name__ == "__main__":
+    import pandas as pd
+    from .indicadores_financeiros import IndicadoresFinanceiros
+
     pd.options.display.float_format = "{:.2f}".format
     ind = IndicadoresFinanceiros(ticker="PETR4.SA")
     indicadores_petr = ind.todos_indicadores()
@@ -0,0 +1,281 @@
+import sys
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+Vetor = NDArray[np.float64]
+
+
+def arredondar(valores: ArrayLike, casas: int = 2) -> Vetor:
+    # Mesmo resultado do round() do Python em cada elemento. O np.round
+    # multiplica por 10**casas antes de arredondar e pode errar o lado do
+    # empate (...5); os poucos valores nessa situação seguem o round() nativo.
+    valores = np.asarray(valores, dtype=float)
+    escala = 10.0**casas
+    escalado = valores * escala
+    resultado: Vetor = np.rint(escalado) / escala
+    distancia_empate = np.abs(np.abs(escalado - np.floor(escalado)) - 0.5)
+    duvidosos = np.isfinite(escalado) & (
+        distancia_empate <= 4 * np.spacing(np.abs(escalado))
+    )
+    if duvidosos.any():
+        resultado[duvidosos] = [round(v, casas) for v in valores[duvidosos].tolist()]
+    return resultado
+
+
+def potencia(base: ArrayLike, expoente: ArrayLike) -> Vetor:
+    # O np.power usa rotinas SIMD que diferem em 1 ulp do pow da libm usado
+    # pelo operador ** do Python; o np.float_power chama o pow da libm.
+    resultado: Vetor = np.float_power(base, expoente)
+    return resultado
+
+
+def somar_colunas(valores: Vetor) -> Vetor:
+    # Soma ao longo da última dimensão na mesma ordem do sum() do Python.
+    # A partir do Python 3.12 o sum() de floats usa a soma compensada de
+    # Neumaier, reproduzida aqui para manter os resultados idênticos.
+    total = valores[..., 0].copy()
+    if sys.version_info < (3, 12):
+        for coluna in range(1, valores.shape[-1]):
+            total = total + valores[..., coluna]
+        return total
+    compensacao = np.zeros_like(total)
+    for coluna in range(1, valores.shape[-1]):
+        valor = valores[..., coluna]
+        parcial = total + valor
+        compensacao += np.where(
+            np.abs(total) >= np.abs(valor),
+            (total - parcial) + valor,
+            (valor - parcial) + total,
+        )
+        total = parcial
+    compensar = (compensacao != 0) & np.isfinite(compensacao)
+    return np.where(compensar, total + compensacao, total)
+
+
+# Versão vetorizada de ValuationFluxoCaixaDescontado: cada entrada pode ser
+# um número ou um array com uma posição por empresa (ou por cenário), e todas
+# as empresas são calculadas de uma vez com operações do NumPy. Com
+# arredondar=True os arredondamentos seguem exatamente a classe escalar.
+class ValuationFluxoCaixaDescontadoVetorizado:
+    def __init__(
+        self,
+        receita_ano: ArrayLike,
+        porcenta_crescimento_receita: ArrayLike,
+        margem_ebit: ArrayLike,
+        imposto_porcentagem: ArrayLike,
+        depreciacao_capex: ArrayLike,
+        capex_da_receita: ArrayLike,
+        wacc: ArrayLike,
+        numero_de_acoes: ArrayLike,
+        divida: ArrayLike,
+        disponivel: ArrayLike,
+        ativos_nao_operacionais: ArrayLike,
+        passivos_circulantes: ArrayLike,
+        necessidade_capital_de_giro: ArrayLike,
+        anos_projecao: int = 5,
+        taxa_crecimento_perpetuidade: ArrayLike = 0.014,
+        calculo_necessidade_capital_de_giro: ArrayLike = True,
+        arredondar: bool = True,
+    ):
+        entradas = np.broadcast_arrays(
+            *(
+                np.atleast_1d(np.asarray(valor, dtype=float))
+                for valor in (
+                    receita_ano,
+                    porcenta_crescimento_receita,
+                    margem_ebit,
+                    imposto_porcentagem,
+                    depreciacao_capex,
+                    capex_da_receita,
+                    wacc,
+                    numero_de_acoes,
+                    divida,
+                    disponivel,
+                    ativos_nao_operacionais,
+                    passivos_circulantes,
+                    necessidade_capital_de_giro,
+                    taxa_crecimento_perpetuidade,
+                )
+            )
+        )
+        (
+            self.receita_ano,
+            self.porcenta_crescimento_receita,
+            self.margem_ebit,
+            self.imposto_porcentagem,
+            self.depreciacao_capex,
+            self.capex_da_receita,
+            self.wacc,
+            self.numero_de_acoes,
+            self.divida,
+            self.disponivel,
+            self.ativos_nao_operacionais,
+            self.passivos_circulantes,
+            self.necessidade_capital_de_giro,
+            self.taxa_crecimento_perpetuidade,
+        ) = entradas
+        self.calculo_necessidade_capital_de_giro = np.broadcast_to(
+            np.asarray(calculo_necessidade_capital_de_giro, dtype=bool),
+            self.receita_ano.shape,
+        )
+        self.anos_projecao = anos_projecao
+        self.arredondar = arredondar
+
+    def _arredondar(self, valores: Vetor) -> Vetor:
+        if self.arredondar:
+            return arredondar(valores, 2)
+        return valores
+
+    def calcular_periodos(self) -> Dict[str, Vetor]:
+        # Cada array tem formato (empresas, anos_projecao). O laço é só nos
+        # anos: o arredondamento da receita a cada ano torna a projeção
+        # sequencial, mas cada passo é feito para todas as empresas de uma vez.
+        formato = self.receita_ano.shape + (self.anos_projecao,)
+        periodos = {
+            nome: np.empty(formato)
+            for nome in (
+                "receita_ano",
+                "ebit_ano",
+                "imposto_ano",
+                "capex_ano",
+                "depreciacao_ano",
+                "ebit_ajustado",
+                "fluxo_caixa",
+                "valor_presente_fluxo",
+            )
+        }
+
+        receita_ano = self.receita_ano
+        desconto_base = 1 + self.wacc
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for indice, anos in enumerate(range(1, self.anos_projecao + 1)):
+                receita_ano = self._arredondar(
+                    receita_ano * (1 + self.porcenta_crescimento_receita)
+                )
+                ebit_ano = self._arredondar(receita_ano * self.margem_ebit)
+                imposto_ano = self._arredondar(ebit_ano * self.imposto_porcentagem)
+                capex_ano = self._arredondar(receita_ano * self.capex_da_receita)
+                depreciacao_ano = self._arredondar(self.depreciacao_capex * capex_ano)
+                ebit_ajustado = self._arredondar(
+                    ebit_ano - imposto_ano + depreciacao_ano
+                )
+                fluxo_caixa = np.where(
+                    self.calculo_necessidade_capital_de_giro,
+                    ebit_ajustado - capex_ano + self.necessidade_capital_de_giro,
+                    ebit_ajustado - capex_ano,
+                )
+                valor_presente_fluxo = self._arredondar(
+                    fluxo_caixa / potencia(desconto_base, anos)
+                )
+
+                periodos["receita_ano"][..., indice] = receita_ano
+                periodos["ebit_ano"][..., indice] = ebit_ano
+                periodos["imposto_ano"][..., indice] = imposto_ano
+                periodos["capex_ano"][..., indice] = capex_ano
+                periodos["depreciacao_ano"][..., indice] = depreciacao_ano
+                periodos["ebit_ajustado"][..., indice] = ebit_ajustado
+                periodos["fluxo_caixa"][..., indice] = fluxo_caixa
+                periodos["valor_presente_fluxo"][..., indice] = valor_presente_fluxo
+
+        return periodos
+
+    def calculo_perpetudidade(
+        self,
+        periodos: Dict[str, Vetor],
+        wacc: Optional[ArrayLike] = None,
+        taxa_crecimento_perpetuidade: Optional[ArrayLike] = None,
+    ) -> Tuple[Vetor, Vetor, Vetor]:
+        # periodos pode ter eixos extras entre o das empresas e o dos anos
+        # (ex.: grade de sensibilidade); as entradas de cada empresa ganham
+        # eixos unitários para acompanhar esse formato.
+        extras = periodos["valor_presente_fluxo"].ndim - self.receita_ano.ndim - 1
+
+        def por_empresa(valores: Vetor) -> Vetor:
+            return valores.reshape(valores.shape + (1,) * extras)
+
+        wacc = por_empresa(self.wacc) if wacc is None else np.asarray(wacc)
+        taxa_crecimento_perpetuidade = (
+            por_empresa(self.taxa_crecimento_perpetuidade)
+            if taxa_crecimento_perpetuidade is None
+            else np.asarray(taxa_crecimento_perpetuidade)
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            fluxo_perpetuidade = self._arredondar(
+                periodos["fluxo_caixa"][..., -1]
+                * (1 + por_empresa(self.porcenta_crescimento_receita))
+            )
+
+            perpetuidade = self._arredondar(
+                fluxo_perpetuidade / (wacc - taxa_crecimento_perpetuidade)
+            )
+
+            valor_presente = self._arredondar(
+                perpetuidade / potencia(1 + wacc, self.anos_projecao)
+            )
+
+            fluxo_caixa_fluxo_livre = self._arredondar(
+                somar_colunas(periodos["valor_presente_fluxo"])
+                + valor_presente
+                - por_empresa(self.divida)
+            )
+
+            fluxo_caixa_ajustado = self._arredondar(
+                fluxo_caixa_fluxo_livre
+                + por_empresa(self.disponivel)
+                + por_empresa(self.ativos_nao_operacionais)
+                - por_empresa(self.passivos_circulantes)
+            )
+
+            valor_por_acao = self._arredondar(
+                fluxo_caixa_ajustado / por_empresa(self.numero_de_acoes)
+            )
+
+        return fluxo_caixa_fluxo_livre, fluxo_caixa_ajustado, valor_por_acao
+
+    def sensibilidade_wacc_perpetuidade(
+        self, eixo_wacc: ArrayLike, eixo_perpetuidade: ArrayLike
+    ) -> Vetor:
+        # Superfície de valor_por_acao com formato (empresas, wacc, perpetuidade).
+        # Os fluxos de caixa não dependem do wacc nem do crescimento na
+        # perpetuidade, então são projetados uma vez e só o desconto e a
+        # perpetuidade são calculados para a grade inteira por broadcasting.
+        # Células com wacc <= crescimento na perpetuidade ficam como NaN.
+        eixo_wacc = np.asarray(eixo_wacc, dtype=float).reshape(-1)
+        eixo_perpetuidade = np.asarray(eixo_perpetuidade, dtype=float).reshape(-1)
+        wacc = eixo_wacc[:, np.newaxis]
+        taxa_crecimento_perpetuidade = eixo_perpetuidade[np.newaxis, :]
+
+        fluxo_caixa = self.calcular_periodos()["fluxo_caixa"][
+            ..., np.newaxis, np.newaxis, :
+        ]
+        anos = np.arange(1, self.anos_projecao + 1)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            valor_presente_fluxo = self._arredondar(
+                fluxo_caixa / potencia(1 + wacc[..., np.newaxis], anos)
+            )
+
+        _, _, valor_por_acao = self.calculo_perpetudidade(
+            {"fluxo_caixa": fluxo_caixa, "valor_presente_fluxo": valor_presente_fluxo},
+            wacc=wacc,
+            taxa_crecimento_perpetuidade=taxa_crecimento_perpetuidade,
+        )
+        return np.where(wacc > taxa_crecimento_perpetuidade, valor_por_acao, np.nan)
+
+    def calcular_valuation(self) -> Tuple[Dict[str, NDArray[Any]], Dict[str, Vetor]]:
+        periodos = self.calcular_periodos()
+
+        fluxo_caixa_fluxo_livre, fluxo_caixa_ajustado, valor_por_acao = (
+            self.calculo_perpetudidade(periodos)
+        )
+
+        dict_perpetuidade = {
+            "fluxo_caixa_fluxo_livre": fluxo_caixa_fluxo_livre,
+            "fluxo_caixa_ajustado": fluxo_caixa_ajustado,
+            "valor_por_acao": valor_por_acao,
+        }
+        anos = np.arange(datetime.now().year, datetime.now().year + self.anos_projecao)
+        return {**periodos, "data": anos}, dict_perpetuidade
@@ -0,0 +1,74 @@
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .valuation_fluxo_caixa_vetorizado import Vetor, potencia
+
+
+# Modelo de Gordon (desconto de dividendos) para várias ações de uma vez, a
+# partir de entradas já calculadas: d1, wacc (custo do capital próprio) e
+# g_sust, cada um um número ou um array com uma posição por ação. Onde
+# wacc - g <= spread_minimo o modelo não tem valor finito (ou explode) e o
+# resultado fica como NaN.
+class ValuationGordonVetorizado:
+    def __init__(
+        self,
+        d1: ArrayLike,
+        wacc: ArrayLike,
+        g_sust: ArrayLike,
+        spread_minimo: float = 0.0,
+    ):
+        self.d1, self.wacc, self.g_sust = np.broadcast_arrays(
+            *(
+                np.atleast_1d(np.asarray(valor, dtype=float))
+                for valor in (d1, wacc, g_sust)
+            )
+        )
+        self.spread_minimo = spread_minimo
+
+    def _mascarar(self, valores: Vetor, wacc: Vetor, g: Vetor) -> Vetor:
+        return np.where(wacc - g > self.spread_minimo, valores, np.nan)
+
+    def preco_acao(self) -> Vetor:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            preco = self.d1 / (self.wacc - self.g_sust)
+        return self._mascarar(preco, self.wacc, self.g_sust)
+
+    def dois_estagios(self, g_inicial: ArrayLike, anos: int) -> Vetor:
+        # Dividendos crescem a g_inicial por `anos` anos e depois a g_sust
+        # para sempre; o valor terminal é o Gordon no fim do primeiro estágio.
+        g_inicial = np.asarray(g_inicial, dtype=float)[..., np.newaxis]
+        wacc = self.wacc[..., np.newaxis]
+        periodos = np.arange(1, anos + 1)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            dividendos = self.d1[..., np.newaxis] * potencia(
+                1 + g_inicial, periodos - 1
+            )
+            valor_estagio = (dividendos / potencia(1 + wacc, periodos)).sum(axis=-1)
+            terminal = (
+                dividendos[..., -1]
+                * (1 + self.g_sust)
+                / (self.wacc - self.g_sust)
+                / potencia(1 + self.wacc, anos)
+            )
+        return self._mascarar(valor_estagio + terminal, self.wacc, self.g_sust)
+
+    def modelo_h(self, g_inicial: ArrayLike, meia_vida: ArrayLike) -> Vetor:
+        # Modelo H: o crescimento cai linearmente de g_inicial até g_sust em
+        # 2 * meia_vida anos. Com D0 = d1 / (1 + g_sust):
+        # P = d1 / (k - g) + D0 * H * (g_inicial - g) / (k - g)
+        g_inicial = np.asarray(g_inicial, dtype=float)
+        meia_vida = np.asarray(meia_vida, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d0 = self.d1 / (1 + self.g_sust)
+            preco = (self.d1 + d0 * meia_vida * (g_inicial - self.g_sust)) / (
+                self.wacc - self.g_sust
+            )
+        return self._mascarar(preco, self.wacc, self.g_sust)
+
+    def sensibilidade(self, eixo_wacc: ArrayLike, eixo_g: ArrayLike) -> Vetor:
+        # Superfície de preço com formato (ações, wacc, g) em uma só operação
+        wacc = np.asarray(eixo_wacc, dtype=float).reshape(1, -1, 1)
+        g = np.asarray(eixo_g, dtype=float).reshape(1, 1, -1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            preco = self.d1.reshape(-1, 1, 1) / (wacc - g)
+        return self._mascarar(preco, wacc, g)
@@ -0,0 +1,407 @@
+import json
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, TextIO
+
+import pandas as pd
+
+from .dados_empresa import DadosEmpresa
+from .escritores import EscritorResultados
+from .indicadores_financeiros import IndicadoresFinanceiros
+from .instrumentacao import instrumentacao
+from .provedores import FUSO_B3
+from .saida_valuations import COLUNAS_VALUATION, tabela_projecoes
+from .valuation_fluxo_caixa_descontado import ValuationFluxoCaixaDescontado
+from .valuation_metodo_gordon import ValuationModoloGordon
+
+
+def entradas_fluxo_caixa(indicadores: Mapping[str, Any]) -> Dict[str, Any]:
+    # Argumentos do ValuationFluxoCaixaDescontado a partir de
+    # IndicadoresFinanceiros.todos_indicadores(); usado pelo lote e pelos
+    # benchmarks, para os dois calcularem exatamente o mesmo fluxo de caixa
+    variacao_receita = indicadores["variacaoreceita"]
+    return {
+        "receita_ano": indicadores["ultimareceita"],
+        "porcenta_crescimento_receita": (
+            variacao_receita["median_deflacionada"]
+            if "median_deflacionada" in variacao_receita.keys()
+            else variacao_receita["median_normal"]
+        ),
+        "margem_ebit": indicadores["margemebit"],
+        "imposto_porcentagem": indicadores["percentualimposto"],
+        "depreciacao_capex": indicadores["depreciacaocapex"],
+        "capex_da_receita": indicadores["capexreceita"],
+        "wacc": indicadores["wacc"],
+        "numero_de_acoes": indicadores["quantidadeacoes"],
+        "divida": indicadores["dividatotal"],
+        "disponivel": indicadores["caixa"],
+        "ativos_nao_operacionais": indicadores["outrosativos"],
+        "passivos_circulantes": indicadores["passivosmenosdivida"],
+        "necessidade_capital_de_giro": indicadores["necessidadecapitalgiro"],
+        "calculo_necessidade_capital_de_giro": False,
+    }
+
+
+# Valuation de várias ações em um pool de threads: quase todo o tempo de cada
+# ação é espera de rede, então as ações são processadas em paralelo. O
+# resultado segue a ordem da lista de entrada, independente de qual ação
+# terminou primeiro.
+class ValuationLote:
+    def __init__(
+        self,
+        acoes: List[str],
+        max_workers: int = 8,
+        timeout_acao: Optional[float] = 300,
+        modo: str = "online",
+        idade_maxima: Optional[timedelta] = None,
+        anos_projecao: int = 5,
+        taxa_crecimento_perpetuidade: float = 0.014,
+        anteriores: Optional[pd.DataFrame] = None,
+        impressoes_anteriores: Optional[Dict[str, Dict[str, str]]] = None,
+        checkpoint: Optional[str | Path] = None,
+        retomar: bool = False,
+        escritores: Sequence[EscritorResultados] = (),
+        manter_resultados: bool = True,
+        ttm: bool = False,
+        betas: Optional[Mapping[str, float]] = None,
+        cotacoes: Optional[Mapping[str, float]] = None,
+    ):
+        self.acoes = acoes
+        self.max_workers = max_workers
+        self.timeout_acao = timeout_acao
+        self.modo = modo
+        self.idade_maxima = idade_maxima
+        self.anos_projecao = anos_projecao
+        self.taxa_crecimento_perpetuidade = taxa_crecimento_perpetuidade
+        # Indicadores dos últimos doze meses (trimestres) em vez do último ano
+        self.ttm = ttm
+        # Betas por ação (ex.: CalculoBeta(...).betas()); as ações fora do
+        # dicionário usam o beta do info do Yahoo
+        self.betas = dict(betas or {})
+        # Cotações por ação obtidas em lote (ex.: CotacoesAtuais(...).cotacoes());
+        # as ações fora do dicionário usam o fim do histórico de 10 anos
+        self.cotacoes = dict(cotacoes or {})
+        # Modo incremental: com o resultado e as impressões digitais da rodada
+        # anterior, ações sem demonstrativos novos reaproveitam a linha antiga
+        # e só atualizam as colunas que dependem da cotação
+        self.anteriores: Dict[str, Dict[str, Any]] = (
+            {}
+            if anteriores is None
+            else {
+                str(linha["acao"]): {
+                    str(coluna): valor for coluna, valor in linha.items()
+                }
+                for linha in anteriores.to_dict("records")
+            }
+        )
+        self.impressoes_anteriores = impressoes_anteriores or {}
+        self.impressoes: Dict[str, Dict[str, str]] = {}
+        self.reaproveitadas: List[str] = []
+        # Projeção ano a ano do fluxo de caixa de cada ação calculada
+        self.projecoes: Dict[str, pd.DataFrame] = {}
+        # Cada ação concluída (ou com erro) é acrescentada ao checkpoint, um
+        # JSON por linha, assim que termina. Com retomar=True as ações que já
+        # deram certo são lidas de lá e só as demais são processadas.
+        self.checkpoint = Path(checkpoint) if checkpoint is not None else None
+        self.retomar = retomar
+        self.retomadas: List[str] = []
+        self.erros: Dict[str, str] = {}
+        # Ações que passaram do tempo limite e cujas threads ainda ocupam um
+        # worker do pool (a thread só termina quando a chamada de rede volta)
+        self.presas: List[str] = []
+        self._inicios: Dict[str, float] = {}
+        self._arquivo_checkpoint: Optional[TextIO] = None
+        # Cada resultado vai para os escritores assim que a ação termina. Com
+        # manter_resultados=False a linha e a projeção não ficam em memória
+        # depois de escritas e rodar() devolve uma tabela vazia: a memória não
+        # cresce com a quantidade de ações.
+        self.escritores = list(escritores)
+        self.manter_resultados = manter_resultados
+
+    def preco_atual(self, acao: str, dados: DadosEmpresa) -> float:
+        cotacao = self.cotacoes.get(acao)
+        if cotacao is not None and pd.notna(cotacao):
+            return float(round(cotacao, 2))
+        return float(round(dados.historico()["Close"].iloc[-1], 2))
+
+    def _com_preco(
+        self, linha: Dict[str, Any], valor_acao_atual: float
+    ) -> Dict[str, Any]:
+        linha["valor_atual"] = valor_acao_atual
+        linha["diferenca_gordon"] = round(
+            (linha["preco_gordon"] - valor_acao_atual) / valor_acao_atual, 2
+        )
+        linha["diferenca_fluxo"] = round(
+            (linha["preco_fluxo"] - valor_acao_atual) / valor_acao_atual, 2
+        )
+        return linha
+
+    def _linha_anterior(
+        self, acao: str, impressao: Dict[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        if (
+            acao not in self.anteriores
+            or self.impressoes_anteriores.get(acao) != impressao
+        ):
+            return None
+        return dict(self.anteriores[acao])
+
+    def valuation_acao(self, acao: str) -> Dict[str, Any]:
+        dados = DadosEmpresa(
+            f"{acao}.SA", modo=self.modo, idade_maxima=self.idade_maxima
+        )
+
+        with instrumentacao.medir("demonstrativos"):
+            impressao = dados.impressao_digital(ttm=self.ttm)
+        self.impressoes[acao] = impressao
+        if self.anteriores:
+            anterior = self._linha_anterior(acao, impressao)
+            if anterior is not None:
+                print(
+                    f"Sem demonstrativos novos para {acao}: só a cotação é atualizada"
+                )
+                self.reaproveitadas.append(acao)
+                with instrumentacao.medir("preco_atual"):
+                    return self._com_preco(anterior, self.preco_atual(acao, dados))
+
+        with instrumentacao.medir("gordon"):
+            valu = ValuationModoloGordon(
+                f"{acao}.SA",
+                dados=dados,
+                beta=self.betas.get(acao),
+                preco_atual=self.cotacoes.get(acao),
+            )
+            preco_gordon = valu.preco_acao()
+
+        with instrumentacao.medir("indicadores"):
+            ind = IndicadoresFinanceiros(
+                ticker=f"{acao}.SA",
+                dados=dados,
+                ttm=self.ttm,
+                beta=self.betas.get(acao),
+            )
+            indicadores = ind.todos_indicadores()
+
+        valuation_fluxo = ValuationFluxoCaixaDescontado(
+            **entradas_fluxo_caixa(indicadores),
+            anos_projecao=self.anos_projecao,
+            taxa_crecimento_perpetuidade=self.taxa_crecimento_perpetuidade,
+        )
+
+        with instrumentacao.medir("fluxo_caixa"):
+            projecao, valor_fluxo = valuation_fluxo.calcular_valuation()
+        self.projecoes[acao] = projecao
+
+        linha = {
+            "acao": acao,
+            "preco_gordon": preco_gordon["valuation_acao"],
+            "preco_fluxo": valor_fluxo["valor_por_acao"],
+            "margem_ebit": indicadores["margemebit"],
+            "variacao_receita": indicadores["variacaoreceita"],
+            "wacc": indicadores["wacc"],
+            "quantidade_acoes": indicadores["quantidadeacoes"],
+            "divida_total": indicadores["dividatotal"],
+            "caixa": indicadores["caixa"],
+            "outros_ativos": indicadores["outrosativos"],
+            "passivos_menos_divida": indicadores["passivosmenosdivida"],
+            "percentual_imposto": indicadores["percentualimposto"],
+            # Demais entradas do fluxo de caixa, para refazer o cálculo (ex.: DCF
+            # reverso) só com o CSV
+            "receita_ano": valuation_fluxo.receita_ano,
+            "crescimento_receita": valuation_fluxo.porcenta_crescimento_receita,
+            "depreciacao_capex": valuation_fluxo.depreciacao_capex,
+            "capex_receita": valuation_fluxo.capex_da_receita,
+        }
+        with instrumentacao.medir("preco_atual"):
+            return self._com_preco(linha, self.preco_atual(acao, dados))
+
+    def cabecalho_checkpoint(self) -> Dict[str, Any]:
+        # Primeira linha do checkpoint: identifica a rodada pela data e pelas
+        # ações, para não retomar resultados de outro dia ou de outra lista
+        return {
+            "tipo": "cabecalho",
+            "data": datetime.now(FUSO_B3).date().isoformat(),
+            "acoes": sorted(self.acoes),
+        }
+
+    def checkpoint_compativel(self) -> bool:
+        if self.checkpoint is None or not self.checkpoint.exists():
+            return False
+        with self.checkpoint.open(encoding="utf-8") as arquivo:
+            primeira = arquivo.readline()
+        try:
+            return bool(json.loads(primeira) == self.cabecalho_checkpoint())
+        except json.JSONDecodeError:
+            return False
+
+    def ler_checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        # Último registro de cada ação que terminou com sucesso
+        concluidas: Dict[str, Dict[str, Any]] = {}
+        if self.checkpoint is None or not self.checkpoint_compativel():
+            return concluidas
+        with self.checkpoint.open(encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    # Linha incompleta de uma rodada interrompida
+                    continue
+                if "status" not in registro:
+                    continue
+                if registro["status"] == "ok":
+                    concluidas[registro["acao"]] = registro
+                else:
+                    concluidas.pop(registro["acao"], None)
+        return concluidas
+
+    def _registrar(self, acao: str, **registro: Any) -> None:
+        if self._arquivo_checkpoint is None:
+            return
+        registro = {"acao": acao, **registro}
+        if acao in self.impressoes:
+            registro["impressao"] = self.impressoes[acao]
+        if registro["status"] == "ok" and acao in self.projecoes:
+            registro["projecao"] = self.projecoes[acao].to_dict("list")
+        # Ação reaproveitada não tem projeção nova: ao retomar, quem consome
+        # o lote precisa saber que deve manter a projeção da rodada anterior
+        if registro["status"] == "ok" and acao in self.reaproveitadas:
+            registro["reaproveitada"] = True
+        self._arquivo_checkpoint.write(json.dumps(registro, default=str) + "\n")
+        self._arquivo_checkpoint.flush()
+
+    def _emitir(self, acao: str, linha: Dict[str, Any]) -> None:
+        for escritor in self.escritores:
+            escritor.escrever(linha, self.projecoes.get(acao))
+
+    def _executar(self, acao: str) -> Dict[str, Any]:
+        self._inicios[acao] = time.monotonic()
+        print("-" * 10, acao, "-" * 10)
+        with instrumentacao.acao(acao):
+            return self.valuation_acao(acao)
+
+    def _expiradas(self, pendentes: Dict["Future[Dict[str, Any]]", str]) -> List[Any]:
+        if self.timeout_acao is None:
+            return []
+        agora = time.monotonic()
+        return [
+            futuro
+            for futuro, acao in pendentes.items()
+            if acao in self._inicios and agora - self._inicios[acao] > self.timeout_acao
+        ]
+
+    def rodar(self) -> pd.DataFrame:
+        resultados: Dict[str, Dict[str, Any]] = {}
+        self.erros = {}
+        self.impressoes = {}
+        self.reaproveitadas = []
+        self.projecoes = {}
+        self.retomadas = []
+        self.presas = []
+        self._inicios = {}
+        expiradas: Dict["Future[Dict[str, Any]]", str] = {}
+
+        if self.checkpoint is not None:
+            retomar = self.retomar and self.checkpoint_compativel()
+            if self.retomar and not retomar and self.checkpoint.exists():
+                print(
+                    f"Checkpoint {self.checkpoint} é de outra rodada (data ou ações "
+                    "diferentes) e foi ignorado"
+                )
+            if retomar:
+                for acao, registro in self.ler_checkpoint().items():
+                    if acao in self.acoes:
+                        resultados[acao] = registro["linha"]
+                        if "impressao" in registro:
+                            self.impressoes[acao] = registro["impressao"]
+                        if "projecao" in registro:
+                            self.projecoes[acao] = pd.DataFrame(registro["projecao"])
+                        if registro.get("reaproveitada"):
+                            self.reaproveitadas.append(acao)
+                        self.retomadas.append(acao)
+                        self._emitir(acao, resultados[acao])
+            self.checkpoint.parent.mkdir(parents=True, exist_ok=True)
+            self._arquivo_checkpoint = self.checkpoint.open(
+                "a" if retomar else "w", encoding="utf-8"
+            )
+            if not retomar:
+                self._arquivo_checkpoint.write(
+                    json.dumps(self.cabecalho_checkpoint()) + "\n"
+                )
+                self._arquivo_checkpoint.flush()
+            # Uma rodada interrompida pode ter deixado a última linha pela metade
+            elif self._arquivo_checkpoint.tell() > 0:
+                with self.checkpoint.open("rb") as arquivo:
+                    arquivo.seek(-1, 2)
+                    if arquivo.read() != b"\n":
+                        self._arquivo_checkpoint.write("\n")
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pendentes = {
+            executor.submit(self._executar, acao): acao
+            for acao in self.acoes
+            if acao not in resultados
+        }
+        if not self.manter_resultados:
+            # As ações retomadas já foram entregues aos escritores
+            resultados.clear()
+            self.projecoes.clear()
+        try:
+            while pendentes:
+                concluidos, _ = wait(
+                    pendentes, timeout=1.0, return_when=FIRST_COMPLETED
+                )
+                for futuro in concluidos:
+                    acao = pendentes.pop(futuro)
+                    try:
+                        resultados[acao] = futuro.result()
+                        self._registrar(acao, status="ok", linha=resultados[acao])
+                        self._emitir(acao, resultados[acao])
+                        if not self.manter_resultados:
+                            del resultados[acao]
+                            self.projecoes.pop(acao, None)
+                    # Qualquer falha de uma ação (dados faltando, erro ou limite
+                    # de requisições do Yahoo) vira erro dela, sem derrubar o lote
+                    except Exception as e:  # noqa: BLE001
+                        print(f"Erro ao obter dados da acao {acao}: {e}")
+                        traceback.print_exception(e)
+                        self.erros[acao] = str(e)
+                        self._registrar(acao, status="erro", erro=str(e))
+                # Uma thread não pode ser interrompida: a ação que passa do
+                # tempo limite é descartada e o resultado ignorado, mas a thread
+                # continua ocupando um worker até a requisição em andamento
+                # voltar (o provedor limita o tempo de cada requisição). Essas
+                # threads contam contra o tamanho do pool.
+                for futuro in self._expiradas(pendentes):
+                    acao = pendentes.pop(futuro)
+                    expiradas[futuro] = acao
+                    self.erros[acao] = f"Tempo limite de {self.timeout_acao}s excedido."
+                    self._registrar(acao, status="erro", erro=self.erros[acao])
+                    presas = sum(not expirada.done() for expirada in expiradas)
+                    print(
+                        f"Tempo limite excedido para a acao {acao} ({presas} de "
+                        f"{self.max_workers} workers presos em ações expiradas)"
+                    )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            # O interpretador espera essas threads antes de sair
+            self.presas = [
+                acao for futuro, acao in expiradas.items() if not futuro.done()
+            ]
+            if self._arquivo_checkpoint is not None:
+                self._arquivo_checkpoint.close()
+                self._arquivo_checkpoint = None
+
+        linhas = [resultados[acao] for acao in self.acoes if acao in resultados]
+        return pd.DataFrame(linhas, columns=COLUNAS_VALUATION)
+
+    def tabela_projecoes(self) -> pd.DataFrame:
+        return tabela_projecoes(
+            {
+                acao: self.projecoes[acao]
+                for acao in self.acoes
+                if acao in self.projecoes
+            }
+        )
@@ -1,10 +1,14 @@
 import numpy as np
-import yfinance as yf
 import pandas as pd
-import ipeadatapy as ip
 from datetime import datetime
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, Optional
 from pandas.core.series import Series
+from .dados_empresa import DadosEmpresa
+from .dados_macro import dados_macro
+from .valuation_gordon_vetorizado import ValuationGordonVetorizado
+
+if TYPE_CHECKING:
+    import yfinance as yf
 
 
 # Definir um tipo personalizado para Series de float
@@ -16,34 +20,51 @@ class ValuationModoloGordon:
         ticker: str,
         start_date_retorno: str = "2004-01-01",
         end_date_retorno: str = datetime.today().strftime("%Y-%m-%d"),
+        dados: Optional[DadosEmpresa] = None,
+        spread_minimo: float = 0.01,
+        beta: Optional[float] = None,
+        preco_atual: Optional[float] = None,
     ):
         self.ticker = ticker
+        # Beta calculado fora (ex.: CalculoBeta); sem ele, usa o do info
+        self.beta_calculado = beta
+        # Cotação já obtida em lote (ex.: CotacoesAtuais); sem ela, usa o
+        # último fechamento do histórico
+        self.preco_atual = preco_atual
+        # wacc - g abaixo disso gera preços negativos ou absurdos: vira NaN
+        self.spread_minimo = spread_minimo
+        self.dados = dados if dados is not None else DadosEmpresa(ticker)
         self.start_date_retorno = start_date_retorno
         self.end_date_retorno = end_date_retorno
         self.dicionario_indicadores: dict[str, Any] = {}
         self.dicionario_indicadores["ticker"] = ticker
 
-    def acao(self) -> yf.Ticker:
-        setando_ticker = yf.Ticker(self.ticker)
-        setando_ticker.history(period="10Y", interval="1d")
-        return setando_ticker
+    def acao(self) -> "yf.Ticker":
+        import yfinance as yf
+
+        return yf.Ticker(self.ticker)
 
-    def preco_historico(self) -> Series:  # type: ignore[type-arg]
-        preco_his = self.acao().history(period="10Y", interval="1d")["Close"]
+    def preco_historico(self) -> Series:
+        preco_his = self.dados.historico()["Close"]
         if preco_his is None:
             return pd.Series(dtype=float)
         if not isinstance(preco_his, pd.Series):  # Garante que é uma Series
             raise TypeError("Erro: 'Close' não retornou uma Series!")
         return preco_his.astype(float)
 
+    def cotacao(self) -> float:
+        if self.preco_atual is not None and not np.isnan(self.preco_atual):
+            return float(self.preco_atual)
+        return float(self.preco_historico().values[-1])
+
     def g_sustainable(self) -> float:
         try:
-            returnOnEquity = self.acao().info["returnOnEquity"]
+            returnOnEquity = self.dados.info["returnOnEquity"]
         except KeyError:
             print("Nao tem returnOnEquity")
             returnOnEquity = 0
         try:
-            payoutRatio = self.acao().get_info()["payoutRatio"]
+            payoutRatio = self.dados.get_info()["payoutRatio"]
         except KeyError:
             print("Nao tem payoutRatio")
             payoutRatio = 0
@@ -55,47 +76,26 @@ class ValuationModoloGordon:
         return float(g_sust)
 
     def beta(self) -> float:
-        try:
-            beta_acao = round(self.acao().info["beta"], 4)
-        except KeyError:
-            print("Nao tem beta")
-            beta_acao = 1
+        if self.beta_calculado is not None and not np.isnan(self.beta_calculado):
+            beta_acao = round(self.beta_calculado, 4)
+        else:
+            try:
+                beta_acao = round(self.dados.info["beta"], 4)
+            except KeyError:
+                print("Nao tem beta")
+                beta_acao = 1
         self.dicionario_indicadores["beta"] = beta_acao
         return float(beta_acao)
 
     def juros_livre(self) -> float:
-        juros = (
-            ip.timeseries("BMF12_SWAPDI36012")
-            .rename(columns={"VALUE ((% a.a.))": "swaps"})[["swaps"]]
-            .div(100)
-            .iloc[-1]
-            .swaps
-        )
+        juros = dados_macro.juros_livre()
         self.dicionario_indicadores["juros_livre"] = round(juros, 4)
-        return float(juros)
+        return juros
 
     def retorno_mercado(self) -> float:
-        ibov = yf.download(
-            "^BVSP", start=self.start_date_retorno, end=self.end_date_retorno
+        return dados_macro.retorno_mercado(
+            self.start_date_retorno, self.end_date_retorno
         )
-        if ibov is None or ibov.empty:
-            raise ValueError("Erro: Nenhum dado foi baixado para o IBOVESPA.")
-
-        # Garantir que a coluna 'Close' existe
-        if "Close" not in ibov.columns:
-            raise ValueError("Erro: A coluna 'Close' não está presente nos dados.")
-
-        porcentagem = ibov.pct_change()["Close"]
-
-        porcentagem.dropna(axis=0, inplace=True)
-
-        compounded_growth = (1 + porcentagem).prod()
-
-        n_periods = porcentagem.shape[0]
-
-        retorno_medio = compounded_growth ** (252 / n_periods) - 1
-
-        return float(retorno_medio["^BVSP"])
 
     def wacc_gordon(self) -> float:
         wacc = self.juros_livre() + self.beta() * (
@@ -104,8 +104,8 @@ class ValuationModoloGordon:
         self.dicionario_indicadores["wacc"] = float(round(wacc, 4))
         return wacc
 
-    def dividendos(self) -> Series:  # type: ignore[type-arg]
-        divi = self.acao().dividends
+    def dividendos(self) -> Series:
+        divi = self.dados.dividends
         if divi is None:
             return pd.Series(dtype=float)
         if not isinstance(divi, pd.Series):  # Garante que é uma Series
@@ -129,9 +129,15 @@ class ValuationModoloGordon:
         return float(dividendo)
 
     def preco_acao(self) -> Dict[str, str]:
-        pv = self.d1() / (self.wacc_gordon() - self.g_sustainable())
+        gordon = ValuationGordonVetorizado(
+            self.d1(),
+            self.wacc_gordon(),
+            self.g_sustainable(),
+            spread_minimo=self.spread_minimo,
+        )
+        pv = float(gordon.preco_acao()[0])
 
-        preco_atual = self.preco_historico().values[-1]
+        preco_atual = self.cotacao()
 
         self.dicionario_indicadores["valuation_acao"] = round(pv, 2)
 
@@ -0,0 +1,204 @@
+from typing import Dict, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .valuation_fluxo_caixa_vetorizado import (
+    ValuationFluxoCaixaDescontadoVetorizado,
+    Vetor,
+)
+
+ENTRADAS_FLUXO_CAIXA = (
+    "receita_ano",
+    "porcenta_crescimento_receita",
+    "margem_ebit",
+    "imposto_porcentagem",
+    "depreciacao_capex",
+    "capex_da_receita",
+    "wacc",
+    "numero_de_acoes",
+    "divida",
+    "disponivel",
+    "ativos_nao_operacionais",
+    "passivos_circulantes",
+    "necessidade_capital_de_giro",
+    "taxa_crecimento_perpetuidade",
+)
+
+
+# Distribuição de uma entrada do fluxo de caixa. Os valores sorteados podem
+# ser limitados a [minimo, maximo] (ex.: margem entre -1 e 1).
+class Distribuicao:
+    TIPOS = ("fixa", "normal", "uniforme", "triangular", "lognormal")
+
+    def __init__(
+        self,
+        tipo: str,
+        *parametros: float,
+        minimo: Optional[float] = None,
+        maximo: Optional[float] = None,
+    ):
+        if tipo not in self.TIPOS:
+            raise ValueError(f"Erro: Distribuição '{tipo}' não suportada.")
+        self.tipo = tipo
+        self.parametros = parametros
+        self.minimo = minimo
+        self.maximo = maximo
+
+    @classmethod
+    def fixa(cls, valor: float) -> "Distribuicao":
+        return cls("fixa", valor)
+
+    @classmethod
+    def normal(
+        cls,
+        media: float,
+        desvio: float,
+        minimo: Optional[float] = None,
+        maximo: Optional[float] = None,
+    ) -> "Distribuicao":
+        return cls("normal", media, desvio, minimo=minimo, maximo=maximo)
+
+    @classmethod
+    def uniforme(cls, inicio: float, fim: float) -> "Distribuicao":
+        return cls("uniforme", inicio, fim)
+
+    @classmethod
+    def triangular(cls, inicio: float, moda: float, fim: float) -> "Distribuicao":
+        return cls("triangular", inicio, moda, fim)
+
+    @classmethod
+    def lognormal(cls, media: float, desvio: float) -> "Distribuicao":
+        return cls("lognormal", media, desvio)
+
+    def amostrar(self, gerador: np.random.Generator, tamanho: int) -> Vetor:
+        parametros = self.parametros
+        if self.tipo == "fixa":
+            amostras = np.full(tamanho, self.parametros[0], dtype=float)
+        elif self.tipo == "normal":
+            amostras = gerador.normal(parametros[0], parametros[1], size=tamanho)
+        elif self.tipo == "uniforme":
+            amostras = gerador.uniform(parametros[0], parametros[1], size=tamanho)
+        elif self.tipo == "triangular":
+            amostras = gerador.triangular(
+                parametros[0], parametros[1], parametros[2], size=tamanho
+            )
+        else:
+            amostras = gerador.lognormal(parametros[0], parametros[1], size=tamanho)
+        if self.minimo is not None or self.maximo is not None:
+            amostras = np.clip(amostras, self.minimo, self.maximo)
+        return amostras
+
+
+# Valuation estocástico sobre o fluxo de caixa descontado: as entradas com
+# distribuição são sorteadas em conjunto (uma amostra = um cenário completo)
+# e todos os cenários de um lote são avaliados de uma vez pelo motor
+# vetorizado. O tamanho_lote limita a memória usada por ação.
+class ValuationMonteCarlo:
+    def __init__(
+        self,
+        entradas: Mapping[str, float],
+        distribuicoes: Mapping[str, Distribuicao],
+        anos_projecao: int = 5,
+        taxa_crecimento_perpetuidade: float = 0.014,
+        calculo_necessidade_capital_de_giro: bool = True,
+        semente: Optional[int] = None,
+        tamanho_lote: int = 20_000,
+    ):
+        desconhecidas = set(distribuicoes) - set(ENTRADAS_FLUXO_CAIXA)
+        if desconhecidas:
+            raise ValueError(
+                f"Erro: Entradas desconhecidas: {', '.join(sorted(desconhecidas))}."
+            )
+        self.entradas = {"taxa_crecimento_perpetuidade": taxa_crecimento_perpetuidade}
+        self.entradas.update(entradas)
+        faltando = set(ENTRADAS_FLUXO_CAIXA) - set(self.entradas) - set(distribuicoes)
+        if faltando:
+            raise ValueError(
+                f"Erro: Entradas sem valor: {', '.join(sorted(faltando))}."
+            )
+        self.distribuicoes = dict(distribuicoes)
+        self.anos_projecao = anos_projecao
+        self.calculo_necessidade_capital_de_giro = calculo_necessidade_capital_de_giro
+        self.gerador = np.random.default_rng(semente)
+        self.tamanho_lote = tamanho_lote
+
+    def _valor_por_acao(self, tamanho: int) -> Vetor:
+        cenario: Dict[str, Vetor | float] = {
+            nome: self.entradas[nome]
+            for nome in ENTRADAS_FLUXO_CAIXA
+            if nome not in self.distribuicoes
+        }
+        for nome, distribuicao in self.distribuicoes.items():
+            cenario[nome] = distribuicao.amostrar(self.gerador, tamanho)
+
+        valuation = ValuationFluxoCaixaDescontadoVetorizado(
+            **cenario,
+            anos_projecao=self.anos_projecao,
+            calculo_necessidade_capital_de_giro=self.calculo_necessidade_capital_de_giro,
+            arredondar=False,
+        )
+        valor_por_acao = np.broadcast_to(
+            valuation.calculo_perpetudidade(valuation.calcular_periodos())[2],
+            (tamanho,),
+        )
+        # Cenários com wacc <= crescimento na perpetuidade não têm valor definido
+        invalidos = np.broadcast_to(
+            valuation.wacc <= valuation.taxa_crecimento_perpetuidade, (tamanho,)
+        )
+        return np.where(invalidos, np.nan, valor_por_acao)
+
+    def amostras(self, n_amostras: int) -> Iterator[Vetor]:
+        for inicio in range(0, n_amostras, self.tamanho_lote):
+            yield self._valor_por_acao(min(self.tamanho_lote, n_amostras - inicio))
+
+    def simular(
+        self,
+        n_amostras: int = 100_000,
+        preco_atual: Optional[float] = None,
+        percentis: Sequence[float] = (5, 25, 50, 75, 95),
+    ) -> Dict[str, float]:
+        if n_amostras < 1:
+            raise ValueError("Erro: A quantidade de amostras precisa ser pelo menos 1.")
+        valores = np.empty(n_amostras)
+        posicao = 0
+        for lote in self.amostras(n_amostras):
+            valores[posicao : posicao + lote.size] = lote
+            posicao += lote.size
+
+        validos = valores[np.isfinite(valores)]
+        resultado: Dict[str, float] = {
+            "n_amostras": float(n_amostras),
+            "proporcao_validas": validos.size / n_amostras,
+        }
+        if validos.size == 0:
+            return resultado
+
+        resultado["media"] = float(validos.mean())
+        resultado["desvio"] = float(validos.std())
+        for percentil, valor in zip(percentis, np.percentile(validos, percentis)):
+            resultado[f"percentil_{percentil:g}"] = float(valor)
+        if preco_atual is not None:
+            resultado["probabilidade_acima_preco"] = float(
+                (validos > preco_atual).mean()
+            )
+        return resultado
+
+
+def simular_acoes(
+    simulacoes: Iterable[Tuple[str, ValuationMonteCarlo]],
+    n_amostras: int = 100_000,
+    precos_atuais: Optional[Mapping[str, float]] = None,
+    percentis: Sequence[float] = (5, 25, 50, 75, 95),
+) -> Iterator[Tuple[str, Dict[str, float]]]:
+    # Uma ação por vez: o resumo de cada ação é entregue assim que fica pronto
+    # e as amostras dela são descartadas antes da próxima, então a memória não
+    # cresce com a quantidade de ações. Com um gerador em `simulacoes`, cada
+    # simulação só é montada quando chega a vez da ação.
+    precos_atuais = precos_atuais or {}
+    for acao, simulacao in simulacoes:
+        yield (
+            acao,
+            simulacao.simular(
+                n_amostras, preco_atual=precos_atuais.get(acao), percentis=percentis
+            ),
+        )
@@ -0,0 +1,228 @@
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .valuation_fluxo_caixa_vetorizado import Vetor
+
+
+def trajetoria_estagios(
+    inicio: ArrayLike,
+    fim: ArrayLike,
+    anos_estaveis: int,
+    anos_transicao: int,
+    anos_projecao: int,
+) -> Vetor:
+    # Valor de cada ano com formato (empresas, anos_projecao): `inicio` nos
+    # anos_estaveis primeiros anos, queda (ou subida) linear até `fim` ao
+    # longo de anos_transicao anos e `fim` no restante do horizonte
+    if anos_estaveis < 0 or anos_transicao < 0:
+        raise ValueError("Erro: A duração dos estágios não pode ser negativa.")
+    if anos_estaveis + anos_transicao > anos_projecao:
+        raise ValueError(
+            f"Erro: Os estágios somam {anos_estaveis + anos_transicao} anos, mais "
+            f"que o horizonte de {anos_projecao} anos."
+        )
+    valor_inicio = np.atleast_1d(np.asarray(inicio, dtype=float))[..., np.newaxis]
+    valor_fim = np.atleast_1d(np.asarray(fim, dtype=float))[..., np.newaxis]
+    anos = np.arange(1, anos_projecao + 1)
+    # Fração já percorrida da transição: 0 no estágio inicial, 1 no final
+    fracao = np.clip((anos - anos_estaveis) / (anos_transicao + 1), 0.0, 1.0)
+    trajetoria: Vetor = valor_inicio + (valor_fim - valor_inicio) * fracao
+    return trajetoria
+
+
+# Fluxo de caixa descontado em estágios, para horizontes longos (10 a 50 anos):
+# crescimento alto por anos_crescimento anos, queda linear até o crescimento
+# da perpetuidade em anos_transicao anos e crescimento da perpetuidade até o
+# fim do horizonte. margem_ebit e capex_da_receita podem variar ano a ano.
+#
+# As entradas seguem ValuationFluxoCaixaDescontadoVetorizado (número ou uma
+# posição por empresa); margem_ebit e capex_da_receita também aceitam um array
+# 2D (empresas ou 1, anos_projecao) com um valor por ano. O crescimento
+# acumulado e os fatores de desconto são produtos acumulados (np.cumprod) sobre
+# o eixo dos anos, sem laço em Python nem arredondamentos intermediários: um
+# horizonte de 50 anos custa praticamente o mesmo que um de 5.
+class ValuationFluxoCaixaMultiestagio:
+    def __init__(
+        self,
+        receita_ano: ArrayLike,
+        crescimento_inicial: ArrayLike,
+        margem_ebit: ArrayLike,
+        imposto_porcentagem: ArrayLike,
+        depreciacao_capex: ArrayLike,
+        capex_da_receita: ArrayLike,
+        wacc: ArrayLike,
+        numero_de_acoes: ArrayLike,
+        divida: ArrayLike,
+        disponivel: ArrayLike,
+        ativos_nao_operacionais: ArrayLike,
+        passivos_circulantes: ArrayLike,
+        necessidade_capital_de_giro: ArrayLike,
+        anos_projecao: int = 20,
+        anos_crescimento: int = 5,
+        anos_transicao: int = 10,
+        taxa_crecimento_perpetuidade: ArrayLike = 0.014,
+        calculo_necessidade_capital_de_giro: ArrayLike = True,
+    ):
+        if anos_projecao < 1:
+            raise ValueError("Erro: O horizonte precisa ter pelo menos 1 ano.")
+        entradas = np.broadcast_arrays(
+            *(
+                np.atleast_1d(np.asarray(valor, dtype=float))
+                for valor in (
+                    receita_ano,
+                    crescimento_inicial,
+                    imposto_porcentagem,
+                    depreciacao_capex,
+                    wacc,
+                    numero_de_acoes,
+                    divida,
+                    disponivel,
+                    ativos_nao_operacionais,
+                    passivos_circulantes,
+                    necessidade_capital_de_giro,
+                    taxa_crecimento_perpetuidade,
+                )
+            )
+        )
+        (
+            self.receita_ano,
+            self.crescimento_inicial,
+            self.imposto_porcentagem,
+            self.depreciacao_capex,
+            self.wacc,
+            self.numero_de_acoes,
+            self.divida,
+            self.disponivel,
+            self.ativos_nao_operacionais,
+            self.passivos_circulantes,
+            self.necessidade_capital_de_giro,
+            self.taxa_crecimento_perpetuidade,
+        ) = entradas
+        self.anos_projecao = anos_projecao
+        self.anos_crescimento = anos_crescimento
+        self.anos_transicao = anos_transicao
+        self.margem_ebit = self._por_ano(margem_ebit, "margem_ebit")
+        self.capex_da_receita = self._por_ano(capex_da_receita, "capex_da_receita")
+        self.calculo_necessidade_capital_de_giro = np.broadcast_to(
+            np.asarray(calculo_necessidade_capital_de_giro, dtype=bool),
+            self.receita_ano.shape,
+        )
+        # Valida os estágios já na criação
+        self.crescimento()
+
+    def _por_ano(self, valores: ArrayLike, nome: str) -> Vetor:
+        # Número ou uma posição por empresa: mesmo valor em todos os anos
+        valores = np.asarray(valores, dtype=float)
+        if valores.ndim < 2:
+            valores = np.atleast_1d(valores)[..., np.newaxis]
+        elif valores.shape[-1] != self.anos_projecao:
+            raise ValueError(
+                f"Erro: {nome} tem {valores.shape[-1]} anos, mas o horizonte tem "
+                f"{self.anos_projecao}."
+            )
+        formato = self.receita_ano.shape + (self.anos_projecao,)
+        return np.broadcast_to(valores, formato)
+
+    def crescimento(self) -> Vetor:
+        # Crescimento da receita em cada ano, formato (empresas, anos_projecao)
+        return trajetoria_estagios(
+            self.crescimento_inicial,
+            self.taxa_crecimento_perpetuidade,
+            self.anos_crescimento,
+            self.anos_transicao,
+            self.anos_projecao,
+        )
+
+    def fatores_desconto(self) -> Vetor:
+        # 1 / (1 + wacc) ** ano como produto acumulado
+        formato = self.receita_ano.shape + (self.anos_projecao,)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            desconto = np.broadcast_to(1 / (1 + self.wacc[..., np.newaxis]), formato)
+        fatores: Vetor = np.cumprod(desconto, axis=-1, dtype=float)
+        return fatores
+
+    def calcular_periodos(self) -> Dict[str, Vetor]:
+        crescimento = self.crescimento()
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            receita_ano = self.receita_ano[..., np.newaxis] * np.cumprod(
+                1 + crescimento, axis=-1
+            )
+            ebit_ano = receita_ano * self.margem_ebit
+            imposto_ano = ebit_ano * self.imposto_porcentagem[..., np.newaxis]
+            capex_ano = receita_ano * self.capex_da_receita
+            depreciacao_ano = self.depreciacao_capex[..., np.newaxis] * capex_ano
+            ebit_ajustado = ebit_ano - imposto_ano + depreciacao_ano
+            fluxo_caixa = (
+                ebit_ajustado
+                - capex_ano
+                + np.where(
+                    self.calculo_necessidade_capital_de_giro,
+                    self.necessidade_capital_de_giro,
+                    0.0,
+                )[..., np.newaxis]
+            )
+            valor_presente_fluxo = fluxo_caixa * self.fatores_desconto()
+
+        return {
+            "crescimento": crescimento,
+            "receita_ano": receita_ano,
+            "ebit_ano": ebit_ano,
+            "imposto_ano": imposto_ano,
+            "capex_ano": capex_ano,
+            "depreciacao_ano": depreciacao_ano,
+            "ebit_ajustado": ebit_ajustado,
+            "fluxo_caixa": fluxo_caixa,
+            "valor_presente_fluxo": valor_presente_fluxo,
+        }
+
+    def calculo_perpetudidade(
+        self, periodos: Dict[str, Vetor]
+    ) -> Tuple[Vetor, Vetor, Vetor]:
+        # Depois do horizonte o fluxo cresce à taxa da perpetuidade. Empresas
+        # com wacc <= crescimento na perpetuidade ficam como NaN.
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            fluxo_perpetuidade = periodos["fluxo_caixa"][..., -1] * (
+                1 + self.taxa_crecimento_perpetuidade
+            )
+            perpetuidade = fluxo_perpetuidade / (
+                self.wacc - self.taxa_crecimento_perpetuidade
+            )
+            valor_presente = perpetuidade * self.fatores_desconto()[..., -1]
+
+            fluxo_caixa_fluxo_livre = (
+                periodos["valor_presente_fluxo"].sum(axis=-1)
+                + valor_presente
+                - self.divida
+            )
+            fluxo_caixa_ajustado = (
+                fluxo_caixa_fluxo_livre
+                + self.disponivel
+                + self.ativos_nao_operacionais
+                - self.passivos_circulantes
+            )
+            valor_por_acao = fluxo_caixa_ajustado / self.numero_de_acoes
+
+        validas = self.wacc > self.taxa_crecimento_perpetuidade
+        return (
+            np.where(validas, fluxo_caixa_fluxo_livre, np.nan),
+            np.where(validas, fluxo_caixa_ajustado, np.nan),
+            np.where(validas, valor_por_acao, np.nan),
+        )
+
+    def calcular_valuation(self) -> Tuple[Dict[str, NDArray[Any]], Dict[str, Vetor]]:
+        periodos = self.calcular_periodos()
+
+        fluxo_caixa_fluxo_livre, fluxo_caixa_ajustado, valor_por_acao = (
+            self.calculo_perpetudidade(periodos)
+        )
+
+        dict_perpetuidade = {
+            "fluxo_caixa_fluxo_livre": fluxo_caixa_fluxo_livre,
+            "fluxo_caixa_ajustado": fluxo_caixa_ajustado,
+            "valor_por_acao": valor_por_acao,
+        }
+        anos = np.arange(datetime.now().year, datetime.now().year + self.anos_projecao)
+        return {**periodos, "data": anos}, dict_perpetuidade
@@ -1,13 +1,18 @@
-from typing import Dict
-import yfinance as yf
+from typing import ClassVar, Dict, List, Mapping, Optional
+import numpy as np
 import pandas as pd
-from datetime import datetime
-import sidrapy
+from .dados_empresa import DadosEmpresa
+from .dados_macro import dados_macro
 
 
 class VariacaoReceita:
-    def __init__(self, ticker: str, deflacionar_receita: bool = True):
-        self.stock = yf.Ticker(ticker=ticker)
+    def __init__(
+        self,
+        ticker: str,
+        deflacionar_receita: bool = True,
+        dados: Optional[DadosEmpresa] = None,
+    ):
+        self.stock = dados if dados is not None else DadosEmpresa(ticker=ticker)
         self.deflacionar_receita = deflacionar_receita
 
     def financials(self) -> pd.DataFrame:
@@ -19,39 +24,10 @@ class VariacaoReceita:
         raise TypeError("Erro: Formato inesperado dos dados financeiros.")
 
     def pegando_inflacao(self) -> pd.DataFrame | None:
-        ipca_raw = sidrapy.get_table(
-            table_code="1737",
-            territorial_level="1",
-            ibge_territorial_code="all",
-            variable="69",
-            period="last%20472",
-        )
-
-        if ipca_raw is None:
-            return None  # Retorno correto para None
-
-        if isinstance(ipca_raw, dict):
-            return pd.DataFrame.from_dict(ipca_raw)  # Converte para DataFrame
-
-        if isinstance(ipca_raw, pd.DataFrame):
-            return ipca_raw  # Retorna diretamente
-
-        raise TypeError("Erro: Tipo de retorno inesperado.")
+        return dados_macro.ipca()
 
     def modificando_datas_inflacao(self) -> pd.DataFrame | None:
-        ipca_raw = self.pegando_inflacao()
-        if isinstance(ipca_raw, pd.DataFrame):
-            ipca_raw = ipca_raw.iloc[1:]
-        if ipca_raw is None:
-            return None
-        ipca_raw.loc[:, "data"] = ipca_raw["D2C"].apply(
-            lambda x: datetime.strptime(str(x), "%Y%m")
-        )
-        ipca_mes_doze = ipca_raw[ipca_raw["data"].dt.month == 12]
-        ipca_mes_doze.loc[:, "data_mes_ano"] = pd.to_datetime(
-            ipca_mes_doze["data"]
-        ).dt.strftime("%Y-%m")
-        return ipca_mes_doze
+        return dados_macro.ipca_dezembro()
 
     def receita_passada_dataframe(self) -> pd.DataFrame:
         receita_passada = pd.DataFrame(self.financials().loc["TotalRevenue"].iloc[::-1])
@@ -145,3 +121,104 @@ class VariacaoReceita:
         ].median()
 
         return return_porcentagens
+
+
+# Crescimento da receita de várias empresas de uma vez. Recebe uma tabela
+# longa com uma linha por (acao, data) e a receita anual, e calcula as mesmas
+# métricas de VariacaoReceita.receita_crescimento_metricas para todas as ações
+# em uma passada de groupby. A receita é deflacionada pelo índice acumulado do
+# IPCA (dados_macro.indice_ipca), calculado uma única vez por processo.
+class VariacaoReceitaLote:
+    COLUNAS: ClassVar[List[str]] = [
+        "mean_deflacionada",
+        "median_deflacionada",
+        "mean_normal",
+        "median_normal",
+    ]
+
+    def __init__(
+        self,
+        receitas: pd.DataFrame,
+        deflacionar_receita: bool = True,
+        indice_ipca: Optional[pd.Series] = None,
+    ):
+        if not {"acao", "data", "receita"}.issubset(receitas.columns):
+            raise ValueError(
+                "Erro: A tabela de receitas precisa das colunas acao, data e receita."
+            )
+        self.receitas = receitas
+        self.deflacionar_receita = deflacionar_receita
+        self._indice_ipca = indice_ipca
+
+    @classmethod
+    def de_empresas(
+        cls, empresas: Mapping[str, DadosEmpresa], deflacionar_receita: bool = True
+    ) -> "VariacaoReceitaLote":
+        # Monta a tabela longa a partir da DRE anual de cada DadosEmpresa
+        receitas = []
+        for acao, dados in empresas.items():
+            financials = dados.get_financials(freq="yearly")
+            if "TotalRevenue" in financials.index:
+                datas = pd.to_datetime(financials.columns)
+                valores = financials.loc["TotalRevenue"].values
+            else:
+                # Sem receita na DRE a ação continua no lote, com métricas NaN
+                datas = pd.DatetimeIndex([pd.NaT])
+                valores = np.array([np.nan])
+            receitas.append(
+                pd.DataFrame({"acao": acao, "data": datas, "receita": valores})
+            )
+        return cls(pd.concat(receitas, ignore_index=True), deflacionar_receita)
+
+    def indice_ipca(self) -> pd.Series:
+        if self._indice_ipca is None:
+            self._indice_ipca = dados_macro.indice_ipca()
+        return self._indice_ipca
+
+    def _variacao(self, receita: pd.Series, grupos: pd.Series) -> pd.Series:
+        # pct_change por ação, preenchendo lacunas com o último valor como o
+        # pct_change de VariacaoReceita
+        preenchida = receita.groupby(grupos).ffill()
+        return preenchida / preenchida.groupby(grupos).shift(1) - 1
+
+    def metricas(self) -> pd.DataFrame:
+        receitas = self.receitas.sort_values(["acao", "data"], ignore_index=True)
+        datas = pd.to_datetime(receitas["data"])
+        receita = receitas["receita"].astype(float)
+        grupos = receitas["acao"]
+
+        colunas = {"variacao_normal": self._variacao(receita, grupos)}
+        deflacionar = self.deflacionar_receita and not self.indice_ipca().empty
+        if deflacionar:
+            # Receita em moeda do último ano de cada ação: multiplica pelo IPCA
+            # acumulado entre o ano da receita e o último ano. Ações com receita
+            # trimestral (mar/jun/set) ou sem IPCA em algum ano não são deflacionadas.
+            indice = datas.dt.strftime("%Y-%m").map(self.indice_ipca())
+            ultimo = indice.groupby(grupos).transform("last")
+            valida = ~datas.dt.month.isin([3, 6, 9]).groupby(grupos).transform("any")
+            valida &= indice.notna().groupby(grupos).transform("all")
+            deflacionada = receita * np.where(valida, ultimo / indice, np.nan)
+            colunas["variacao_deflacionada"] = self._variacao(deflacionada, grupos)
+
+        variacoes = pd.DataFrame(colunas).groupby(grupos)
+        resultado = pd.DataFrame(index=pd.Index(grupos.unique(), name="acao"))
+        resultado["mean_normal"] = variacoes["variacao_normal"].mean()
+        resultado["median_normal"] = variacoes["variacao_normal"].median()
+        if deflacionar:
+            resultado["mean_deflacionada"] = variacoes["variacao_deflacionada"].mean()
+            resultado["median_deflacionada"] = variacoes[
+                "variacao_deflacionada"
+            ].median()
+        return resultado.reindex(columns=self.COLUNAS)
+
+    def receita_crescimento_metricas(self) -> Dict[str, Dict[str, float]]:
+        # Mesmo formato de VariacaoReceita: sem as chaves deflacionadas quando a
+        # ação não pôde ser deflacionada
+        return {
+            str(acao): {
+                str(chave): float(valor)
+                for chave, valor in linha.items()
+                if pd.notna(valor) or str(chave).endswith("_normal")
+            }
+            for acao, linha in self.metricas().iterrows()
+        }
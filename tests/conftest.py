@@ -0,0 +1,30 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from benchmarks.fixtures import CARTEIRA_PADRAO, gerar_fixtures_sinteticas
+from benchmarks.reproducao import Reproducao
+from fundamentos.dados_macro import dados_macro
+
+# Data fixa: as fixtures (e os resultados) são as mesmas em qualquer dia
+HOJE = datetime(2025, 6, 30)
+
+
+@pytest.fixture(scope="session")
+def gravacoes(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    # Respostas gravadas da carteira dos benchmarks, com o banco sem várias
+    # linhas dos demonstrativos
+    diretorio = tmp_path_factory.mktemp("gravacoes")
+    gerar_fixtures_sinteticas(CARTEIRA_PADRAO, diretorio, hoje=HOJE)
+    return diretorio
+
+
+@pytest.fixture
+def reproducao(gravacoes: Path) -> Iterator[Reproducao]:
+    # Todo o pipeline lê das gravações; o cache macro começa vazio em cada teste
+    dados_macro.limpar()
+    with Reproducao(gravacoes) as reproducao:
+        yield reproducao
+    dados_macro.limpar()
@@ -0,0 +1,52 @@
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fundamentos import DadosEmpresa
+from fundamentos.dados_empresa import somar_ttm
+
+
+def test_somar_ttm_soma_quatro_trimestres_seguidos() -> None:
+    # Colunas da mais recente para a mais antiga, como no Yahoo; falta o
+    # trimestre de 2023-12
+    datas = pd.to_datetime(
+        [
+            "2024-12-31",
+            "2024-09-30",
+            "2024-06-30",
+            "2024-03-31",
+            "2023-09-30",
+            "2023-06-30",
+            "2023-03-31",
+            "2022-12-31",
+        ]
+    )
+    tabela = pd.DataFrame(
+        [np.arange(1.0, 9.0), np.arange(10.0, 90.0, 10.0)],
+        index=["TotalRevenue", "EBIT"],
+        columns=datas,
+    )
+    ttm = somar_ttm(tabela, ["TotalRevenue", "EBIT", "LinhaAusente"])
+
+    assert list(ttm.index) == ["TotalRevenue", "EBIT"]
+    # Janelas que passam pelo trimestre faltando não existem
+    assert list(ttm.columns) == list(pd.to_datetime(["2024-12-31", "2023-09-30"]))
+    np.testing.assert_array_equal(
+        ttm.loc["TotalRevenue"], [1 + 2 + 3 + 4, 5 + 6 + 7 + 8]
+    )
+    np.testing.assert_array_equal(ttm.loc["EBIT"], [100.0, 260.0])
+
+
+def test_demonstrativo_ttm_das_gravacoes(reproducao: Any) -> None:
+    dados = DadosEmpresa("PETR4.SA")
+    trimestral = dados.demonstrativo_formatado("financials", freq="quarterly")
+    ttm = dados.demonstrativo_ttm("financials")
+    receita = trimestral.loc["Total Revenue"]
+    assert ttm.loc["Total Revenue"].iloc[0] == pytest.approx(
+        receita.iloc[:4].sum(), rel=1e-12
+    )
+    assert ttm.loc["Total Revenue"].iloc[-1] == pytest.approx(
+        receita.iloc[-4:].sum(), rel=1e-12
+    )
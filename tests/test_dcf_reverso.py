@@ -0,0 +1,88 @@
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fundamentos import INTERVALOS_DCF_REVERSO, DCFReverso
+
+QUANTIDADE = 200
+
+
+def entradas_conhecidas(semente: int = 0) -> Dict[str, Any]:
+    # Empresas lucrativas, com o valor por ação crescente no crescimento e na
+    # margem e decrescente no wacc dentro dos intervalos de busca
+    gerador = np.random.default_rng(semente)
+    return {
+        "receita_ano": gerador.uniform(1e8, 1e11, QUANTIDADE),
+        "porcenta_crescimento_receita": gerador.uniform(0.0, 0.2, QUANTIDADE),
+        "margem_ebit": gerador.uniform(0.1, 0.4, QUANTIDADE),
+        "imposto_porcentagem": gerador.uniform(0.1, 0.34, QUANTIDADE),
+        "depreciacao_capex": gerador.uniform(0.3, 0.9, QUANTIDADE),
+        "capex_da_receita": gerador.uniform(0.01, 0.08, QUANTIDADE),
+        "wacc": gerador.uniform(0.08, 0.2, QUANTIDADE),
+        "numero_de_acoes": gerador.uniform(1e7, 1e9, QUANTIDADE),
+        "divida": gerador.uniform(0, 1e9, QUANTIDADE),
+        "disponivel": gerador.uniform(0, 1e9, QUANTIDADE),
+        "ativos_nao_operacionais": gerador.uniform(0, 1e8, QUANTIDADE),
+        "passivos_circulantes": gerador.uniform(0, 1e8, QUANTIDADE),
+    }
+
+
+@pytest.mark.parametrize("parametro", list(INTERVALOS_DCF_REVERSO))
+def test_recupera_o_parametro_que_gerou_o_preco(parametro: str) -> None:
+    entradas = entradas_conhecidas()
+    preco = DCFReverso(**entradas, preco_atual=1.0).valor_por_acao()
+    assert (preco > 0).all()
+
+    # O valor original do parâmetro não entra na busca
+    solucao = DCFReverso(
+        **{**entradas, parametro: np.full(QUANTIDADE, 0.5)}, preco_atual=preco
+    ).resolver(parametro, tolerancia_preco=1e-10)
+
+    assert (solucao["status"] == "convergiu").all()
+    np.testing.assert_allclose(solucao["valor"], entradas[parametro], atol=1e-6)
+
+
+def test_status_sem_solucao_e_entrada_invalida() -> None:
+    entradas = {nome: valor[:3] for nome, valor in entradas_conhecidas().items()}
+    preco = DCFReverso(**entradas, preco_atual=1.0).valor_por_acao()
+    # Preço impossível de atingir no intervalo, preço zero e preço faltando
+    solucao = DCFReverso(
+        **entradas, preco_atual=[preco[0] * 1e6, 0.0, np.nan]
+    ).resolver("margem_ebit")
+    assert list(solucao["status"]) == [
+        "sem_solucao",
+        "entrada_invalida",
+        "entrada_invalida",
+    ]
+    assert np.isnan(solucao["valor"]).all()
+
+
+def test_de_resultados_usa_as_colunas_do_csv() -> None:
+    entradas = {nome: valor[:5] for nome, valor in entradas_conhecidas().items()}
+    preco = DCFReverso(**entradas, preco_atual=1.0).valor_por_acao()
+    resultados = pd.DataFrame(
+        {
+            "receita_ano": entradas["receita_ano"],
+            "crescimento_receita": entradas["porcenta_crescimento_receita"],
+            "margem_ebit": entradas["margem_ebit"],
+            "percentual_imposto": entradas["imposto_porcentagem"],
+            "depreciacao_capex": entradas["depreciacao_capex"],
+            "capex_receita": entradas["capex_da_receita"],
+            "wacc": entradas["wacc"],
+            "quantidade_acoes": entradas["numero_de_acoes"],
+            "divida_total": entradas["divida"],
+            "caixa": entradas["disponivel"],
+            "outros_ativos": entradas["ativos_nao_operacionais"],
+            "passivos_menos_divida": entradas["passivos_circulantes"],
+            "valor_atual": preco,
+        }
+    )
+    solucao = DCFReverso.de_resultados(resultados).resolver(
+        "wacc", tolerancia_preco=1e-10
+    )
+    np.testing.assert_allclose(solucao["valor"], entradas["wacc"], atol=1e-6)
+
+    with pytest.raises(ValueError):
+        DCFReverso.de_resultados(resultados.drop(columns="caixa"))
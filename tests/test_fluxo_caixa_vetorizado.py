@@ -0,0 +1,141 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+from benchmarks.fixtures import CARTEIRA_PADRAO
+from fundamentos import (
+    Distribuicao,
+    IndicadoresFinanceiros,
+    ValuationFluxoCaixaDescontado,
+    ValuationFluxoCaixaDescontadoVetorizado,
+    entradas_fluxo_caixa,
+)
+
+PERIODOS = (
+    "receita_ano",
+    "ebit_ajustado",
+    "fluxo_caixa",
+    "valor_presente_fluxo",
+    "ebit_ano",
+    "imposto_ano",
+    "capex_ano",
+    "depreciacao_ano",
+)
+PERPETUIDADE = ("fluxo_caixa_fluxo_livre", "fluxo_caixa_ajustado", "valor_por_acao")
+
+
+def empresas_aleatorias(quantidade: int, semente: int = 0) -> List[Dict[str, Any]]:
+    gerador = np.random.default_rng(semente)
+    return [
+        {
+            "receita_ano": float(gerador.uniform(1e6, 5e11)),
+            "porcenta_crescimento_receita": float(gerador.uniform(-0.2, 0.4)),
+            "margem_ebit": float(gerador.uniform(-0.3, 0.5)),
+            "imposto_porcentagem": float(gerador.uniform(0, 0.4)),
+            "depreciacao_capex": float(gerador.uniform(0, 1.5)),
+            "capex_da_receita": float(gerador.uniform(0, 0.3)),
+            "wacc": float(gerador.uniform(0.02, 0.25)),
+            "numero_de_acoes": float(gerador.integers(1_000_000, 10_000_000_000)),
+            "divida": float(gerador.uniform(0, 1e11)),
+            "disponivel": float(gerador.uniform(0, 5e10)),
+            "ativos_nao_operacionais": float(gerador.uniform(0, 1e10)),
+            "passivos_circulantes": float(gerador.uniform(0, 5e10)),
+            "necessidade_capital_de_giro": float(gerador.uniform(-1e9, 1e9)),
+            "taxa_crecimento_perpetuidade": float(gerador.uniform(0, 0.05)),
+            "calculo_necessidade_capital_de_giro": bool(gerador.integers(0, 2)),
+        }
+        for _ in range(quantidade)
+    ]
+
+
+def vetorizar(empresas: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        nome: np.array([empresa[nome] for empresa in empresas]) for nome in empresas[0]
+    }
+
+
+def comparar_com_escalar(empresas: List[Dict[str, Any]]) -> None:
+    periodos, perpetuidade = ValuationFluxoCaixaDescontadoVetorizado(
+        **vetorizar(empresas)
+    ).calcular_valuation()
+    for indice, empresa in enumerate(empresas):
+        projecao, valores = ValuationFluxoCaixaDescontado(
+            **empresa
+        ).calcular_valuation()
+        for nome in PERIODOS:
+            np.testing.assert_array_equal(
+                periodos[nome][indice], projecao[nome].to_numpy(), err_msg=nome
+            )
+        for nome in PERPETUIDADE:
+            np.testing.assert_array_equal(
+                perpetuidade[nome][indice], valores[nome], err_msg=nome
+            )
+
+
+def test_vetorizado_igual_ao_escalar_em_empresas_aleatorias() -> None:
+    # Mesmos arredondamentos da classe escalar: resultados idênticos, não
+    # apenas próximos
+    comparar_com_escalar(empresas_aleatorias(500))
+
+
+def test_vetorizado_igual_ao_escalar_nas_gravacoes(reproducao: Any) -> None:
+    empresas = [
+        entradas_fluxo_caixa(
+            IndicadoresFinanceiros(ticker=f"{acao}.SA").todos_indicadores()
+        )
+        for acao in CARTEIRA_PADRAO
+    ]
+    comparar_com_escalar(empresas)
+
+
+def test_sensibilidade_mascara_wacc_menor_ou_igual_ao_crescimento() -> None:
+    empresas = empresas_aleatorias(20, semente=1)
+    eixo_wacc = np.array([0.01, 0.03, 0.05, 0.08, 0.12])
+    eixo_perpetuidade = np.array([0.0, 0.03, 0.05, 0.1])
+    superficie = ValuationFluxoCaixaDescontadoVetorizado(
+        **vetorizar(empresas)
+    ).sensibilidade_wacc_perpetuidade(eixo_wacc, eixo_perpetuidade)
+
+    assert superficie.shape == (len(empresas), eixo_wacc.size, eixo_perpetuidade.size)
+    invalidas = eixo_wacc[:, np.newaxis] <= eixo_perpetuidade[np.newaxis, :]
+    assert np.isnan(superficie[:, invalidas]).all()
+    assert np.isfinite(superficie[:, ~invalidas]).all()
+
+    # Cada célula válida é o valuation escalar com aquele wacc e crescimento
+    for indice, empresa in enumerate(empresas[:3]):
+        for i, wacc in enumerate(eixo_wacc):
+            for j, perpetuidade in enumerate(eixo_perpetuidade):
+                if invalidas[i, j]:
+                    continue
+                _, valores = ValuationFluxoCaixaDescontado(
+                    **{
+                        **empresa,
+                        "wacc": wacc,
+                        "taxa_crecimento_perpetuidade": perpetuidade,
+                    }
+                ).calcular_valuation()
+                assert superficie[indice, i, j] == valores["valor_por_acao"]
+
+
+def test_monte_carlo_com_entradas_fixas_reproduz_o_valuation() -> None:
+    empresa = empresas_aleatorias(1, semente=2)[0]
+    empresa["wacc"] = 0.12
+    empresa["taxa_crecimento_perpetuidade"] = 0.02
+    valuation = ValuationFluxoCaixaDescontado(**empresa)
+    esperado = ValuationFluxoCaixaDescontadoVetorizado(
+        **{**empresa}, arredondar=False
+    ).calcular_valuation()[1]["valor_por_acao"][0]
+
+    resumo = valuation.monte_carlo(
+        {"margem_ebit": Distribuicao.fixa(empresa["margem_ebit"])}, semente=0
+    ).simular(1_000)
+    assert resumo["proporcao_validas"] == 1.0
+    assert resumo["media"] == pytest.approx(esperado)
+    assert resumo["desvio"] == pytest.approx(0.0, abs=1e-6 * abs(esperado))
+
+
+def test_monte_carlo_exige_ao_menos_uma_amostra() -> None:
+    valuation = ValuationFluxoCaixaDescontado(**empresas_aleatorias(1)[0])
+    with pytest.raises(ValueError):
+        valuation.monte_carlo({"wacc": Distribuicao.normal(0.1, 0.01)}).simular(0)
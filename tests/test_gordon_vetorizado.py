@@ -0,0 +1,62 @@
+from typing import Any
+
+import numpy as np
+import pytest
+
+from benchmarks.fixtures import CARTEIRA_PADRAO
+from fundamentos import ValuationGordonVetorizado, ValuationModoloGordon
+
+
+def test_preco_mascarado_quando_wacc_menos_g_nao_passa_do_spread() -> None:
+    d1 = np.array([1.0, 1.0, 1.0, 2.0, 3.0])
+    wacc = np.array([0.12, 0.05, 0.08, 0.15, 0.10])
+    g_sust = np.array([0.04, 0.05, 0.10, 0.145, 0.02])
+    preco = ValuationGordonVetorizado(d1, wacc, g_sust, spread_minimo=0.01).preco_acao()
+
+    validas = wacc - g_sust > 0.01
+    np.testing.assert_array_equal(validas, [True, False, False, False, True])
+    assert np.isnan(preco[~validas]).all()
+    np.testing.assert_allclose(preco[validas], d1[validas] / (wacc - g_sust)[validas])
+
+
+def test_dois_estagios_e_modelo_h_sem_crescimento_extra_igual_ao_gordon() -> None:
+    gordon = ValuationGordonVetorizado(
+        [1.0, 2.5, 0.7], [0.12, 0.1, 0.03], [0.04, 0.02, 0.05]
+    )
+    preco = gordon.preco_acao()
+    np.testing.assert_allclose(gordon.dois_estagios(gordon.g_sust, 10), preco)
+    np.testing.assert_allclose(gordon.modelo_h(gordon.g_sust, 5), preco)
+    assert np.isnan(preco[2])
+
+
+def test_sensibilidade_mascara_a_grade() -> None:
+    eixo_wacc = np.array([0.05, 0.1, 0.15])
+    eixo_g = np.array([0.0, 0.05, 0.1])
+    superficie = ValuationGordonVetorizado([1.0, 2.0], 0.1, 0.03).sensibilidade(
+        eixo_wacc, eixo_g
+    )
+    assert superficie.shape == (2, 3, 3)
+    invalidas = eixo_wacc[:, np.newaxis] - eixo_g[np.newaxis, :] <= 0
+    assert np.isnan(superficie[:, invalidas]).all()
+    np.testing.assert_allclose(
+        superficie[1, ~invalidas],
+        2.0 / (eixo_wacc[:, np.newaxis] - eixo_g[np.newaxis, :])[~invalidas],
+    )
+
+
+@pytest.mark.parametrize("acao", CARTEIRA_PADRAO)
+def test_gordon_escalar_usa_o_mesmo_calculo_mascarado(
+    reproducao: Any, acao: str
+) -> None:
+    valuation = ValuationModoloGordon(f"{acao}.SA")
+    resultado = valuation.preco_acao()
+    d1, wacc, g_sust = (
+        valuation.d1(),
+        valuation.wacc_gordon(),
+        valuation.g_sustainable(),
+    )
+    valor = float(resultado["valuation_acao"])
+    if wacc - g_sust > valuation.spread_minimo:
+        assert valor == round(d1 / (wacc - g_sust), 2)
+    else:
+        assert np.isnan(valor)
@@ -0,0 +1,40 @@
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from fundamentos import ArmazenamentoFundamentos
+from fundamentos.dados_macro import DadosMacro, dados_macro
+from fundamentos.provedores import recortar_periodo
+
+INICIO, FIM = "2024-01-02", "2024-01-05"
+
+
+def test_recorte_semiaberto_com_fuso() -> None:
+    datas = pd.date_range("2024-01-01", "2024-01-06", tz="America/Sao_Paulo")
+    serie = pd.Series(range(len(datas)), index=datas, dtype=float)
+    recorte = recortar_periodo(serie, INICIO, FIM)
+    assert list(recorte.index) == list(datas[1:4])
+
+
+def test_reproducao_e_dados_macro_usam_o_mesmo_periodo(reproducao: Any) -> None:
+    ibovespa = reproducao.provedor.ibovespa(INICIO, FIM)
+    assert not ibovespa.empty
+    assert ibovespa.index.min() >= pd.Timestamp(INICIO)
+    assert ibovespa.index.max() < pd.Timestamp(FIM)
+    pd.testing.assert_series_equal(dados_macro.ibovespa(INICIO, FIM), ibovespa)
+
+    fechamentos = reproducao.provedor.fechamentos(["^BVSP"], INICIO, FIM)
+    assert list(fechamentos.index) == list(ibovespa.index)
+
+
+def test_serie_gravada_nao_encurta_um_periodo_maior(
+    reproducao: Any, tmp_path: Path
+) -> None:
+    macro = DadosMacro(modo="cache", armazenamento=ArmazenamentoFundamentos(tmp_path))
+    curto = macro.ibovespa(INICIO, FIM)
+    longo = macro.ibovespa(INICIO, "2024-02-01")
+    assert longo.index.max() > curto.index.max()
+    pd.testing.assert_series_equal(
+        longo, reproducao.provedor.ibovespa(INICIO, "2024-02-01")
+    )
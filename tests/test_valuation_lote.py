@@ -0,0 +1,163 @@
+import json
+import shutil
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import CARTEIRA_PADRAO
+from fundamentos import ValuationLote, tabela_resultados
+
+SCRIPT_VALUATIONS = (
+    Path(__file__).resolve().parent.parent / "codigos_rodando" / "rodando_valuations.py"
+)
+
+
+def comparar(resultado: pd.DataFrame, esperado: pd.DataFrame) -> None:
+    # variacao_receita é um dicionário por linha: compara a versão tipada,
+    # com uma coluna por métrica
+    pd.testing.assert_frame_equal(
+        tabela_resultados(resultado), tabela_resultados(esperado)
+    )
+
+
+@pytest.fixture
+def resultado_completo(reproducao: Any) -> pd.DataFrame:
+    resultado = ValuationLote(list(CARTEIRA_PADRAO), max_workers=2).rodar()
+    assert list(resultado["acao"]) == CARTEIRA_PADRAO
+    return resultado
+
+
+def test_retomar_pula_as_acoes_do_checkpoint(
+    reproducao: Any, resultado_completo: pd.DataFrame, tmp_path: Path
+) -> None:
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    ValuationLote(list(CARTEIRA_PADRAO), checkpoint=checkpoint).rodar()
+
+    # Rodada interrompida: cabeçalho, duas ações e uma linha pela metade
+    linhas = checkpoint.read_text(encoding="utf-8").splitlines(keepends=True)
+    checkpoint.write_text("".join(linhas[:3]) + linhas[3][:20], encoding="utf-8")
+    concluidas = [json.loads(linha)["acao"] for linha in linhas[1:3]]
+
+    lote = ValuationLote(list(CARTEIRA_PADRAO), checkpoint=checkpoint, retomar=True)
+    resultado = lote.rodar()
+
+    assert sorted(lote.retomadas) == sorted(concluidas)
+    assert not lote.erros
+    comparar(resultado, resultado_completo)
+    # Uma nova retomada encontra todas as ações no checkpoint
+    lote = ValuationLote(list(CARTEIRA_PADRAO), checkpoint=checkpoint, retomar=True)
+    lote.rodar()
+    assert sorted(lote.retomadas) == sorted(CARTEIRA_PADRAO)
+
+
+def test_checkpoint_de_outras_acoes_e_ignorado(reproducao: Any, tmp_path: Path) -> None:
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    ValuationLote(CARTEIRA_PADRAO[:2], checkpoint=checkpoint).rodar()
+
+    lote = ValuationLote(list(CARTEIRA_PADRAO), checkpoint=checkpoint, retomar=True)
+    lote.rodar()
+    assert lote.retomadas == []
+    cabecalho = json.loads(checkpoint.read_text(encoding="utf-8").splitlines()[0])
+    assert cabecalho["acoes"] == sorted(CARTEIRA_PADRAO)
+
+
+def test_incremental_reaproveita_acoes_sem_demonstrativos_novos(
+    reproducao: Any, resultado_completo: pd.DataFrame
+) -> None:
+    anterior = ValuationLote(list(CARTEIRA_PADRAO))
+    anterior.rodar()
+    impressoes = dict(anterior.impressoes)
+    # PETR4 publicou um demonstrativo novo desde a rodada anterior
+    impressoes["PETR4"] = {**impressoes["PETR4"], "hash": "outro"}
+
+    lote = ValuationLote(
+        list(CARTEIRA_PADRAO),
+        anteriores=resultado_completo,
+        impressoes_anteriores=impressoes,
+    )
+    resultado = lote.rodar()
+
+    assert sorted(lote.reaproveitadas) == sorted(set(CARTEIRA_PADRAO) - {"PETR4"})
+    assert set(lote.projecoes) == {"PETR4"}
+    comparar(resultado, resultado_completo)
+
+
+def test_acoes_expiradas_continuam_ocupando_o_pool() -> None:
+    liberar = threading.Event()
+
+    class LoteTravado(ValuationLote):
+        def valuation_acao(self, acao: str) -> Dict[str, Any]:
+            liberar.wait(10)
+            raise ValueError("Erro: Ação liberada.")
+
+    lote = LoteTravado(["PETR4", "VALE3"], max_workers=2, timeout_acao=0.1)
+    try:
+        resultado = lote.rodar()
+    finally:
+        liberar.set()
+
+    assert resultado.empty
+    assert sorted(lote.erros) == ["PETR4", "VALE3"]
+    assert sorted(lote.presas) == ["PETR4", "VALE3"]
+
+
+def rodar_script(
+    gravacoes: Path, *argumentos: str
+) -> "subprocess.CompletedProcess[bytes]":
+    return subprocess.run(
+        [
+            sys.executable,
+            str(SCRIPT_VALUATIONS),
+            "--provedor",
+            "reproducao",
+            "--gravacoes",
+            str(gravacoes),
+            *argumentos,
+        ],
+        cwd=SCRIPT_VALUATIONS.parent,
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_merge_dos_shards_igual_a_rodada_unica(gravacoes: Path, tmp_path: Path) -> None:
+    unica = shutil.copytree(gravacoes, tmp_path / "unica")
+    rodar_script(unica)
+
+    em_shards = shutil.copytree(gravacoes, tmp_path / "shards")
+    for shard in range(2):
+        rodar_script(em_shards, "--shard", str(shard), "--total-shards", "2")
+    rodar_script(em_shards, "--merge", "--total-shards", "2")
+
+    arquivo = "valores_valuations_acoes.csv"
+    esperado = pd.read_csv(unica / arquivo).sort_values("acao", ignore_index=True)
+    juntado = pd.read_csv(em_shards / arquivo).sort_values("acao", ignore_index=True)
+    assert sorted(juntado["acao"]) == sorted(CARTEIRA_PADRAO)
+    pd.testing.assert_frame_equal(juntado, esperado)
+
+    projecoes = pd.read_parquet(em_shards / "projecoes_valuations.parquet")
+    assert set(projecoes["acao"]) == set(CARTEIRA_PADRAO)
+
+
+def test_jsonl_deixa_so_os_resultados_na_saida_padrao(
+    gravacoes: Path, tmp_path: Path
+) -> None:
+    pasta = shutil.copytree(gravacoes, tmp_path / "jsonl")
+    processo = rodar_script(pasta, "--jsonl")
+
+    linhas = [json.loads(linha) for linha in processo.stdout.decode().splitlines()]
+    assert sorted(linha["acao"] for linha in linhas) == sorted(CARTEIRA_PADRAO)
+    assert "Cotações obtidas em lote" in processo.stderr.decode()
+
+
+def test_merge_exige_todos_os_shards(gravacoes: Path, tmp_path: Path) -> None:
+    em_shards = shutil.copytree(gravacoes, tmp_path / "shards")
+    rodar_script(em_shards, "--shard", "0", "--total-shards", "2")
+    with pytest.raises(subprocess.CalledProcessError) as erro:
+        rodar_script(em_shards, "--merge", "--total-shards", "2")
+    assert b"Resultados de shards n" in erro.value.stderr
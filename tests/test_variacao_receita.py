@@ -0,0 +1,54 @@
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from benchmarks.fixtures import CARTEIRA_PADRAO
+from benchmarks.reproducao import Reproducao
+from fundamentos import DadosEmpresa, VariacaoReceita, VariacaoReceitaLote
+from fundamentos.dados_macro import dados_macro
+from fundamentos.provedores import (
+    caminho_gravacao,
+    ler_tabela_json,
+    salvar_tabela_json,
+)
+
+
+@pytest.mark.parametrize("deflacionar_receita", [True, False])
+def test_lote_igual_a_cada_acao(reproducao: Any, deflacionar_receita: bool) -> None:
+    empresas = {acao: DadosEmpresa(f"{acao}.SA") for acao in CARTEIRA_PADRAO}
+    lote = VariacaoReceitaLote.de_empresas(
+        empresas, deflacionar_receita=deflacionar_receita
+    ).receita_crescimento_metricas()
+
+    assert set(lote) == set(CARTEIRA_PADRAO)
+    # As receitas anuais das gravações fecham em dezembro: todas são deflacionadas
+    assert all(
+        ("median_deflacionada" in metricas) == deflacionar_receita
+        for metricas in lote.values()
+    )
+    for acao, dados in empresas.items():
+        esperado = VariacaoReceita(
+            f"{acao}.SA", deflacionar_receita=deflacionar_receita, dados=dados
+        ).receita_crescimento_metricas()
+        assert lote[acao] == pytest.approx(esperado, rel=1e-12)
+
+
+def test_acao_sem_receita_fica_com_metricas_nan(
+    gravacoes: Path, tmp_path: Path
+) -> None:
+    copia = shutil.copytree(gravacoes, tmp_path / "gravacoes")
+    caminho = caminho_gravacao(copia, "OIBR3.SA", "financials_yearly")
+    financials = ler_tabela_json(caminho)
+    salvar_tabela_json(caminho, financials.drop(index="TotalRevenue"))
+
+    dados_macro.limpar()
+    with Reproducao(copia):
+        empresas = {acao: DadosEmpresa(f"{acao}.SA") for acao in CARTEIRA_PADRAO}
+        metricas = VariacaoReceitaLote.de_empresas(empresas).metricas()
+    dados_macro.limpar()
+
+    assert sorted(metricas.index) == sorted(CARTEIRA_PADRAO)
+    assert metricas.loc["OIBR3"].isna().all()
+    assert metricas.drop(index="OIBR3").notna().all().all()